@@ -1759,13 +1759,24 @@ class Atoms:
             D_len.shape = (-1,)
             return D_len
 
-    def get_all_distances(self, mic=False, vector=False):
+    def get_all_distances(self, mic=False, vector=False, cutoff=None):
         """Return distances of all of the atoms with all of the atoms.
 
         Use mic=True to use the Minimum Image Convention.
+
+        If *cutoff* is given, only the pairs of different atoms closer
+        than *cutoff* are found, with a neighbor list instead of the
+        N x N matrix, so that large systems are feasible.  Three arrays
+        *i*, *j* and *d* are then returned, with ``d[n]`` the distance
+        (or distance vector from atom i to atom j if vector=True)
+        between atoms ``i[n]`` and ``j[n]``.  Every pair appears in both
+        orders, sorted by i and then j.
         """
         R = self.arrays['positions']
 
+        if cutoff is not None:
+            return self._get_distances_within(cutoff, mic, vector)
+
         cell = None
         pbc = None
 
@@ -1780,6 +1791,23 @@ class Atoms:
         else:
             return D_len
 
+    def _get_distances_within(self, cutoff, mic, vector):
+        from ase.neighborlist import primitive_neighbor_list
+        pbc = self.pbc if mic else np.zeros(3, bool)
+        i, j, D, d = primitive_neighbor_list(
+            'ijDd', pbc, self.get_cell(complete=True),
+            self.arrays['positions'], cutoff)
+
+        # Keep only the nearest image of each pair:
+        order = np.lexsort((d, j, i))
+        i, j = i[order], j[order]
+        mask = i != j
+        mask[1:] &= (i[1:] != i[:-1]) | (j[1:] != j[:-1])
+
+        if vector:
+            return i[mask], j[mask], D[order][mask]
+        return i[mask], j[mask], d[order][mask]
+
     def set_distance(self, a0, a1, distance, fix=0.5, mic=False,
                      mask=None, indices=None, add=False, factor=False):
         """Set the distance between two atoms.
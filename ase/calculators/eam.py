@@ -8,13 +8,37 @@
 # License: See accompanying license files for details
 
 import os
+from collections import OrderedDict
+from copy import deepcopy
+
 import numpy as np
 
-from ase.neighborlist import NeighborList
+from ase.neighborlist import NewPrimitiveNeighborList
 from ase.calculators.calculator import Calculator, all_changes
 from scipy.interpolate import InterpolatedUnivariateSpline as spline
 from ase.units import Bohr, Hartree
 
+# Attributes defined by reading a potential file:
+_potential_attributes = [
+    'header', 'Nelements', 'elements', 'Z', 'mass', 'a', 'lattice',
+    'nrho', 'drho', 'nr', 'dr', 'cutoff', 'r', 'rho',
+    'embedded_data', 'density_data', 'rphi_data', 'd_data', 'q_data',
+    'embedded_energy', 'electron_density', 'phi',
+    'd_embedded_energy', 'd_electron_density', 'd_phi',
+    'd', 'q', 'd_d', 'd_q']
+
+# Potentials read from files, keyed by file name, form, modification
+# time and size, so that the splines are only set up once.  The least
+# recently used potentials are dropped when there are more than
+# _potential_cache_size of them:
+_potential_cache: 'OrderedDict' = OrderedDict()
+_potential_cache_size = 8
+
+
+def clear_potential_cache():
+    """Forget the potentials cached by :meth:`EAM.read_potential`."""
+    _potential_cache.clear()
+
 
 class EAM(Calculator):
     r"""
@@ -143,7 +167,7 @@ Keyword                    Description
 
 ``d_d[N,N], d_q[N,N]``     ADP dipole and quadrupole derivative functions
 
-``skin``                   skin distance passed to NeighborList(). If no atom
+``skin``                   skin distance of the neighbor list. If no atom
                            has moved more than the skin-distance since the last
                            call to the ``update()`` method then the neighbor
                            list can be reused. Defaults to 1.0.
@@ -196,11 +220,16 @@ Special features
 Notes/Issues
 =============
 
-* Although currently not fast, this calculator can be good for trying
-  small calculations or for creating new potentials by matching baseline
-  data such as from DFT results. The format for these potentials is
-  compatible with LAMMPS_ and so can be used either directly by LAMMPS or
-  with the ASE LAMMPS calculator interface.
+* All pairs are evaluated at once: the potential functions are called
+  on flat arrays of distances, one call per pair of elements.  This
+  calculator can be good for trying calculations or for creating new
+  potentials by matching baseline data such as from DFT results. The
+  format for these potentials is compatible with LAMMPS_ and so can be
+  used either directly by LAMMPS or with the ASE LAMMPS calculator
+  interface.
+
+* Splines read from a potential file are cached and shared between
+  calculators reading the same (unmodified) file.
 
 * Supported formats are the LAMMPS_ ``.alloy`` and ``.adp``. The
   ``.eam`` format is currently not supported. The form of the
@@ -241,6 +270,7 @@ End EAM Interface Documentation
                  label=os.curdir, atoms=None, form=None, **kwargs):
 
         self.form = form
+        self.neighbors = None
 
         if 'potential' in kwargs:
             self.read_potential(kwargs['potential'])
@@ -285,8 +315,25 @@ End EAM Interface Documentation
         """
 
         if isinstance(filename, str):
+            if self.form is None:
+                self.set_form(filename)
+            # splines read from a file are cached, and every calculator
+            # gets its own copy of them
+            stat = os.stat(filename)
+            key = (os.path.abspath(filename), self.form,
+                   stat.st_mtime_ns, stat.st_size)
+            if key in _potential_cache:
+                _potential_cache.move_to_end(key)
+                for name, value in _potential_cache[key].items():
+                    setattr(self, name, deepcopy(value))
+                return
             with open(filename) as fd:
                 self._read_potential(fd)
+            _potential_cache[key] = deepcopy(
+                {name: getattr(self, name)
+                 for name in _potential_attributes if hasattr(self, name)})
+            while len(_potential_cache) > _potential_cache_size:
+                _potential_cache.popitem(last=False)
         else:
             fd = filename
             self._read_potential(fd)
@@ -633,23 +680,93 @@ End EAM Interface Documentation
             raise RuntimeError('These elements are not in the potential: %s' %
                                elements[unavailable])
 
-        # cutoffs need to be a vector for NeighborList
-        cutoffs = self.cutoff * np.ones(len(atoms))
-
         # convert the elements to an index of the position
         # in the eam format
-        self.index = np.array([self.elements.index(el)
-                               for el in atoms.get_chemical_symbols()])
-        self.pbc = atoms.get_pbc()
+        index = np.array([self.elements.index(el)
+                          for el in atoms.get_chemical_symbols()], dtype=int)
 
         # since we need the contribution of all neighbors to the
         # local electron density we cannot just calculate and use
         # one way neighbors
-        self.neighbors = NeighborList(cutoffs,
-                                      skin=self.parameters.skin,
-                                      self_interaction=False,
-                                      bothways=True)
-        self.neighbors.update(atoms)
+        if (self.neighbors is None or len(index) != len(self.index) or
+                (index != self.index).any()):
+            self.neighbors = NewPrimitiveNeighborList(
+                0.5 * self.cutoff * np.ones(len(atoms)),
+                skin=self.parameters.skin,
+                self_interaction=False,
+                bothways=True)
+        self.index = index
+        self.pbc = atoms.get_pbc()
+        self.neighbors.update(atoms.pbc, atoms.get_cell(complete=True),
+                              atoms.positions)
+
+        # flat arrays over all pairs within the cutoff
+        i = self.neighbors.pair_first
+        j = self.neighbors.pair_second
+        rvec = (atoms.positions[j] - atoms.positions[i] +
+                np.dot(self.neighbors.offset_vec, atoms.cell))
+        r = np.sqrt(np.sum(np.square(rvec), axis=1))
+        nearest = r < self.cutoff
+        self.pair_i = i[nearest]
+        self.pair_j = j[nearest]
+        self.pair_rvec = rvec[nearest]
+        self.pair_r = r[nearest]
+
+        # group the pairs by the elements of the two atoms so that each
+        # function only has to be evaluated once on a flat array
+        pair_types = (self.index[self.pair_i] * self.Nelements +
+                      self.index[self.pair_j])
+        order = np.argsort(pair_types, kind='stable')
+        bounds = np.searchsorted(pair_types[order],
+                                 np.arange(self.Nelements**2 + 1))
+        self.pair_groups = {}
+        for t in range(self.Nelements**2):
+            if bounds[t] < bounds[t + 1]:
+                self.pair_groups[divmod(t, self.Nelements)] = \
+                    order[bounds[t]:bounds[t + 1]]
+
+        self.atom_groups = {}
+        for t in range(self.Nelements):
+            atoms_t = np.flatnonzero(self.index == t)
+            if len(atoms_t) > 0:
+                self.atom_groups[t] = atoms_t
+
+    def evaluate_pairs(self, functions, r=None, transpose=False):
+        """Evaluate pair functions on all pairs, grouped by element pair.
+
+        *functions* is an (N, N) array of functions indexed by the
+        elements of the first and second atom of each pair (or of the
+        second and first atom if *transpose* is True)."""
+        if r is None:
+            r = self.pair_r
+        values = np.zeros(len(r))
+        for (ti, tj), pairs in self.pair_groups.items():
+            if transpose:
+                ti, tj = tj, ti
+            values[pairs] = functions[ti, tj](r[pairs])
+        return values
+
+    def evaluate_density(self, functions, transpose=False):
+        """Evaluate the electron density functions on all pairs.
+
+        For the ``fs`` form the density depends on both elements,
+        otherwise only on the element of the neighbor (the second atom
+        of each pair, or the first if *transpose* is True)."""
+        if self.form == 'fs':
+            # electron_density[j, i] is the density at atom i from atom j
+            return self.evaluate_pairs(functions, transpose=not transpose)
+        values = np.zeros(len(self.pair_r))
+        for (ti, tj), pairs in self.pair_groups.items():
+            t = ti if transpose else tj
+            values[pairs] = functions[t](self.pair_r[pairs])
+        return values
+
+    def evaluate_atoms(self, functions, x):
+        """Evaluate per-element functions on a per-atom array."""
+        values = np.zeros(len(x))
+        for t, atoms_t in self.atom_groups.items():
+            values[atoms_t] = functions[t](x[atoms_t])
+        return values
 
     def calculate(self, atoms=None, properties=['energy'],
                   system_changes=all_changes):
@@ -695,68 +812,37 @@ End EAM Interface Documentation
         the embedding energy of each atom into the electron cloud
         generated by its neighbors
         """
+        natoms = len(atoms)
+        i = self.pair_i
 
-        pair_energy = 0.0
-        embedding_energy = 0.0
-        mu_energy = 0.0
-        lam_energy = 0.0
-        trace_energy = 0.0
+        pair_energy = np.sum(self.evaluate_pairs(self.phi)) / 2.
 
-        self.total_density = np.zeros(len(atoms))
-        if (self.form == 'adp'):
-            self.mu = np.zeros([len(atoms), 3])
-            self.lam = np.zeros([len(atoms), 3, 3])
-
-        for i in range(len(atoms)):  # this is the atom to be embedded
-            neighbors, offsets = self.neighbors.get_neighbors(i)
-            offset = np.dot(offsets, atoms.get_cell())
-
-            rvec = (atoms.positions[neighbors] + offset -
-                    atoms.positions[i])
-
-            # calculate the distance to the nearest neighbors
-            r = np.sqrt(np.sum(np.square(rvec), axis=1))  # fast
-#            r = np.apply_along_axis(np.linalg.norm, 1, rvec)  # sloow
-
-            nearest = np.arange(len(r))[r <= self.cutoff]
-            for j_index in range(self.Nelements):
-                use = self.index[neighbors[nearest]] == j_index
-                if not use.any():
-                    continue
-                pair_energy += np.sum(self.phi[self.index[i], j_index](
-                    r[nearest][use])) / 2.
-
-                if self.form == 'fs':
-                    density = np.sum(
-                        self.electron_density[j_index, self.index[i]](r[nearest][use]))
-                else:
-                    density = np.sum(
-                        self.electron_density[j_index](r[nearest][use]))
-                self.total_density[i] += density
-
-                if self.form == 'adp':
-                    self.mu[i] += self.adp_dipole(
-                        r[nearest][use],
-                        rvec[nearest][use],
-                        self.d[self.index[i], j_index])
-
-                    self.lam[i] += self.adp_quadrupole(
-                        r[nearest][use],
-                        rvec[nearest][use],
-                        self.q[self.index[i], j_index])
-
-            # add in the electron embedding energy
-            embedding_energy += self.embedded_energy[self.index[i]](
-                self.total_density[i])
+        self.total_density = np.bincount(
+            i, self.evaluate_density(self.electron_density), natoms)
+
+        # add in the electron embedding energy
+        embedding_energy = np.sum(
+            self.evaluate_atoms(self.embedded_energy, self.total_density))
 
         components = dict(pair=pair_energy, embedding=embedding_energy)
 
         if self.form == 'adp':
-            mu_energy += np.sum(self.mu ** 2) / 2.
-            lam_energy += np.sum(self.lam ** 2) / 2.
+            rvec = self.pair_rvec
+            d = self.evaluate_pairs(self.d)
+            q = self.evaluate_pairs(self.q)
 
-            for i in range(len(atoms)):  # this is the atom to be embedded
-                trace_energy -= np.sum(self.lam[i].trace() ** 2) / 6.
+            self.mu = np.zeros([natoms, 3])
+            self.lam = np.zeros([natoms, 3, 3])
+            for alpha in range(3):
+                self.mu[:, alpha] = np.bincount(i, d * rvec[:, alpha],
+                                                natoms)
+                for beta in range(3):
+                    self.lam[:, alpha, beta] = np.bincount(
+                        i, q * rvec[:, alpha] * rvec[:, beta], natoms)
+
+            mu_energy = np.sum(self.mu ** 2) / 2.
+            lam_energy = np.sum(self.lam ** 2) / 2.
+            trace_energy = -np.sum(self.lam.trace(axis1=1, axis2=2) ** 2) / 6.
 
             adp_result = dict(adp_mu=mu_energy,
                               adp_lam=lam_energy,
@@ -778,109 +864,62 @@ End EAM Interface Documentation
 
     def calculate_forces(self, atoms):
         # calculate the forces based on derivatives of the three EAM functions
+        natoms = len(atoms)
+        i = self.pair_i
+        j = self.pair_j
+        r = self.pair_r
+        rvec = self.pair_rvec
+
+        d_embedded_energy = self.evaluate_atoms(self.d_embedded_energy,
+                                                self.total_density)
+
+        scale = (self.evaluate_pairs(self.d_phi) +
+                 d_embedded_energy[i] *
+                 self.evaluate_density(self.d_electron_density) +
+                 d_embedded_energy[j] *
+                 self.evaluate_density(self.d_electron_density,
+                                       transpose=True))
+        pair_forces = (scale / r)[:, np.newaxis] * rvec
 
-        self.update(atoms)
-        self.results['forces'] = np.zeros((len(atoms), 3))
-
-        for i in range(len(atoms)):  # this is the atom to be embedded
-            neighbors, offsets = self.neighbors.get_neighbors(i)
-            offset = np.dot(offsets, atoms.get_cell())
-            # create a vector of relative positions of neighbors
-            rvec = atoms.positions[neighbors] + offset - atoms.positions[i]
-            r = np.sqrt(np.sum(np.square(rvec), axis=1))
-            nearest = np.arange(len(r))[r < self.cutoff]
-
-            d_embedded_energy_i = self.d_embedded_energy[
-                self.index[i]](self.total_density[i])
-            urvec = rvec.copy()  # unit directional vector
-
-            for j in np.arange(len(neighbors)):
-                urvec[j] = urvec[j] / r[j]
-
-            for j_index in range(self.Nelements):
-                use = self.index[neighbors[nearest]] == j_index
-                if not use.any():
-                    continue
-                rnuse = r[nearest][use]
-                density_j = self.total_density[neighbors[nearest][use]]
-                if self.form == 'fs':
-                    scale = (self.d_phi[self.index[i], j_index](rnuse) +
-                             (d_embedded_energy_i *
-                              self.d_electron_density[j_index, self.index[i]](rnuse)) +
-                             (self.d_embedded_energy[j_index](density_j) *
-                              self.d_electron_density[self.index[i], j_index](rnuse)))
-                else:
-                    scale = (self.d_phi[self.index[i], j_index](rnuse) +
-                             (d_embedded_energy_i *
-                              self.d_electron_density[j_index](rnuse)) +
-                             (self.d_embedded_energy[j_index](density_j) *
-                              self.d_electron_density[self.index[i]](rnuse)))
-
-                self.results['forces'][i] += np.dot(scale, urvec[nearest][use])
-
-                if (self.form == 'adp'):
-                    adp_forces = self.angular_forces(
-                        self.mu[i],
-                        self.mu[neighbors[nearest][use]],
-                        self.lam[i],
-                        self.lam[neighbors[nearest][use]],
-                        rnuse,
-                        rvec[nearest][use],
-                        self.index[i],
-                        j_index)
-
-                    self.results['forces'][i] += adp_forces
-
-    def angular_forces(self, mu_i, mu, lam_i, lam, r, rvec, form1, form2):
-        # calculate the extra components for the adp forces
-        # rvec are the relative positions to atom i
-        psi = np.zeros(mu.shape)
-        for gamma in range(3):
-            term1 = (mu_i[gamma] - mu[:, gamma]) * self.d[form1][form2](r)
-
-            term2 = np.sum((mu_i - mu) *
-                           self.d_d[form1][form2](r)[:, np.newaxis] *
-                           (rvec * rvec[:, gamma][:, np.newaxis] /
-                            r[:, np.newaxis]), axis=1)
-
-            term3 = 2 * np.sum((lam_i[:, gamma] + lam[:, :, gamma]) *
-                               rvec * self.q[form1][form2](r)[:, np.newaxis],
-                               axis=1)
-            term4 = 0.0
-            for alpha in range(3):
-                for beta in range(3):
-                    rs = rvec[:, alpha] * rvec[:, beta] * rvec[:, gamma]
-                    term4 += ((lam_i[alpha, beta] + lam[:, alpha, beta]) *
-                              self.d_q[form1][form2](r) * rs) / r
+        if self.form == 'adp':
+            pair_forces += self.angular_forces(r, rvec)
 
-            term5 = ((lam_i.trace() + lam.trace(axis1=1, axis2=2)) *
-                     (self.d_q[form1][form2](r) * r +
-                      2 * self.q[form1][form2](r)) * rvec[:, gamma]) / 3.
+        forces = np.zeros((natoms, 3))
+        for alpha in range(3):
+            forces[:, alpha] = np.bincount(i, pair_forces[:, alpha], natoms)
+        self.results['forces'] = forces
 
-            # the minus for term5 is a correction on the adp
-            # formulation given in the 2005 Mishin Paper and is posted
-            # on the NIST website with the AlH potential
-            psi[:, gamma] = term1 + term2 + term3 + term4 - term5
+    def angular_forces(self, r, rvec):
+        # calculate the extra components for the adp forces on all pairs
+        # rvec are the relative positions of the second to the first atom
+        i = self.pair_i
+        j = self.pair_j
+        d = self.evaluate_pairs(self.d)
+        d_d = self.evaluate_pairs(self.d_d)
+        q = self.evaluate_pairs(self.q)
+        d_q = self.evaluate_pairs(self.d_q)
 
-        return np.sum(psi, axis=0)
+        mu_diff = self.mu[i] - self.mu[j]
+        lam_sum = self.lam[i] + self.lam[j]
+        trace_sum = (self.lam.trace(axis1=1, axis2=2)[i] +
+                     self.lam.trace(axis1=1, axis2=2)[j])
 
-    def adp_dipole(self, r, rvec, d):
-        # calculate the dipole contribution
-        mu = np.sum((rvec * d(r)[:, np.newaxis]), axis=0)
+        term1 = mu_diff * d[:, np.newaxis]
 
-        return mu  # sign to agree with lammps
+        term2 = ((np.sum(mu_diff * rvec, axis=1) * d_d / r)[:, np.newaxis] *
+                 rvec)
 
-    def adp_quadrupole(self, r, rvec, q):
-        # slow way of calculating the quadrupole contribution
-        r = np.sqrt(np.sum(rvec ** 2, axis=1))
+        term3 = 2 * np.einsum('pa,pag->pg', rvec, lam_sum) * q[:, np.newaxis]
 
-        lam = np.zeros([rvec.shape[0], 3, 3])
-        qr = q(r)
-        for alpha in range(3):
-            for beta in range(3):
-                lam[:, alpha, beta] += qr * rvec[:, alpha] * rvec[:, beta]
+        term4 = (np.einsum('pa,pab,pb->p', rvec, lam_sum, rvec) *
+                 d_q / r)[:, np.newaxis] * rvec
+
+        term5 = (trace_sum * (d_q * r + 2 * q) / 3.)[:, np.newaxis] * rvec
 
-        return np.sum(lam, axis=0)
+        # the minus for term5 is a correction on the adp
+        # formulation given in the 2005 Mishin Paper and is posted
+        # on the NIST website with the AlH potential
+        return term1 + term2 + term3 + term4 - term5
 
     def deriv(self, spline):
         """Wrapper for extracting the derivative from a spline"""
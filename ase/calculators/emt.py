@@ -6,7 +6,8 @@ import numpy as np
 
 from ase.data import chemical_symbols, atomic_numbers
 from ase.units import Bohr
-from ase.neighborlist import NeighborList
+from ase.neighborlist import (NeighborList, NewPrimitiveNeighborList,
+                              PrimitiveNeighborList)
 from ase.calculators.calculator import (Calculator, all_changes,
                                         PropertyNotImplementedError)
 
@@ -49,13 +50,21 @@ class EMT(Calculator):
     table.  True gives the behaviour of the Asap code and
     older EMT implementations, although the results are not
     bitwise identical.
+
+    The keyword ``method`` selects the engine used to evaluate the
+    potential.  The default, ``'vectorized'``, obtains all pairs at once
+    from :meth:`~ase.neighborlist.NeighborList.get_all_neighbors` and
+    accumulates densities, energies, forces and stress with array
+    operations.
+    ``'loop'`` is the original pair-by-pair implementation, which is
+    much slower but kept as a reference.
     """
     implemented_properties = ['energy', 'free_energy', 'energies', 'forces',
                               'stress', 'magmom', 'magmoms']
 
     nolabel = True
 
-    default_parameters = {'asap_cutoff': False}
+    default_parameters = {'asap_cutoff': False, 'method': 'vectorized'}
 
     def __init__(self, **kwargs):
         Calculator.__init__(self, **kwargs)
@@ -121,8 +130,21 @@ class EMT(Calculator):
         self.sigma1 = np.empty(len(atoms))
         self.deds = np.empty(len(atoms))
 
+        # Per-atom parameter arrays used by the vectorized engine:
+        keys = ['E0', 's0', 'V0', 'eta2', 'kappa', 'lambda', 'n0',
+                'gamma1', 'gamma2']
+        self.par_a = {key: np.array([self.par[Z][key] for Z in self.numbers])
+                      for key in keys}
+
+        # The reference engine keeps the original neighbor list code,
+        # so that it stays an independent check of the vectorized one:
+        if self.parameters.method == 'loop':
+            primitive = PrimitiveNeighborList
+        else:
+            primitive = NewPrimitiveNeighborList
         self.nl = NeighborList([0.5 * self.rc_list] * len(atoms),
-                               self_interaction=False)
+                               self_interaction=False,
+                               primitive=primitive)
 
     def calculate(self, atoms=None, properties=['energy'],
                   system_changes=all_changes):
@@ -131,6 +153,92 @@ class EMT(Calculator):
         if 'numbers' in system_changes:
             self.initialize(self.atoms)
 
+        if self.parameters.method == 'vectorized':
+            self.calculate_vectorized(properties)
+        elif self.parameters.method == 'loop':
+            self.calculate_loop(properties)
+        else:
+            raise ValueError('Unknown EMT method: {}'
+                             .format(self.parameters.method))
+
+        self.results['energy'] = self.energy
+        self.results['energies'] = self.energies
+        self.results['free_energy'] = self.energy
+        self.results['forces'] = self.forces
+
+        if 'stress' in properties:
+            if self.atoms.cell.rank == 3:
+                self.stress += self.stress.T.copy()
+                self.stress *= -0.5 / self.atoms.get_volume()
+                self.results['stress'] = self.stress.flat[[0, 4, 8, 5, 2, 1]]
+            else:
+                raise PropertyNotImplementedError
+
+    def calculate_vectorized(self, properties):
+        """Evaluate the potential with one pass over all pairs.
+
+        Each pair (i, j) of the half neighbor list is used in both
+        directions, and only contributes to atom i in each direction."""
+        natoms = len(self.atoms)
+        p = self.par_a
+
+        self.nl.update(self.atoms)
+        first, j, offsets, D = self.nl.get_all_neighbors(self.atoms)
+        i = np.repeat(np.arange(natoms), np.diff(first))
+        d = np.sqrt((D**2).sum(1))
+        mask = d < self.rc_list
+        i, j, d, D = i[mask], j[mask], d[mask], D[mask]
+        i, j = np.concatenate((i, j)), np.concatenate((j, i))
+        d = np.concatenate((d, d))
+        D = np.concatenate((D, -D))
+
+        x = np.exp(self.acut * (d - self.rc))
+        theta = 1.0 / (1.0 + x)
+        ksi = p['n0'][j] / p['n0'][i]
+
+        # Pair energy and density contributions:
+        y = (0.5 * p['V0'][i] * np.exp(-p['kappa'][j] *
+                                       (d / beta - p['s0'][j])) *
+             ksi / p['gamma2'][i] * theta)
+        s = (np.exp(-p['eta2'][j] * (d - beta * p['s0'][j])) *
+             ksi * theta / p['gamma1'][i])
+        self.sigma1 = np.bincount(i, weights=s, minlength=natoms)
+
+        # Embedding energy; isolated atoms have sigma1 == 0:
+        mask = self.sigma1 > 0.0
+        sigma1 = np.where(mask, self.sigma1, 12.0)
+        ds = -np.log(sigma1 / 12) / (beta * p['eta2'])
+        x1 = p['lambda'] * ds
+        y1 = np.exp(-x1)
+        z = 6 * p['V0'] * np.exp(-p['kappa'] * ds)
+        self.deds = np.where(
+            mask,
+            ((x1 * y1 * p['E0'] * p['lambda'] + p['kappa'] * z) /
+             (sigma1 * beta * p['eta2'])),
+            0.0)
+        self.energies = np.where(mask,
+                                 p['E0'] * ((1 + x1) * y1 - 1) + z,
+                                 -p['E0'])
+        self.energies -= 0.5 * (np.bincount(i, weights=y, minlength=natoms) +
+                                np.bincount(j, weights=y, minlength=natoms))
+        self.energy = self.energies.sum()
+
+        # Pair forces from both the pair term and the embedding term:
+        f = ((y * p['kappa'][j] / beta + y * self.acut * theta * x) -
+             (s * self.deds[i] * p['eta2'][j] +
+              s * self.deds[i] * self.acut * theta * x)) / d
+        F = f[:, np.newaxis] * D
+        self.forces = np.zeros((natoms, 3))
+        for c in range(3):
+            self.forces[:, c] = (
+                np.bincount(i, weights=F[:, c], minlength=natoms) -
+                np.bincount(j, weights=F[:, c], minlength=natoms))
+
+        if 'stress' in properties:
+            self.stress = -np.dot(F.T, D)
+
+    def calculate_loop(self, properties):
+        """Evaluate the potential pair by pair (reference implementation)."""
         positions = self.atoms.positions
         numbers = self.atoms.numbers
         cell = self.atoms.cell
@@ -192,19 +300,6 @@ class EMT(Calculator):
                     p2 = self.par[Z2]
                     self.interact2(a1, a2, d, r, p1, p2, ksi[Z2])
 
-        self.results['energy'] = self.energy
-        self.results['energies'] = self.energies
-        self.results['free_energy'] = self.energy
-        self.results['forces'] = self.forces
-
-        if 'stress' in properties:
-            if self.atoms.cell.rank == 3:
-                self.stress += self.stress.T.copy()
-                self.stress *= -0.5 / self.atoms.get_volume()
-                self.results['stress'] = self.stress.flat[[0, 4, 8, 5, 2, 1]]
-            else:
-                raise PropertyNotImplementedError
-
     def interact1(self, a1, a2, d, r, p1, p2, ksi):
         x = exp(self.acut * (r - self.rc))
         theta = 1.0 / (1.0 + x)
@@ -1,11 +1,16 @@
 import numpy as np
 
-from ase.neighborlist import NeighborList
-from ase.calculators.calculator import Calculator, all_changes
-from ase.stress import full_3x3_to_voigt_6_stress
+from ase.calculators.pairpotential import PairPotential
 
 
-class LennardJones(Calculator):
+def _scale(value, factor):
+    """Scale a pair parameter, which may be a dictionary."""
+    if isinstance(value, dict):
+        return {pair: factor * x for pair, x in value.items()}
+    return factor * value
+
+
+class LennardJones(PairPotential):
     """Lennard Jones potential calculator
 
     see https://en.wikipedia.org/wiki/Lennard-Jones_potential
@@ -50,7 +55,7 @@ class LennardJones(Calculator):
     There is some freedom of choice in assigning atomic energies, i.e.
     choosing a way to partition the total energy into atomic contributions.
 
-    We choose a symmetric approach (`bothways=True` in the neighbor list):
+    We choose a symmetric approach:
 
     ``u_i = 1/2 sum_(j != i) u_ij``
 
@@ -76,6 +81,10 @@ class LennardJones(Calculator):
 
     ``sigma_i  = 1/2 sum_(j != i) f_ij (x) d_ij``
 
+    Since ``u_ij = u_ji`` and ``f_ij = -f_ji``, each pair only has to be
+    evaluated once.  The accumulation over a "half" neighbor list is done
+    by :class:`~ase.calculators.pairpotential.PairPotential`.
+
     Another consideration is the cutoff. We have to ensure that the potential
     goes to zero smoothly as an atom moves across the cutoff threshold,
     otherwise the potential is not continuous. In cases where the cutoff is
@@ -113,10 +122,13 @@ class LennardJones(Calculator):
     This approach is taken from Jax-MD (https://github.com/google/jax-md), which in
     turn is inspired by HOOMD Blue (https://glotzerlab.engin.umich.edu/hoomd-blue/).
 
+    All parameters except *smooth* can also be given per pair of elements
+    as a dictionary, e.g. ``sigma={('Ar', 'Ar'): 3.4, ('Ar', 'Xe'): 3.7,
+    ('Xe', 'Xe'): 4.0}``, see
+    :func:`~ase.calculators.pairpotential.pair_parameter`.
+
     """
 
-    implemented_properties = ['energy', 'energies', 'forces', 'free_energy']
-    implemented_properties += ['stress', 'stresses']  # bulk properties
     default_parameters = {
         'epsilon': 1.0,
         'sigma': 1.0,
@@ -152,102 +164,45 @@ class LennardJones(Calculator):
 
         """
 
-        Calculator.__init__(self, **kwargs)
+        PairPotential.__init__(self, **kwargs)
 
         if self.parameters.rc is None:
-            self.parameters.rc = 3 * self.parameters.sigma
+            self.parameters.rc = _scale(self.parameters.sigma, 3)
 
         if self.parameters.ro is None:
-            self.parameters.ro = 0.66 * self.parameters.rc
-
-        self.nl = None
-
-    def calculate(
-        self,
-        atoms=None,
-        properties=None,
-        system_changes=all_changes,
-    ):
-        if properties is None:
-            properties = self.implemented_properties
-
-        Calculator.calculate(self, atoms, properties, system_changes)
-
-        natoms = len(self.atoms)
-
-        sigma = self.parameters.sigma
-        epsilon = self.parameters.epsilon
-        rc = self.parameters.rc
-        ro = self.parameters.ro
-        smooth = self.parameters.smooth
-
-        if self.nl is None or 'numbers' in system_changes:
-            self.nl = NeighborList(
-                [rc / 2] * natoms, self_interaction=False, bothways=True
+            self.parameters.ro = _scale(self.parameters.rc, 0.66)
+
+    def get_cutoff(self, numbers1, numbers2):
+        return self.get_pair_parameter('rc', numbers1, numbers2)
+
+    def pair_function(self, r, numbers1, numbers2):
+        sigma = self.get_pair_parameter('sigma', numbers1, numbers2)
+        epsilon = self.get_pair_parameter('epsilon', numbers1, numbers2)
+        rc = self.get_pair_parameter('rc', numbers1, numbers2)
+
+        r2 = r ** 2
+        c6 = (sigma ** 2 / r2) ** 3
+        c12 = c6 ** 2
+
+        pairwise_energies = 4 * epsilon * (c12 - c6)
+        pairwise_forces = -24 * epsilon * (2 * c12 - c6) / r2  # du_ij
+
+        if self.parameters.smooth:
+            ro = self.get_pair_parameter('ro', numbers1, numbers2)
+            cutoff_fn = cutoff_function(r2, rc**2, ro**2)
+            d_cutoff_fn = d_cutoff_function(r2, rc**2, ro**2)
+            # order matters, otherwise the pairwise energy is already modified
+            pairwise_forces = (
+                cutoff_fn * pairwise_forces + 2 * d_cutoff_fn * pairwise_energies
             )
-
-        self.nl.update(self.atoms)
-
-        positions = self.atoms.positions
-        cell = self.atoms.cell
-
-        # potential value at rc
-        e0 = 4 * epsilon * ((sigma / rc) ** 12 - (sigma / rc) ** 6)
-
-        energies = np.zeros(natoms)
-        forces = np.zeros((natoms, 3))
-        stresses = np.zeros((natoms, 3, 3))
-
-        for ii in range(natoms):
-            neighbors, offsets = self.nl.get_neighbors(ii)
-            cells = np.dot(offsets, cell)
-
-            # pointing *towards* neighbours
-            distance_vectors = positions[neighbors] + cells - positions[ii]
-
-            r2 = (distance_vectors ** 2).sum(1)
-            c6 = (sigma ** 2 / r2) ** 3
-            c6[r2 > rc ** 2] = 0.0
-            c12 = c6 ** 2
-
-            if smooth:
-                cutoff_fn = cutoff_function(r2, rc**2, ro**2)
-                d_cutoff_fn = d_cutoff_function(r2, rc**2, ro**2)
-
-            pairwise_energies = 4 * epsilon * (c12 - c6)
-            pairwise_forces = -24 * epsilon * (2 * c12 - c6) / r2  # du_ij
-
-            if smooth:
-                # order matters, otherwise the pairwise energy is already modified
-                pairwise_forces = (
-                    cutoff_fn * pairwise_forces + 2 * d_cutoff_fn * pairwise_energies
-                )
-                pairwise_energies *= cutoff_fn
-            else:
-                pairwise_energies -= e0 * (c6 != 0.0)
-
-            pairwise_forces = pairwise_forces[:, np.newaxis] * distance_vectors
-
-            energies[ii] += 0.5 * pairwise_energies.sum()  # atomic energies
-            forces[ii] += pairwise_forces.sum(axis=0)
-
-            stresses[ii] += 0.5 * np.dot(
-                pairwise_forces.T, distance_vectors
-            )  # equivalent to outer product
-
-        # no lattice, no stress
-        if self.atoms.cell.rank == 3:
-            stresses = full_3x3_to_voigt_6_stress(stresses)
-            self.results['stress'] = stresses.sum(axis=0) / self.atoms.get_volume()
-            self.results['stresses'] = stresses / self.atoms.get_volume()
-
-        energy = energies.sum()
-        self.results['energy'] = energy
-        self.results['energies'] = energies
-
-        self.results['free_energy'] = energy
-
-        self.results['forces'] = forces
+            pairwise_energies *= cutoff_fn
+        else:
+            # potential value at rc
+            e0 = 4 * epsilon * ((sigma / rc) ** 12 - (sigma / rc) ** 6)
+            pairwise_energies -= e0
+
+        # the derivative d u_ij / d r_ij
+        return pairwise_energies, pairwise_forces * r
 
 
 def cutoff_function(r, rc, ro):
@@ -1,7 +1,6 @@
 import numpy as np
 
-from ase.calculators.calculator import Calculator
-from ase.neighborlist import neighbor_list
+from ase.calculators.pairpotential import PairPotential
 
 
 def fcut(r, r0, r1):
@@ -28,19 +27,20 @@ def fcut_d(r, r0, r1):
              ((30 * s**4 - 60 * s**3 + 30 * s**2) / (r1 - r0)))
 
 
-class MorsePotential(Calculator):
+class MorsePotential(PairPotential):
     """Morse potential.
 
     Default values chosen to be similar as Lennard-Jones.
+
+    The parameters can also be given per pair of elements as a
+    dictionary, see :func:`~ase.calculators.pairpotential.pair_parameter`.
     """
 
-    implemented_properties = ['energy', 'forces']
     default_parameters = {'epsilon': 1.0,
                           'rho0': 6.0,
                           'r0': 1.0,
                           'rcut1': 1.9,
                           'rcut2': 2.7}
-    nolabel = True
 
     def __init__(self, **kwargs):
         """
@@ -53,36 +53,30 @@ class MorsePotential(Calculator):
         rho0: float
           Exponential prefactor. The force constant in the potential minimum
           is k = 2 * epsilon * (rho0 / r0)**2, default 6.0
+        rcut1: float
+          Onset of the cutoff function in units of r0, default 1.9
+        rcut2: float
+          Cutoff in units of r0, default 2.7
         """
-        Calculator.__init__(self, **kwargs)
-
-    def calculate(self, atoms=None, properties=['energy'],
-                  system_changes=['positions', 'numbers', 'cell',
-                                  'pbc', 'charges', 'magmoms']):
-        Calculator.calculate(self, atoms, properties, system_changes)
-        epsilon = self.parameters.epsilon
-        rho0 = self.parameters.rho0
-        r0 = self.parameters.r0
-        rcut1 = self.parameters.rcut1 * r0
-        rcut2 = self.parameters.rcut2 * r0
-
-        forces = np.zeros((len(self.atoms), 3))
-        preF = - 2 * epsilon * rho0 / r0
+        PairPotential.__init__(self, **kwargs)
 
-        i, j, d, D = neighbor_list('ijdD', atoms, rcut2)
-        dhat = (D / d[:, None]).T
+    def get_cutoff(self, numbers1, numbers2):
+        return (self.get_pair_parameter('rcut2', numbers1, numbers2) *
+                self.get_pair_parameter('r0', numbers1, numbers2))
 
-        expf = np.exp(rho0 * (1.0 - d / r0))
-        fc = fcut(d, rcut1, rcut2)
+    def pair_function(self, r, numbers1, numbers2):
+        epsilon = self.get_pair_parameter('epsilon', numbers1, numbers2)
+        rho0 = self.get_pair_parameter('rho0', numbers1, numbers2)
+        r0 = self.get_pair_parameter('r0', numbers1, numbers2)
+        rcut1 = self.get_pair_parameter('rcut1', numbers1, numbers2) * r0
+        rcut2 = self.get_pair_parameter('rcut2', numbers1, numbers2) * r0
 
-        E = epsilon * expf * (expf - 2)
-        dE = preF * expf * (expf - 1) * dhat
-        energy = 0.5 * (E * fc).sum()
+        preF = - 2 * epsilon * rho0 / r0
+
+        expf = np.exp(rho0 * (1.0 - r / r0))
+        fc = fcut(r, rcut1, rcut2)
 
-        F = (dE * fc + E * fcut_d(d, rcut1, rcut2) * dhat).T
-        for dim in range(3):
-            forces[:, dim] = np.bincount(i, weights=F[:, dim],
-                                         minlength=len(atoms))
+        E = epsilon * expf * (expf - 2)
+        dE = preF * expf * (expf - 1)
 
-        self.results['energy'] = energy
-        self.results['forces'] = forces
+        return E * fc, dE * fc + E * fcut_d(r, rcut1, rcut2)
@@ -0,0 +1,294 @@
+"""Pair potentials evaluated with array operations.
+
+:class:`PairPotential` is a base class for potentials where the energy is
+a sum over pairs of atoms, ``E = sum_(i<j) phi(r_ij)``.  Subclasses only
+provide the pair function and its derivative on flat arrays of distances;
+the neighbor list, the accumulation of energies, forces and stress and the
+atomic energies and stresses are handled here in one pass over all pairs.
+"""
+
+import numpy as np
+from scipy.interpolate import CubicSpline
+
+from ase.calculators.calculator import Calculator, all_changes
+from ase.data import atomic_numbers, chemical_symbols
+from ase.neighborlist import NewPrimitiveNeighborList
+from ase.stress import full_3x3_to_voigt_6_stress
+
+
+def pair_parameter(value, numbers1, numbers2):
+    """Look up a parameter for pairs of atoms.
+
+    value: float or dict
+        Either a single value used for all pairs or a dictionary with a
+        value for each pair of elements.  Elements can be given as
+        symbols or atomic numbers, and the order within a pair does not
+        matter, e.g. ``{('Ar', 'Ar'): 3.4, ('Ar', 'Xe'): 3.7}``.
+    numbers1, numbers2: array of int
+        Atomic numbers of the first and second atom of each pair.
+
+    Returns the value itself or an array with one value per pair."""
+
+    if not isinstance(value, dict):
+        return value
+
+    table = np.full((len(chemical_symbols), len(chemical_symbols)), np.nan)
+    for (Z1, Z2), x in value.items():
+        Z1 = atomic_numbers.get(Z1, Z1)
+        Z2 = atomic_numbers.get(Z2, Z2)
+        table[Z1, Z2] = table[Z2, Z1] = x
+
+    values = table[numbers1, numbers2]
+    missing = np.isnan(values)
+    if missing.any():
+        Z1 = np.asarray(numbers1)[missing].flat[0]
+        Z2 = np.asarray(numbers2)[missing].flat[0]
+        raise ValueError('No parameter for the pair {}-{}'
+                         .format(chemical_symbols[Z1], chemical_symbols[Z2]))
+    return values
+
+
+class PairPotential(Calculator):
+    """Base class for pair potentials.
+
+    Subclasses must implement :meth:`get_cutoff` and
+    :meth:`pair_function`.  Only pairs within the cutoff are passed
+    to :meth:`pair_function`.
+
+    The pairs come from a "half" neighbor list, where every pair (i, j)
+    appears once, with distance vector ``d_ij`` pointing from i to j.
+    With ``u_ij = phi(r_ij)`` and the pairwise force
+    ``f_ij = phi'(r_ij) d_ij / r_ij``,
+    the atomic energies, forces and stresses are::
+
+        u_i = 1/2 sum_(j != i) u_ij
+        f_i = sum_(j != i) f_ij
+        sigma_i = 1/2 sum_(j != i) f_ij (x) d_ij / V
+
+    with `(x)` denoting the outer product.  Each pair is evaluated once and
+    contributes to both of its atoms.
+    """
+
+    implemented_properties = ['energy', 'energies', 'free_energy', 'forces',
+                              'stress', 'stresses']
+    nolabel = True
+
+    #: Skin distance of the neighbor list.
+    skin = 0.3
+
+    def __init__(self, **kwargs):
+        Calculator.__init__(self, **kwargs)
+        self.nl = None
+
+    def reset(self):
+        Calculator.reset(self)
+        self.nl = None
+
+    def get_pair_parameter(self, name, numbers1, numbers2):
+        """Return parameter *name* for the given pairs of atoms.
+
+        See :func:`pair_parameter`."""
+        return pair_parameter(self.parameters[name], numbers1, numbers2)
+
+    def get_cutoff(self, numbers1, numbers2):
+        """Return the cutoff radius for the given pairs of atoms."""
+        raise NotImplementedError
+
+    def pair_function(self, r, numbers1, numbers2):
+        """Return energies phi(r) and derivatives dphi/dr for pairs.
+
+        r: array
+            Distances of the pairs.
+        numbers1, numbers2: array of int
+            Atomic numbers of the first and second atom of each pair."""
+        raise NotImplementedError
+
+    def calculate(self, atoms=None, properties=None,
+                  system_changes=all_changes):
+        if properties is None:
+            properties = self.implemented_properties
+
+        Calculator.calculate(self, atoms, properties, system_changes)
+
+        natoms = len(self.atoms)
+        numbers = self.atoms.numbers
+
+        if self.nl is None or 'numbers' in system_changes:
+            species = np.unique(numbers)
+            Z1, Z2 = np.meshgrid(species, species)
+            if natoms > 0:
+                rc = np.max(self.get_cutoff(Z1.ravel(), Z2.ravel()))
+            else:
+                rc = 0.0
+            self.nl = NewPrimitiveNeighborList(
+                [rc / 2] * natoms, skin=self.skin,
+                self_interaction=False, bothways=False)
+
+        self.nl.update(self.atoms.pbc, self.atoms.get_cell(complete=True),
+                       self.atoms.positions)
+
+        i = self.nl.pair_first
+        j = self.nl.pair_second
+        # pointing *towards* neighbours
+        distance_vectors = (self.atoms.positions[j] -
+                            self.atoms.positions[i] +
+                            np.dot(self.nl.offset_vec, self.atoms.cell))
+        r = np.sqrt((distance_vectors**2).sum(1))
+
+        # the neighbor list includes the skin, so drop distant pairs
+        mask = r <= self.get_cutoff(numbers[i], numbers[j])
+        i = i[mask]
+        j = j[mask]
+        distance_vectors = distance_vectors[mask]
+        r = r[mask]
+
+        pairwise_energies, de = self.pair_function(r, numbers[i], numbers[j])
+        pairwise_forces = (de / r)[:, np.newaxis] * distance_vectors
+
+        energies = 0.5 * (np.bincount(i, pairwise_energies, natoms) +
+                          np.bincount(j, pairwise_energies, natoms))
+
+        forces = np.zeros((natoms, 3))
+        for c in range(3):
+            forces[:, c] = (np.bincount(i, pairwise_forces[:, c], natoms) -
+                            np.bincount(j, pairwise_forces[:, c], natoms))
+
+        # no lattice, no stress
+        if self.atoms.cell.rank == 3:
+            volume = self.atoms.get_volume()
+            # equivalent to sum of outer products
+            stress = np.dot(pairwise_forces.T, distance_vectors)
+            self.results['stress'] = full_3x3_to_voigt_6_stress(
+                stress) / volume
+
+            if 'stresses' in properties:
+                pairwise_stresses = 0.5 * full_3x3_to_voigt_6_stress(
+                    pairwise_forces[:, :, np.newaxis] *
+                    distance_vectors[:, np.newaxis, :])
+                stresses = np.zeros((natoms, 6))
+                for c in range(6):
+                    stresses[:, c] = (
+                        np.bincount(i, pairwise_stresses[:, c], natoms) +
+                        np.bincount(j, pairwise_stresses[:, c], natoms))
+                self.results['stresses'] = stresses / volume
+
+        energy = energies.sum()
+        self.results['energy'] = energy
+        self.results['energies'] = energies
+        self.results['free_energy'] = energy
+        self.results['forces'] = forces
+
+
+class Buckingham(PairPotential):
+    """Buckingham potential.
+
+    ``u_ij = A exp(-r_ij / rho) - C / r_ij^6``
+
+    The pairwise energy is shifted to be zero at the cutoff *rc*.  All
+    parameters can be given per pair of elements, see
+    :func:`~ase.calculators.pairpotential.pair_parameter`.
+    """
+
+    default_parameters = {'A': 1.0, 'rho': 0.3, 'C': 1.0, 'rc': 10.0}
+
+    def __init__(self, **kwargs):
+        """
+        Parameters
+        ----------
+        A: float or dict
+          Prefactor of the repulsive term (eV), default 1.0
+        rho: float or dict
+          Decay length of the repulsive term (Angstrom), default 0.3
+        C: float or dict
+          Prefactor of the dispersion term (eV Angstrom^6), default 1.0
+        rc: float or dict
+          Cutoff (Angstrom), default 10.0
+        """
+        PairPotential.__init__(self, **kwargs)
+
+    def get_cutoff(self, numbers1, numbers2):
+        return self.get_pair_parameter('rc', numbers1, numbers2)
+
+    def pair_function(self, r, numbers1, numbers2):
+        A = self.get_pair_parameter('A', numbers1, numbers2)
+        rho = self.get_pair_parameter('rho', numbers1, numbers2)
+        C = self.get_pair_parameter('C', numbers1, numbers2)
+        rc = self.get_pair_parameter('rc', numbers1, numbers2)
+
+        e0 = A * np.exp(-rc / rho) - C / rc**6
+        repulsion = A * np.exp(-r / rho)
+        energies = repulsion - C / r**6 - e0
+        derivatives = -repulsion / rho + 6 * C / r**7
+        return energies, derivatives
+
+
+class TabulatedPairPotential(PairPotential):
+    """Pair potential interpolated from tabulated values.
+
+    The pairwise energy is a cubic spline through the points
+    (*r*, *energies*).  The table should go smoothly to zero at the
+    cutoff *rc*, which defaults to the last point of *r*.  Different
+    tables for different pairs of elements can be given as a dictionary
+    of energy arrays sampled on the same grid *r*, see
+    :func:`~ase.calculators.pairpotential.pair_parameter`.
+    """
+
+    default_parameters = {'r': None, 'energies': None, 'rc': None}
+
+    def __init__(self, **kwargs):
+        """
+        Parameters
+        ----------
+        r: array
+          Distances of the table (Angstrom).
+        energies: array or dict
+          Pairwise energies at the distances *r* (eV).
+        rc: float, None
+          Cutoff (Angstrom).  Defaults to the last distance of *r*.
+        """
+        PairPotential.__init__(self, **kwargs)
+        for name in ['r', 'energies']:
+            if self.parameters[name] is None:
+                raise ValueError('TabulatedPairPotential needs a table: '
+                                 'missing {!r}'.format(name))
+        if self.parameters.rc is None:
+            self.parameters.rc = self.parameters.r[-1]
+        self.splines = {}
+
+    def reset(self):
+        PairPotential.reset(self)
+        self.splines = {}
+
+    def get_spline(self, Z1, Z2):
+        """Return the spline for a pair of elements."""
+        key = (min(Z1, Z2), max(Z1, Z2))
+        if key not in self.splines:
+            energies = self.parameters.energies
+            if isinstance(energies, dict):
+                tables = {}
+                for (a, b), e in energies.items():
+                    a = atomic_numbers.get(a, a)
+                    b = atomic_numbers.get(b, b)
+                    tables[(min(a, b), max(a, b))] = e
+                if key not in tables:
+                    raise ValueError('No table for the pair {}-{}'
+                                     .format(chemical_symbols[Z1],
+                                             chemical_symbols[Z2]))
+                energies = tables[key]
+            self.splines[key] = CubicSpline(self.parameters.r, energies)
+        return self.splines[key]
+
+    def get_cutoff(self, numbers1, numbers2):
+        return self.get_pair_parameter('rc', numbers1, numbers2)
+
+    def pair_function(self, r, numbers1, numbers2):
+        energies = np.zeros(len(r))
+        derivatives = np.zeros(len(r))
+        pair_types = np.stack([np.minimum(numbers1, numbers2),
+                               np.maximum(numbers1, numbers2)], axis=1)
+        for Z1, Z2 in np.unique(pair_types, axis=0):
+            pairs = (pair_types == (Z1, Z2)).all(axis=1)
+            spline = self.get_spline(Z1, Z2)
+            energies[pairs] = spline(r[pairs])
+            derivatives[pairs] = spline(r[pairs], 1)
+        return energies, derivatives
@@ -1,4 +1,5 @@
 import functools
+import itertools
 import json
 import numbers
 import operator
@@ -87,6 +88,11 @@ reserved_keys = set(all_properties +
 
 numeric_keys = set(['id', 'energy', 'magmom', 'charge', 'natoms'])
 
+# Columns of the systems table that select_columns() can return:
+scalar_columns = ['id', 'unique_id', 'ctime', 'mtime', 'user', 'calculator',
+                  'energy', 'free_energy', 'magmom', 'natoms', 'fmax',
+                  'smax', 'volume', 'mass', 'charge']
+
 
 def check(key_value_pairs):
     for key, value in key_value_pairs.items():
@@ -122,6 +128,34 @@ def check(key_value_pairs):
                         'to a different string.')
 
 
+def zip_rows(images, key_value_pairs, data):
+    """Zip images with per-row (or shared) key-value pairs and data.
+
+    Raises ValueError if the lengths do not match."""
+    columns = []
+    for name, values in [('key_value_pairs', key_value_pairs),
+                         ('data', data)]:
+        if isinstance(values, dict):
+            columns.append((name, itertools.repeat(values), False))
+        else:
+            columns.append((name, iter(values), True))
+
+    for atoms in images:
+        row = [atoms]
+        for name, values, _ in columns:
+            try:
+                row.append(next(values))
+            except StopIteration:
+                raise ValueError('Fewer {} than images'
+                                 .format(name)) from None
+        yield tuple(row)
+
+    missing = object()
+    for name, values, finite in columns:
+        if finite and next(values, missing) is not missing:
+            raise ValueError('More {} than images'.format(name))
+
+
 def str_represents(value, t=int):
     try:
         t(value)
@@ -204,6 +238,38 @@ def lock(method):
     return new_method
 
 
+def parse_sort(sort):
+    """Convert age and user to the names of the columns to sort after."""
+    if sort:
+        if sort == 'age':
+            sort = '-ctime'
+        elif sort == '-age':
+            sort = 'ctime'
+        elif sort.lstrip('-') == 'user':
+            sort += 'name'
+    return sort
+
+
+def column_to_array(name, values):
+    """Convert list of values to ndarray.
+
+    Numbers are converted to a float array with NaN for missing values
+    (integer array for id and natoms) and everything else (always for
+    unique_id, user and calculator) to an object array with None for
+    missing values."""
+    if name in ['id', 'natoms']:
+        return np.array(values, dtype=int)
+    if (name not in ['unique_id', 'user', 'calculator'] and
+        not any(isinstance(value, str) for value in values)):
+        try:
+            return np.array(values, dtype=float)
+        except (TypeError, ValueError):
+            pass
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
 def convert_str_to_int_float_or_str(value):
     """Safe eval()"""
     try:
@@ -353,6 +419,52 @@ class Database:
         check(key_value_pairs)
         return 1
 
+    @parallel_function
+    @lock
+    def write_many(self, images, key_value_pairs={}, data={},
+                   defer_indices=False, verbosity=0):
+        """Write many rows to database in one go.
+
+        This is much faster than calling write() for each row.  The SQL
+        backends write everything in a single transaction and insert the
+        rows of the key-value and species tables in batches.  The JSON
+        backend reads and writes its file only once.  If one of the rows
+        fails, none of them are written.
+
+        images: iterable of Atoms or AtomsRow objects
+            Atoms to write.
+        key_value_pairs: dict or iterable of dict
+            Key-value pairs for all rows or one dictionary for each row.
+        data: dict or iterable of dict
+            Extra stuff for all rows or one dictionary for each row.
+            A ValueError is raised if the number of dictionaries in
+            key_value_pairs or data does not match the number of images.
+        defer_indices: bool
+            Drop the indices while writing and create them again at the
+            end.  Faster when adding many rows to a database that already
+            has many rows.
+        verbosity: int
+            Use verbosity=1 to print the number of rows written per second.
+
+        Returns list of integer ids of the new rows.
+        """
+
+        rows = ((Atoms() if atoms is None else atoms, dict(kvp), dct)
+                for atoms, kvp, dct in zip_rows(images, key_value_pairs,
+                                                data))
+
+        t0 = time()
+        ids = self._write_many(rows, defer_indices)
+        t = time() - t0
+        if verbosity > 0:
+            print('Wrote {} rows in {:.3f} seconds ({:.0f} rows/s)'
+                  .format(len(ids), t, len(ids) / max(t, 1e-9)))
+        return ids
+
+    def _write_many(self, rows, defer_indices):
+        return [self._write(atoms, kvp, dct, None)
+                for atoms, kvp, dct in rows]
+
     @parallel_function
     @lock
     def reserve(self, **key_value_pairs):
@@ -471,14 +583,7 @@ class Database:
             queries can be speeded up by setting columns=['id', 'energy'].
         """
 
-        if sort:
-            if sort == 'age':
-                sort = '-ctime'
-            elif sort == '-age':
-                sort = 'ctime'
-            elif sort.lstrip('-') == 'user':
-                sort += 'name'
-
+        sort = parse_sort(sort)
         keys, cmps = parse_selection(selection, **kwargs)
         for row in self._select(keys, cmps, explain=explain,
                                 verbosity=verbosity,
@@ -488,6 +593,68 @@ class Database:
             if filter is None or filter(row):
                 yield row
 
+    @parallel_function
+    def select_columns(self, selection=None, columns=None, sort=None,
+                       limit=None, offset=0, structured=False, **kwargs):
+        """Select columns of rows as NumPy arrays.
+
+        This is much faster than select() when only a few numbers are
+        needed from each row, because no AtomsRow objects are created.
+        For SQL databases, only the requested columns are read.
+
+        selection: int, str or list
+            See the select() method.
+        columns: list of str
+            Names of key-value pairs or of the columns id, unique_id,
+            ctime, mtime, user, calculator, energy, free_energy, magmom,
+            natoms, fmax, smax, volume, mass and charge.
+        sort: str
+            Sort rows after key.  Prepend with minus sign for a decending sort.
+        limit: int or None
+            Limit selection.
+        offset: int
+            Offset into selected rows.
+        structured: bool
+            Return a structured array instead of a dictionary of arrays.
+
+        Numbers are returned as float arrays with NaN for missing values,
+        except id and natoms, which are integer arrays.  Other values are
+        returned as object arrays with None for missing values::
+
+            d = db.select_columns('H>0', ['energy', 'bandgap'])
+            print(d['energy'].mean())
+        """
+
+        if not columns:
+            raise ValueError('No columns given')
+        columns = list(dict.fromkeys(columns))
+        for name in columns:
+            if name in reserved_keys and name not in scalar_columns:
+                raise ValueError('Can not select {!r} column'.format(name))
+
+        keys, cmps = parse_selection(selection, **kwargs)
+        values = self._select_columns(keys, cmps, columns, parse_sort(sort),
+                                      limit, offset)
+        arrays = {name: column_to_array(name, values[name])
+                  for name in columns}
+        if not structured:
+            return arrays
+
+        array = np.empty(len(arrays[columns[0]]),
+                         dtype=[(name, a.dtype) for name, a in arrays.items()])
+        for name, a in arrays.items():
+            array[name] = a
+        return array
+
+    def _select_columns(self, keys, cmps, columns, sort, limit, offset):
+        """Return dictionary with list of values for each column."""
+        values = {name: [] for name in columns}
+        for row in self._select(keys, cmps, limit=limit, offset=offset,
+                                sort=sort, include_data=False):
+            for name in columns:
+                values[name].append(row.get(name))
+        return values
+
     def count(self, selection=None, **kwargs):
         """Count rows.
 
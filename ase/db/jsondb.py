@@ -20,17 +20,42 @@ class JSONDatabase(Database):
     def _write(self, atoms, key_value_pairs, data, id):
         Database._write(self, atoms, key_value_pairs, data)
 
-        bigdct = {}
-        ids = []
-        nextid = 1
+        bigdct, ids, nextid = self._read_existing()
 
+        if id is None:
+            id = nextid
+            ids.append(id)
+            nextid += 1
+        else:
+            assert id in bigdct
+
+        bigdct[id] = self._row_to_dict(atoms, key_value_pairs, data)
+        self._write_json(bigdct, ids, nextid)
+        return id
+
+    def _write_many(self, rows, defer_indices):
+        # Read and write the file only once.  Nothing is written if one
+        # of the rows fails.
+        bigdct, ids, nextid = self._read_existing()
+        newids = []
+        for atoms, key_value_pairs, data in rows:
+            Database._write(self, atoms, key_value_pairs, data)
+            bigdct[nextid] = self._row_to_dict(atoms, key_value_pairs, data)
+            newids.append(nextid)
+            nextid += 1
+        self._write_json(bigdct, ids + newids, nextid)
+        return newids
+
+    def _read_existing(self):
         if (isinstance(self.filename, str) and
             os.path.isfile(self.filename)):
             try:
-                bigdct, ids, nextid = self._read_json()
+                return self._read_json()
             except (SyntaxError, ValueError):
                 pass
+        return {}, [], 1
 
+    def _row_to_dict(self, atoms, key_value_pairs, data):
         mtime = now()
 
         if isinstance(atoms, AtomsRow):
@@ -41,8 +66,8 @@ class JSONDatabase(Database):
             row.user = os.getenv('USER')
 
         dct = {}
-        for key in row.__dict__:
-            if key[0] == '_' or key in row._keys or key == 'id':
+        for key in row:
+            if key in row._keys or key == 'id':
                 continue
             dct[key] = row[key]
 
@@ -58,16 +83,7 @@ class JSONDatabase(Database):
         if constraints:
             dct['constraints'] = constraints
 
-        if id is None:
-            id = nextid
-            ids.append(id)
-            nextid += 1
-        else:
-            assert id in bigdct
-
-        bigdct[id] = dct
-        self._write_json(bigdct, ids, nextid)
-        return id
+        return dct
 
     def _read_json(self):
         if isinstance(self.filename, str):
@@ -91,6 +91,9 @@ class MySQLCursor:
     def fetchall(self):
         return self.cur.fetchall()
 
+    def fetchmany(self, size):
+        return self.cur.fetchmany(size)
+
     def _replace_nan_inf_kvp(self, values):
         for item in values:
             if not np.isfinite(item[1]):
@@ -225,6 +228,10 @@ class MySQLDatabase(SQLite3Database):
         last_id = cur.fetchone()[0]
         return last_id
 
+    def _get_indices(self, cur):
+        # No indices are created for MySQL
+        return []
+
     def create_select_statement(self, keys, cmps,
                                 sort=None, order=None, sort_table=None,
                                 what='systems.*'):
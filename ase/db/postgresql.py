@@ -60,6 +60,9 @@ class Cursor:
     def fetchall(self):
         return self.cur.fetchall()
 
+    def fetchmany(self, size):
+        return self.cur.fetchmany(size)
+
     def execute(self, statement, *args):
         self.cur.execute(statement.replace('?', '%s'), *args)
 
@@ -178,6 +181,16 @@ class PostgreSQLDatabase(SQLite3Database):
         id = cur.fetchone()[0]
         return int(id)
 
+    def _get_indices(self, cur):
+        names = [statement.split()[2]
+                 for statement in index_statements + jsonb_indices]
+        cur.execute('SELECT indexname, indexdef FROM pg_indexes '
+                    'WHERE schemaname = current_schema() AND '
+                    'indexname IN ({})'
+                    .format(', '.join("'{}'".format(name)
+                                      for name in names)))
+        return cur.fetchall()
+
 
 def schema_update(sql):
     for a, b in [('REAL', 'DOUBLE PRECISION'),
@@ -1,5 +1,5 @@
 from random import randint
-from typing import Dict, Tuple, Any
+from typing import Any, Dict, Tuple
 
 import numpy as np
 
@@ -66,7 +66,13 @@ def atoms2dict(atoms):
 
 
 class AtomsRow:
-    def __init__(self, dct):
+    # Values decoded on first access.  Maps names to tuples of a
+    # function and its arguments (see __getattr__):
+    _lazy: Dict[str, Tuple[Any, ...]] = {}
+
+    def __init__(self, dct, lazy=None):
+        if lazy:
+            self._lazy = dict(lazy)
         if isinstance(dct, dict):
             dct = dct.copy()
             if 'calculator_parameters' in dct:
@@ -77,7 +83,7 @@ class AtomsRow:
                         dct['calculator_parameters'])
         else:
             dct = atoms2dict(dct)
-        assert 'numbers' in dct
+        assert 'numbers' in dct or 'numbers' in self._lazy
         self._constraints = dct.pop('constraints', [])
         self._constrained_forces = None
         self._data = dct.pop('data', {})
@@ -85,16 +91,31 @@ class AtomsRow:
         self._keys = list(kvp.keys())
         self.__dict__.update(kvp)
         self.__dict__.update(dct)
-        if 'cell' not in dct:
+        if 'cell' not in self:
             self.cell = np.zeros((3, 3))
-        if 'pbc' not in dct:
+        if 'pbc' not in self:
             self.pbc = np.zeros(3, bool)
 
+    def __getattr__(self, key):
+        if key in self._lazy:
+            func, *args = self._lazy.pop(key)
+            value = func(*args)
+            setattr(self, key, value)
+            return value
+        raise AttributeError("'AtomsRow' object has no attribute '{}'"
+                             .format(key))
+
+    def __getstate__(self):
+        for key in list(self._lazy):
+            getattr(self, key)
+        return self.__dict__
+
     def __contains__(self, key):
-        return key in self.__dict__
+        return key in self.__dict__ or key in self._lazy
 
     def __iter__(self):
-        return (key for key in self.__dict__ if key[0] != '_')
+        keys = [key for key in self.__dict__ if key[0] != '_']
+        return iter(keys + list(self._lazy))
 
     def get(self, key, default=None):
         """Return value of key if present or default if not."""
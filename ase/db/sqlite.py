@@ -28,7 +28,7 @@ from ase.data import atomic_numbers
 from ase.calculators.calculator import all_properties
 from ase.db.row import AtomsRow
 from ase.db.core import (Database, ops, now, lock, invop, parse_selection,
-                         object_to_bytes, bytes_to_object)
+                         object_to_bytes, bytes_to_object, scalar_columns)
 from ase.parallel import parallel_function
 
 VERSION = 9
@@ -111,6 +111,22 @@ index_statements = [
 all_tables = ['systems', 'species', 'keys',
               'text_key_values', 'number_key_values']
 
+# Array columns of the systems table: index, name, dtype and shape.
+# The first three are always present.
+lazy_columns = [(5, 'numbers', np.int32, None),
+                (6, 'positions', float, (-1, 3)),
+                (7, 'cell', float, (3, 3)),
+                (9, 'initial_magmoms', float, None),
+                (10, 'initial_charges', float, None),
+                (11, 'masses', float, None),
+                (12, 'tags', np.int32, None),
+                (13, 'momenta', float, (-1, 3)),
+                (19, 'forces', float, (-1, 3)),
+                (20, 'stress', float, None),
+                (21, 'dipole', float, None),
+                (22, 'magmoms', float, None),
+                (24, 'charges', float, None)]
+
 
 def float_if_not_none(x):
     """Convert numpy.float64 to float - old db-interfaces need that."""
@@ -125,6 +141,8 @@ class SQLite3Database(Database):
     default = 'NULL'  # used for autoincrement id
     connection = None
     version = None
+    #: Number of rows read from the database at a time by select().
+    fetch_size = 1000
     columnnames = [line.split()[0].lstrip()
                    for line in init_statements[0].splitlines()[1:]]
 
@@ -257,6 +275,75 @@ class SQLite3Database(Database):
         ext_tables = key_value_pairs.pop("external_tables", {})
         Database._write(self, atoms, key_value_pairs, data)
 
+        with self.managed_connection() as con:
+            cur = con.cursor()
+            tables = {name: [] for name in all_tables[1:]}
+            id = self._insert_row(cur, atoms, key_value_pairs, data, id,
+                                  ext_tables, tables)
+            self._insert_key_values(cur, tables)
+
+        return id
+
+    def _write_many(self, rows, defer_indices):
+        if self.connection is None:
+            # Use a single connection and transaction for all rows:
+            with self:
+                return self._write_many(rows, defer_indices)
+
+        ids = []
+        with self.managed_connection() as con:
+            cur = con.cursor()
+            if defer_indices:
+                indices = self._get_indices(cur)
+                for name, statement in indices:
+                    cur.execute('DROP INDEX {}'.format(name))
+
+            tables = {name: [] for name in all_tables[1:]}
+            for atoms, key_value_pairs, data in rows:
+                ext_tables = key_value_pairs.pop('external_tables', {})
+                Database._write(self, atoms, key_value_pairs, data)
+                id = self._insert_row(cur, atoms, key_value_pairs, data,
+                                      None, ext_tables, tables)
+                ids.append(id)
+                if len(ids) % 1000 == 0:
+                    self._insert_key_values(cur, tables)
+            self._insert_key_values(cur, tables)
+
+            if defer_indices:
+                for name, statement in indices:
+                    cur.execute(statement)
+
+        return ids
+
+    def _get_indices(self, cur):
+        """Return names and CREATE statements of the indices."""
+        cur.execute('SELECT name, sql FROM sqlite_master '
+                    "WHERE type = 'index' AND sql IS NOT NULL AND "
+                    'tbl_name IN ({})'
+                    .format(', '.join("'{}'".format(table)
+                                      for table in all_tables)))
+        return cur.fetchall()
+
+    def _insert_key_values(self, cur, tables):
+        """Insert and clear the rows collected by _insert_row()."""
+        cur.executemany('INSERT INTO species VALUES (?, ?, ?)',
+                        tables['species'])
+        cur.executemany('INSERT INTO text_key_values VALUES (?, ?, ?)',
+                        tables['text_key_values'])
+        cur.executemany('INSERT INTO number_key_values VALUES (?, ?, ?)',
+                        tables['number_key_values'])
+        cur.executemany('INSERT INTO keys VALUES (?, ?)', tables['keys'])
+        for rows in tables.values():
+            rows.clear()
+
+    def _insert_row(self, cur, atoms, key_value_pairs, data, id,
+                    ext_tables, tables):
+        """Write row to systems table.
+
+        The rows for the species and key-value tables are appended to
+        the lists in *tables* and must be inserted afterwards with
+        _insert_key_values().  Returns the id of the row."""
+
         mtime = now()
 
         encode = self.encode
@@ -312,69 +399,56 @@ class SQLite3Database(Database):
         if not data:
             data = row._data
 
-        with self.managed_connection() as con:
-            if not isinstance(data, (str, bytes)):
-                data = encode(data, binary=self.version >= 9)
-
-            values += (row.get('energy'),
-                       row.get('free_energy'),
-                       blob(row.get('forces')),
-                       blob(row.get('stress')),
-                       blob(row.get('dipole')),
-                       blob(row.get('magmoms')),
-                       row.get('magmom'),
-                       blob(row.get('charges')),
-                       encode(key_value_pairs),
-                       data,
-                       len(row.numbers),
-                       float_if_not_none(row.get('fmax')),
-                       float_if_not_none(row.get('smax')),
-                       float_if_not_none(row.get('volume')),
-                       float(row.mass),
-                       float(row.charge))
-
-            cur = con.cursor()
-            if id is None:
-                q = self.default + ', ' + ', '.join('?' * len(values))
-                cur.execute('INSERT INTO systems VALUES ({})'.format(q),
-                            values)
-                id = self.get_last_id(cur)
+        if not isinstance(data, (str, bytes)):
+            data = encode(data, binary=self.version >= 9)
+
+        values += (row.get('energy'),
+                   row.get('free_energy'),
+                   blob(row.get('forces')),
+                   blob(row.get('stress')),
+                   blob(row.get('dipole')),
+                   blob(row.get('magmoms')),
+                   row.get('magmom'),
+                   blob(row.get('charges')),
+                   encode(key_value_pairs),
+                   data,
+                   len(row.numbers),
+                   float_if_not_none(row.get('fmax')),
+                   float_if_not_none(row.get('smax')),
+                   float_if_not_none(row.get('volume')),
+                   float(row.mass),
+                   float(row.charge))
+
+        if id is None:
+            q = self.default + ', ' + ', '.join('?' * len(values))
+            cur.execute('INSERT INTO systems VALUES ({})'.format(q),
+                        values)
+            id = self.get_last_id(cur)
+        else:
+            self._delete(cur, [id], ['keys', 'text_key_values',
+                                     'number_key_values', 'species'])
+            q = ', '.join(name + '=?' for name in self.columnnames[1:])
+            cur.execute('UPDATE systems SET {} WHERE id=?'.format(q),
+                        values + (id,))
+
+        count = row.count_atoms()
+        tables['species'] += [(atomic_numbers[symbol], n, id)
+                              for symbol, n in count.items()]
+
+        for key, value in key_value_pairs.items():
+            if isinstance(value, (numbers.Real, np.bool_)):
+                tables['number_key_values'].append([key, float(value), id])
             else:
-                self._delete(cur, [id], ['keys', 'text_key_values',
-                                         'number_key_values', 'species'])
-                q = ', '.join(name + '=?' for name in self.columnnames[1:])
-                cur.execute('UPDATE systems SET {} WHERE id=?'.format(q),
-                            values + (id,))
-
-            count = row.count_atoms()
-            if count:
-                species = [(atomic_numbers[symbol], n, id)
-                           for symbol, n in count.items()]
-                cur.executemany('INSERT INTO species VALUES (?, ?, ?)',
-                                species)
-
-            text_key_values = []
-            number_key_values = []
-            for key, value in key_value_pairs.items():
-                if isinstance(value, (numbers.Real, np.bool_)):
-                    number_key_values.append([key, float(value), id])
-                else:
-                    assert isinstance(value, str)
-                    text_key_values.append([key, value, id])
-
-            cur.executemany('INSERT INTO text_key_values VALUES (?, ?, ?)',
-                            text_key_values)
-            cur.executemany('INSERT INTO number_key_values VALUES (?, ?, ?)',
-                            number_key_values)
-            cur.executemany('INSERT INTO keys VALUES (?, ?)',
-                            [(key, id) for key in key_value_pairs])
+                assert isinstance(value, str)
+                tables['text_key_values'].append([key, value, id])
+            tables['keys'].append((key, id))
 
-            # Insert entries in the valid tables
-            for tabname in ext_tables.keys():
-                entries = ext_tables[tabname]
-                entries['id'] = id
-                self._insert_in_external_table(
-                    cur, name=tabname, entries=ext_tables[tabname])
+        # Insert entries in the valid tables
+        for tabname in ext_tables.keys():
+            entries = ext_tables[tabname]
+            entries['id'] = id
+            self._insert_in_external_table(
+                cur, name=tabname, entries=ext_tables[tabname])
 
         return id
 
@@ -448,7 +522,7 @@ class SQLite3Database(Database):
 
         return self._convert_tuple_to_row(values)
 
-    def _convert_tuple_to_row(self, values):
+    def _convert_tuple_to_row(self, values, external_tables=None):
         deblob = self.deblob
         decode = self.decode
 
@@ -457,23 +531,15 @@ class SQLite3Database(Database):
                'unique_id': values[1],
                'ctime': values[2],
                'mtime': values[3],
-               'user': values[4],
-               'numbers': deblob(values[5], np.int32),
-               'positions': deblob(values[6], shape=(-1, 3)),
-               'cell': deblob(values[7], shape=(3, 3))}
+               'user': values[4]}
+
+        # The arrays are decoded when first accessed:
+        lazy = {name: (deblob, values[i], dtype, shape)
+                for i, name, dtype, shape in lazy_columns
+                if values[i] is not None or i < 8}
 
         if values[8] is not None:
             dct['pbc'] = (values[8] & np.array([1, 2, 4])).astype(bool)
-        if values[9] is not None:
-            dct['initial_magmoms'] = deblob(values[9])
-        if values[10] is not None:
-            dct['initial_charges'] = deblob(values[10])
-        if values[11] is not None:
-            dct['masses'] = deblob(values[11])
-        if values[12] is not None:
-            dct['tags'] = deblob(values[12], np.int32)
-        if values[13] is not None:
-            dct['momenta'] = deblob(values[13], shape=(-1, 3))
         if values[14] is not None:
             dct['constraints'] = values[14]
         if values[15] is not None:
@@ -484,32 +550,20 @@ class SQLite3Database(Database):
             dct['energy'] = values[17]
         if values[18] is not None:
             dct['free_energy'] = values[18]
-        if values[19] is not None:
-            dct['forces'] = deblob(values[19], shape=(-1, 3))
-        if values[20] is not None:
-            dct['stress'] = deblob(values[20])
-        if values[21] is not None:
-            dct['dipole'] = deblob(values[21])
-        if values[22] is not None:
-            dct['magmoms'] = deblob(values[22])
         if values[23] is not None:
             dct['magmom'] = values[23]
-        if values[24] is not None:
-            dct['charges'] = deblob(values[24])
         if values[25] != '{}':
             dct['key_value_pairs'] = decode(values[25])
         if len(values) >= 27 and values[26] != 'null':
             dct['data'] = decode(values[26], lazy=True)
 
         # Now we need to update with info from the external tables
-        external_tab = self._get_external_table_names()
-        tables = {}
-        for tab in external_tab:
-            row = self._read_external_table(tab, dct["id"])
-            tables[tab] = row
+        if external_tables is None:
+            external_tables = self._get_external_table_names()
+        for tab in external_tables:
+            dct[tab] = self._read_external_table(tab, dct['id'])
 
-        dct.update(tables)
-        return AtomsRow(dct)
+        return AtomsRow(dct, lazy)
 
     def _old2new(self, values):
         if self.type == 'postgresql':
@@ -670,8 +724,11 @@ class SQLite3Database(Database):
                          for name in
                          np.array(self.columnnames)[np.array(columnindex)])
 
-        sql, args = self.create_select_statement(keys, cmps, sort, order,
-                                                 sort_table, what)
+        # Only the ids are selected here.  The full rows are read
+        # in batches by _fetch_rows():
+        sql, args = self.create_select_statement(
+            keys, cmps, sort, order, sort_table,
+            what if explain else 'systems.id')
 
         if explain:
             sql = 'EXPLAIN QUERY PLAN ' + sql
@@ -686,16 +743,18 @@ class SQLite3Database(Database):
             print(sql, args)
 
         with self.managed_connection() as con:
-            cur = con.cursor()
-            cur.execute(sql, args)
             if explain:
+                cur = con.cursor()
+                cur.execute(sql, args)
                 for row in cur.fetchall():
                     yield {'explain': row}
             else:
+                external_tables = self._get_external_table_names()
                 n = 0
-                for shortvalues in cur.fetchall():
+                for shortvalues in self._fetch_rows(con, sql, args, what):
                     values[columnindex] = shortvalues
-                    yield self._convert_tuple_to_row(tuple(values))
+                    yield self._convert_tuple_to_row(tuple(values),
+                                                     external_tables)
                     n += 1
 
                 if sort and sort_table != 'systems':
@@ -710,6 +769,87 @@ class SQLite3Database(Database):
                                             columns=columns):
                         yield row
 
+    def _fetch_rows(self, con, sql, args, what):
+        """Yield rows in the order of the ids selected by *sql*.
+
+        The ids are read first and the columns in *what* are then
+        read fetch_size rows at a time.  No cursor is left open while
+        rows are yielded, so the database can be written to while
+        iterating over a selection."""
+        cur = con.cursor()
+        cur.execute(sql, args)
+        ids = []
+        while True:
+            batch = cur.fetchmany(self.fetch_size)
+            if not batch:
+                break
+            ids.append(np.array(batch, dtype=np.int64).reshape(-1))
+        if not ids:
+            return
+        ids = np.concatenate(ids)
+
+        for i in range(0, len(ids), self.fetch_size):
+            batch = ids[i:i + self.fetch_size].tolist()
+            cur.execute(
+                'SELECT {}, systems.id FROM systems WHERE systems.id IN ({})'
+                .format(what, ', '.join(str(id) for id in batch)))
+            rows = {values[-1]: values[:-1] for values in cur.fetchall()}
+            for id in batch:
+                values = rows.get(id)
+                if values is not None:  # row deleted while iterating
+                    yield values
+
+    def _select_columns(self, keys, cmps, columns, sort, limit, offset):
+        if self.version < 6 or (sort and
+                                sort.lstrip('-') not in self.columnnames):
+            # Old magmom column or sorting after a key-value pair:
+            return Database._select_columns(self, keys, cmps, columns,
+                                            sort, limit, offset)
+
+        order = None
+        if sort:
+            if sort[0] == '-':
+                order = 'DESC'
+                sort = sort[1:]
+            else:
+                order = 'ASC'
+
+        names = ['id'] + [name for name in columns
+                          if name in scalar_columns and name != 'id']
+        what = ', '.join('systems.' + ('username' if name == 'user' else name)
+                         for name in names)
+        sql, args = self.create_select_statement(keys, cmps, sort, order,
+                                                 'systems', what)
+        if limit:
+            sql += '\nLIMIT {0}'.format(limit)
+        if offset:
+            sql += self.get_offset_string(offset, limit=limit)
+
+        with self.managed_connection() as con:
+            cur = con.cursor()
+            cur.execute(sql, args)
+            rows = cur.fetchall()
+            if not rows:
+                return {name: [] for name in columns}
+
+            values = {name: list(column)
+                      for name, column in zip(names, zip(*rows))}
+            ids = values['id']
+            for key in columns:
+                if key in values:
+                    continue
+                key_values = {}
+                for table in ['number_key_values', 'text_key_values']:
+                    sql = 'SELECT id, value FROM {} WHERE key=?'.format(table)
+                    if len(ids) < self.fetch_size:
+                        sql += ' AND id IN ({})'.format(
+                            ', '.join(str(id) for id in ids))
+                    cur.execute(sql, [key])
+                    key_values.update(cur.fetchall())
+                values[key] = [key_values.get(id) for id in ids]
+
+        return values
+
     def get_offset_string(self, offset, limit=None):
         sql = ''
         if not limit:
@@ -1,7 +1,6 @@
 import numpy as np
 from itertools import combinations_with_replacement
 from math import erf
-from scipy.spatial.distance import cdist
 from ase.neighborlist import NeighborList
 from ase.utils import pbc2pbc
 
@@ -303,7 +302,6 @@ class OFPComparator:
 
         pos = atoms.get_positions()
         num = atoms.get_atomic_numbers()
-        cell = atoms.get_cell()
 
         unique_types = np.unique(num)
         posdic = {}
@@ -345,6 +343,10 @@ class OFPComparator:
         nl = NeighborList([self.rcut / 2.] * len(a), skin=0.,
                           self_interaction=False, bothways=True)
         nl.update(a)
+        first_neigh, neighbors, offsets = nl.get_all_neighbors()
+        first = np.repeat(np.arange(len(a)), np.diff(first_neigh))
+        p = pos[neighbors] + np.dot(offsets, atoms.get_cell())
+        distances = np.sqrt(((p - pos[first])**2).sum(1))
 
         # parameters for the binning:
         m = int(np.ceil(self.nsigma * self.sigma / self.binwidth))
@@ -368,10 +370,9 @@ class OFPComparator:
                 weights = 1. / surface_area_0d(bindist)
             weights /= self.binwidth
 
-            indices, offsets = nl.get_neighbors(index)
-            valid = np.where(num[indices] == unique_type)
-            p = pos[indices[valid]] + np.dot(offsets[valid], cell)
-            r = cdist(p, [pos[index]])
+            start, end = first_neigh[index], first_neigh[index + 1]
+            valid = num[neighbors[start:end]] == unique_type
+            r = distances[start:end][valid]
             bins = np.floor(r / self.binwidth)
 
             for i in range(-m, m + 1):
@@ -385,8 +386,7 @@ class OFPComparator:
                     0.5 * erf(c * (2 * i - 1))
                 values /= smearing_norm
 
-                for j, valid_bin in enumerate(valid_bins):
-                    rdf[valid_bin] += values[j]
+                np.add.at(rdf, valid_bins, values)
 
             rdf /= len(typedic[unique_type]) * 1. / volume
             return rdf
@@ -6,7 +6,6 @@ from ase.data import covalent_radii
 from ase.neighborlist import NeighborList
 from ase.ga.offspring_creator import OffspringCreator
 from ase.ga.utilities import atoms_too_close, gather_atoms_by_tag
-from scipy.spatial.distance import cdist
 
 
 class TagFilter:
@@ -85,17 +84,21 @@ class PairwiseHarmonicPotential:
     def get_forces(self, atoms):
         pos = atoms.get_positions()
         cell = atoms.get_cell()
+        nat = len(pos)
         forces = np.zeros_like(pos)
-
-        for i, p in enumerate(pos):
-            indices, offsets = self.nl.get_neighbors(i)
-            p = pos[indices] + np.dot(offsets, cell)
-            r = cdist(p, [pos[i]])
-            v = (p - pos[i]) / r
-            p0 = self.pos0[indices] + np.dot(offsets, cell)
-            r0 = cdist(p0, [self.pos0[i]])
-            dr = r - r0
-            forces[i] = np.dot(self.force_constants[i].T, dr * v)
+        if nat == 0:
+            return forces
+
+        first, indices, offsets = self.nl.get_all_neighbors()
+        i = np.repeat(np.arange(nat), np.diff(first))
+        shifts = np.dot(offsets, cell)
+        D = pos[indices] + shifts - pos[i]
+        r = np.sqrt((D**2).sum(1))
+        D0 = self.pos0[indices] + shifts - self.pos0[i]
+        r0 = np.sqrt((D0**2).sum(1))
+        f = np.concatenate(self.force_constants) * (r - r0) / r
+        for c in range(3):
+            forces[:, c] = np.bincount(i, f * D[:, c], minlength=nat)
 
         return forces
 
@@ -136,43 +139,27 @@ class BondElectroNegativityModel(PairwiseHarmonicPotential):
       __ https://dx.doi.org/10.1103/PhysRevB.84.092103
     """
     def calculate_force_constants(self):
-        cell = self.atoms.get_cell()
-        pos = self.atoms.get_positions()
         num = self.atoms.get_atomic_numbers()
         nat = len(self.atoms)
-        nl = self.nl
+
+        first, j, offsets, D = self.nl.get_all_neighbors(self.atoms)
+        i = np.repeat(np.arange(nat), np.diff(first))
+        r = np.sqrt((D**2).sum(1))
 
         # computing the force constants
-        s_norms = []
-        valence_states = []
-        r_cov = []
-        for i in range(nat):
-            indices, offsets = nl.get_neighbors(i)
-            p = pos[indices] + np.dot(offsets, cell)
-            r = cdist(p, [pos[i]])
-            r_ci = covalent_radii[num[i]]
-            s = 0.
-            for j, index in enumerate(indices):
-                d = r[j] - r_ci - covalent_radii[num[index]]
-                s += np.exp(-d / 0.37)
-            s_norms.append(s)
-            valence_states.append(get_number_of_valence_electrons(num[i]))
-            r_cov.append(r_ci)
-
-        self.force_constants = []
-        for i in range(nat):
-            indices, offsets = nl.get_neighbors(i)
-            p = pos[indices] + np.dot(offsets, cell)
-            r = cdist(p, [pos[i]])[:, 0]
-            fc = []
-            for j, ii in enumerate(indices):
-                d = r[j] - r_cov[i] - r_cov[ii]
-                chi_ik = 0.481 * valence_states[i] / (r_cov[i] + 0.5 * d)
-                chi_jk = 0.481 * valence_states[ii] / (r_cov[ii] + 0.5 * d)
-                cn_ik = s_norms[i] / np.exp(-d / 0.37)
-                cn_jk = s_norms[ii] / np.exp(-d / 0.37)
-                fc.append(np.sqrt(chi_ik * chi_jk / (cn_ik * cn_jk)))
-            self.force_constants.append(np.array(fc))
+        r_cov = covalent_radii[num]
+        valence_states = np.array([get_number_of_valence_electrons(Z)
+                                   for Z in num])
+        d = r - r_cov[i] - r_cov[j]
+        s = np.exp(-d / 0.37)
+        s_norms = np.bincount(i, s, minlength=nat)
+
+        chi_ik = 0.481 * valence_states[i] / (r_cov[i] + 0.5 * d)
+        chi_jk = 0.481 * valence_states[j] / (r_cov[j] + 0.5 * d)
+        cn_ik = s_norms[i] / s
+        cn_jk = s_norms[j] / s
+        fc = np.sqrt(chi_ik * chi_jk / (cn_ik * cn_jk))
+        self.force_constants = np.split(fc, first[1:-1])
 
 
 class SoftMutation(OffspringCreator):
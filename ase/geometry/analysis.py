@@ -2,16 +2,21 @@
 """Tools for analyzing instances of :class:`~ase.Atoms`
 """
 
-from typing import List, Optional
+import itertools
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import numpy as np
+from scipy import sparse
 
-from ase.neighborlist import build_neighbor_list, get_distance_matrix, get_distance_indices
-from ase.geometry.rdf import get_rdf, get_containing_cell_length
+from ase.neighborlist import (build_neighbor_list, get_distance_matrix, get_distance_indices,
+                              natural_cutoffs, NeighborList, NewPrimitiveNeighborList)
+from ase.geometry.geometry import find_mic
+from ase.geometry.rdf import get_rdf, get_containing_cell_length, RDFAccumulator
+from ase.data import atomic_numbers
 from ase import Atoms
 
 
-__all__ = ['Analysis']
+__all__ = ['Analysis', 'StreamingAnalysis']
 
 
 def get_max_containing_cell_length(images: List[Atoms]):
@@ -635,4 +640,269 @@ class Analysis:
                           volume=volume)
             ls_rdf.append(rdf)
 
-        return ls_rdf
\ No newline at end of file
+        return ls_rdf
+
+
+def _expand(centers, indptr):
+    """Pair each center with each of its neighbors.
+
+    Returns the index into *centers* and the position in the neighbor
+    list stored as CSR (*indptr*) for all combinations."""
+    start = indptr[centers]
+    deg = indptr[centers + 1] - start
+    owner = np.repeat(np.arange(len(centers)), deg)
+    positions = np.arange(len(owner)) - np.repeat(np.cumsum(deg) - deg, deg) + start[owner]
+    return owner, positions
+
+
+class StreamingAnalysis:
+    """Trajectory-averaged analysis of a stream of images.
+
+    Unlike :class:`Analysis`, the images are not stored.  They are
+    consumed one at a time, e.g. from :func:`ase.io.iread`, and only
+    running averages are kept, so the memory does not grow with the
+    number of frames::
+
+        ana = StreamingAnalysis(iread('md.traj'))
+        ana.add_bonds('C', 'H')
+        ana.add_angles('H', 'C', 'H')
+        ana.add_rdf(5.0, 100)
+        ana.run()
+        CH = ana.get_mean('C', 'H')
+        tuples, means = ana.get_values('H', 'C', 'H')
+        rdf, r = ana.get_rdf()
+
+    Parameters for initialization:
+
+    images: iterable of :class:`~ase.Atoms` objects or None
+        Images to analyze with :meth:`run`.  They are read only once,
+        also when given as a list.  Images can also be added one by one
+        with :meth:`add`.
+    cutoffs: list of floats or None
+        Radii for each atom, see :class:`~ase.neighborlist.NeighborList`.
+        Defaults to :func:`~ase.neighborlist.natural_cutoffs` of the first image.
+    skin: float
+        Atoms closer than the sum of their cutoffs plus twice the skin are
+        bonded, as with :func:`~ase.neighborlist.build_neighbor_list` in
+        :class:`Analysis`.  The neighbor lists have an additional skin of
+        the same size and are only rebuilt when an atom has moved more than
+        *skin* since the last build.
+
+    Bonds, angles and dihedrals are found in every image from the distances
+    in that image, so changes of the bonding pattern are followed.
+    For every bond, angle and dihedral the mean value over the images
+    where it exists is kept, together with the number of these images.
+    Like the *unique* lists of :class:`Analysis`, every bond, angle and
+    dihedral is counted once.
+    """
+
+    def __init__(self, images: Optional[Iterable[Atoms]] = None,
+                 cutoffs: Optional[List[float]] = None, skin: float = 0.3):
+        # Successive calls to run() continue where the previous one stopped:
+        self.images = None if images is None else iter(images)
+        self.cutoffs = cutoffs
+        self.skin = skin
+        self.nl: Optional[NeighborList] = None
+        self.rdf: Optional[RDFAccumulator] = None
+        self.nimages = 0
+        self._values: Dict[Tuple[str, ...], Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+
+    def _add_quantity(self, symbols):
+        if symbols not in self._values:
+            self._values[symbols] = (np.zeros((0, len(symbols)), dtype=int),
+                                     np.zeros(0), np.zeros(0, dtype=int))
+
+    def add_bonds(self, A, B):
+        """Average the lengths of bonds A-B."""
+        self._add_quantity((A, B))
+
+    def add_angles(self, A, B, C):
+        """Average the angles A-B-C (in degrees).  **B will be the central atom**."""
+        self._add_quantity((A, B, C))
+
+    def add_dihedrals(self, A, B, C, D):
+        """Average the dihedrals A-B-C-D (in degrees).  **B-C will be the central axis**."""
+        self._add_quantity((A, B, C, D))
+
+    def add_rdf(self, rmax, nbins, volume: Optional[float] = None):
+        """Average the RDF and the partial RDFs, see
+        :class:`~ase.geometry.rdf.RDFAccumulator`."""
+        self.rdf = RDFAccumulator(rmax, nbins, volume=volume, skin=self.skin)
+
+    def run(self, steps=None):
+        """Analyze the images given at initialization.
+
+        At most *steps* images are consumed if given.  Returns the number
+        of images analyzed."""
+        n = 0
+        for atoms in itertools.islice(self.images, steps):
+            self.add(atoms)
+            n += 1
+        return n
+
+    def update_neighbor_list(self, atoms):
+        """Update the neighbor list used for bonds.
+
+        Returns the bonds of *atoms* as a sparse matrix in CSR format
+        with the bonded atoms of atom a in
+        ``indices[indptr[a]:indptr[a + 1]]``."""
+        natoms = len(atoms)
+        if self.nl is None or len(self.nl.nl.positions) != natoms:
+            cutoffs = self.cutoffs
+            if cutoffs is None or len(cutoffs) != natoms:
+                cutoffs = natural_cutoffs(atoms)
+            self.nl = NeighborList(np.asarray(cutoffs) + self.skin, skin=self.skin,
+                                   self_interaction=False,
+                                   bothways=True, primitive=NewPrimitiveNeighborList)
+        self.nl.update(atoms)
+
+        first_neigh, j, _, D = self.nl.get_all_neighbors(atoms)
+        i = np.repeat(np.arange(natoms), np.diff(first_neigh))
+        # The neighbor list includes an extra skin:
+        cutoffs = self.nl.nl.cutoffs - self.skin
+        mask = (D**2).sum(1) < (cutoffs[i] + cutoffs[j])**2
+        # Bonds to periodic images of the atom itself are not counted:
+        mask &= i != j
+        i = i[mask]
+        j = j[mask]
+        bonds = sparse.csr_matrix((np.ones(len(i), dtype=bool), (i, j)),
+                                  shape=(natoms, natoms))
+        bonds.sort_indices()
+        return bonds
+
+    def add(self, atoms):
+        """Add an image to the averages."""
+        if self._values:
+            bonds = self.update_neighbor_list(atoms)
+            for symbols in self._values:
+                tuples = self._find(atoms, bonds, symbols)
+                self._accumulate(symbols, tuples, self._evaluate(atoms, tuples))
+
+        if self.rdf is not None:
+            self.rdf.add(atoms)
+
+        self.nimages += 1
+
+    def _find(self, atoms, bonds, symbols):
+        """Find all bonds, angles or dihedrals between elements *symbols*."""
+        indptr = bonds.indptr
+        indices = bonds.indices
+        Z = [atomic_numbers[symbol] for symbol in symbols]
+        numbers = atoms.numbers
+
+        if len(Z) == 2:
+            a = np.flatnonzero(numbers == Z[0])
+            owner, pos = _expand(a, indptr)
+            a = a[owner]
+            b = indices[pos]
+            mask = numbers[b] == Z[1]
+            if Z[0] == Z[1]:
+                mask &= a < b
+            return np.stack([a[mask], b[mask]], axis=1)
+
+        # Central atom of angles or first atom of the axis of dihedrals:
+        b = np.flatnonzero(numbers == Z[1])
+        owner, pos = _expand(b, indptr)
+        b = b[owner]
+        c = indices[pos]
+        if len(Z) == 3:
+            owner, pos = _expand(b, indptr)
+            a = indices[pos]
+            b = b[owner]
+            c = c[owner]
+            mask = (numbers[a] == Z[0]) & (numbers[c] == Z[2]) & (a != c)
+            if Z[0] == Z[2]:
+                mask &= a < c
+            return np.stack([a[mask], b[mask], c[mask]], axis=1)
+
+        mask = numbers[c] == Z[2]
+        b = b[mask]
+        c = c[mask]
+        owner, pos = _expand(b, indptr)
+        a = indices[pos]
+        b = b[owner]
+        c = c[owner]
+        mask = (numbers[a] == Z[0]) & (a != c)
+        a = a[mask]
+        b = b[mask]
+        c = c[mask]
+        owner, pos = _expand(c, indptr)
+        d = indices[pos]
+        a = a[owner]
+        b = b[owner]
+        c = c[owner]
+        mask = (numbers[d] == Z[3]) & (d != b) & (d != a)
+        if Z[0] == Z[3] and Z[1] == Z[2]:
+            # avoid counting A-B-C-D and D-C-B-A
+            mask &= a < d
+        return np.stack([a[mask], b[mask], c[mask], d[mask]], axis=1)
+
+    def _evaluate(self, atoms, tuples):
+        """Get the values of bonds, angles or dihedrals with mic."""
+        if len(tuples) == 0:
+            return np.zeros(0)
+        if tuples.shape[1] == 2:
+            D = atoms.positions[tuples[:, 1]] - atoms.positions[tuples[:, 0]]
+            if atoms.pbc.any():
+                D, d = find_mic(D, atoms.cell, atoms.pbc)
+            else:
+                d = np.sqrt((D**2).sum(1))
+            return d
+        if tuples.shape[1] == 3:
+            return atoms.get_angles(tuples, mic=True)
+        return atoms.get_dihedrals(tuples, mic=True)
+
+    def _accumulate(self, symbols, tuples, values):
+        """Update the running means with the values of one image."""
+        old_tuples, means, counts = self._values[symbols]
+        all_tuples, inverse = np.unique(np.concatenate([old_tuples, tuples]),
+                                        axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        n = len(all_tuples)
+        new_means = np.zeros(n)
+        new_counts = np.zeros(n, dtype=int)
+        new_means[inverse[:len(old_tuples)]] = means
+        new_counts[inverse[:len(old_tuples)]] = counts
+
+        new = inverse[len(old_tuples):]
+        new_counts[new] += 1
+        new_means[new] += (values - new_means[new]) / new_counts[new]
+        self._values[symbols] = (all_tuples, new_means, new_counts)
+
+    def get_values(self, *symbols, return_counts=False):
+        """Get the averaged bonds, angles or dihedrals between elements *symbols*.
+
+        Returns an integer array with the atom indices of the bonds, angles
+        or dihedrals in its rows and an array with their mean values.  If
+        *return_counts* is True, the number of images in which each was
+        found is returned as well."""
+        if symbols not in self._values:
+            raise ValueError('{} was not added to this analysis'
+                             .format('-'.join(symbols)))
+        tuples, means, counts = self._values[symbols]
+        if return_counts:
+            return tuples.copy(), means.copy(), counts.copy()
+        return tuples.copy(), means.copy()
+
+    def get_mean(self, *symbols):
+        """Get the mean of all bonds, angles or dihedrals between elements
+        *symbols* over all images.
+
+        Raises ValueError if none were found."""
+        _, means, counts = self.get_values(*symbols, return_counts=True)
+        if counts.sum() == 0:
+            raise ValueError('No {} found'.format('-'.join(symbols)))
+        return (means * counts).sum() / counts.sum()
+
+    def get_rdf(self, elements=None, return_dists=True):
+        """Get the averaged RDF.
+
+        elements: None or tuple of two str/int
+            Get the partial RDF of two elements.
+
+        Returns the rdf and the distances if *return_dists* is True."""
+        if self.rdf is None:
+            raise ValueError('No rdf was added to this analysis')
+        if elements is not None:
+            elements = tuple(atomic_numbers.get(Z, Z) for Z in elements)
+        return self.rdf.get_rdf(elements=elements, no_dists=not return_dists)
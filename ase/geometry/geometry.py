@@ -415,16 +415,20 @@ def get_distances_derivatives(v0, cell=None, pbc=None):
     return derivs
 
 
-def get_duplicate_atoms(atoms, cutoff=0.1, delete=False):
+def get_duplicate_atoms(atoms, cutoff=0.1, delete=False, mic=False):
     """Get list of duplicate atoms and delete them if requested.
 
     Identify all atoms which lie within the cutoff radius of each other.
     Delete one set of them if delete == True.
+
+    Otherwise the pairs (i, j) with i < j are returned as an integer
+    array of shape (npairs, 2), sorted by i and then j.  The pairs are
+    found with a KD-tree, so the time scales as N log N and the memory
+    linearly with the number of atoms.  Use mic=True to also find atoms
+    which are duplicates of each other across periodic boundaries.
     """
-    from scipy.spatial.distance import pdist
-    dists = pdist(atoms.get_positions(), 'sqeuclidean')
-    dup = np.nonzero(dists < cutoff**2)
-    rem = np.array(_row_col_from_pdist(len(atoms), dup[0]))
+    pbc = atoms.pbc if mic else np.zeros(3, bool)
+    rem = _get_close_pairs(atoms.positions, atoms.cell, pbc, cutoff)
     if delete:
         if rem.size != 0:
             del atoms[rem[:, 0]]
@@ -432,18 +436,54 @@ def get_duplicate_atoms(atoms, cutoff=0.1, delete=False):
         return rem
 
 
-def _row_col_from_pdist(dim, i):
-    """Calculate the i,j index in the square matrix for an index in a
-    condensed (triangular) matrix.
-    """
-    i = np.array(i)
-    b = 1 - 2 * dim
-    x = (np.floor((-b - np.sqrt(b**2 - 8 * i)) / 2)).astype(int)
-    y = (i + x * (b + x + 2) / 2 + 1).astype(int)
-    if i.shape:
-        return list(zip(x, y))
-    else:
-        return [(x, y)]
+def _get_close_pairs(positions, cell, pbc, cutoff):
+    """Find all pairs of atoms closer than cutoff.
+
+    Periodic images of atoms close to the faces of the cell are added to
+    the KD-tree.  Returns the sorted and unique pairs (i, j) with i < j."""
+    from scipy.spatial import cKDTree
+
+    natoms = len(positions)
+    index = np.arange(natoms)
+    if pbc.any() and natoms > 0:
+        cell = complete_cell(cell)
+        face_dist_c = 1 / np.linalg.norm(np.linalg.inv(cell), axis=0)
+        margin_c = cutoff / face_dist_c
+        if (margin_c[pbc] >= 0.5).any():
+            from ase.neighborlist import primitive_neighbor_list
+            i, j, d = primitive_neighbor_list('ijd', pbc, cell, positions,
+                                              cutoff)
+            mask = (i < j) & (d < cutoff)
+            return np.unique(np.stack([i[mask], j[mask]], axis=1), axis=0)
+
+        scaled = np.linalg.solve(cell.T, positions.T).T
+        scaled[:, pbc] %= 1.0
+        images = [scaled @ cell]
+        indices = [index]
+        for shift in itertools.product(*[(-1, 0, 1) if p else (0,)
+                                         for p in pbc]):
+            if not any(shift):
+                continue
+            # Only images that end up within the cutoff of the cell:
+            mask = np.ones(natoms, bool)
+            for c, s in enumerate(shift):
+                if s == 1:
+                    mask &= scaled[:, c] < margin_c[c]
+                elif s == -1:
+                    mask &= scaled[:, c] >= 1 - margin_c[c]
+            images.append(images[0][mask] + np.dot(shift, cell))
+            indices.append(index[mask])
+        positions = np.concatenate(images)
+        index = np.concatenate(indices)
+
+    pairs = cKDTree(positions).query_pairs(cutoff, output_type='ndarray')
+    # Pairs of two images are images of pairs with an atom in the cell:
+    pairs = pairs[pairs[:, 0] < natoms]
+    D = positions[pairs[:, 1]] - positions[pairs[:, 0]]
+    pairs = index[pairs[(D**2).sum(1) < cutoff**2]]
+    pairs.sort(axis=1)
+    pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+    return np.unique(pairs.reshape(-1, 2), axis=0)
 
 
 def permute_axes(atoms, permutation):
@@ -1,9 +1,11 @@
 import math
-from typing import List, Optional, Tuple, Union
+from typing import Dict, List, Optional, Tuple, Union
 
 import numpy as np
 from ase import Atoms
 from ase.cell import Cell
+from ase.neighborlist import (NeighborList, NewPrimitiveNeighborList,
+                              neighbor_list_chunks)
 
 
 class CellTooSmall(Exception):
@@ -41,7 +43,8 @@ def get_rdf(atoms: Atoms, rmax: float, nbins: int,
     distance_matrix : numpy.array
         An array of distances between atoms, typically
         obtained by atoms.get_all_distances().
-        Default None meaning that it will be calculated.
+        Default None meaning that the pairs within rmax are found with a
+        neighbor list, which avoids the N x N matrix.
 
     elements : list or tuple
         List of two atomic numbers. If elements is not None the partial
@@ -62,35 +65,36 @@ def get_rdf(atoms: Atoms, rmax: float, nbins: int,
 
     check_cell_and_r_max(atoms, rmax)
 
-    dm = distance_matrix
-    if dm is None:
-        dm = atoms.get_all_distances(mic=True)
-
-    rdf = np.zeros(nbins + 1)
     dr = float(rmax / nbins)
-
-    indices = np.asarray(np.ceil(dm / dr), dtype=int)
     natoms = len(atoms)
 
     if elements is None:
         # Coefficients to use for normalization
         phi = natoms / vol
         norm = 2.0 * math.pi * dr * phi * len(atoms)
-
-        indices_triu = np.triu(indices)
-        for index in range(nbins + 1):
-            rdf[index] = np.count_nonzero(indices_triu == index)
-
     else:
-        i_indices = np.where(atoms.numbers == elements[0])[0]
-        phi = len(i_indices) / vol
+        phi = np.count_nonzero(atoms.numbers == elements[0]) / vol
         norm = 4.0 * math.pi * dr * phi * natoms
 
-        for i in i_indices:
-            for j in np.where(atoms.numbers == elements[1])[0]:
-                index = indices[i, j]
-                if index <= nbins:
-                    rdf[index] += 1
+    if distance_matrix is None:
+        species, counts = get_rdf_counts(atoms, rmax, nbins)
+        if elements is None:
+            # Every pair was counted in both directions:
+            rdf = counts.sum(axis=(0, 1)) / 2
+        else:
+            rdf = np.zeros(nbins + 1)
+            if elements[0] in species and elements[1] in species:
+                rdf += counts[np.searchsorted(species, elements[0]),
+                              np.searchsorted(species, elements[1])]
+    else:
+        indices = np.asarray(np.ceil(distance_matrix / dr), dtype=int)
+        if elements is None:
+            indices = indices[np.triu_indices(natoms)]
+        else:
+            indices = indices[np.ix_(atoms.numbers == elements[0],
+                                     atoms.numbers == elements[1])]
+        indices = indices[indices <= nbins]
+        rdf = np.bincount(indices.ravel(), minlength=nbins + 1).astype(float)
 
     rr = np.arange(dr / 2, rmax, dr)
     rdf[1:] /= norm * (rr * rr + (dr * dr / 12))
@@ -101,6 +105,169 @@ def get_rdf(atoms: Atoms, rmax: float, nbins: int,
     return rdf[1:], rr
 
 
+def get_rdf_counts(atoms: Atoms, rmax: float, nbins: int,
+                   max_memory: float = 1e8,
+                   nl: Optional[NeighborList] = None
+                   ) -> Tuple[np.ndarray, np.ndarray]:
+    """Count the pairs of atoms in each distance bin up to rmax.
+
+    The pairs are found with :func:`~ase.neighborlist.neighbor_list_chunks`,
+    so at most *max_memory* bytes of pairs are held in memory at a time.
+
+    Returns the sorted atomic numbers of the elements present and an
+    integer array of shape (nelements, nelements, nbins + 1), where
+    element [a, b, k] is the number of ordered pairs (i, j) of atoms of
+    the elements a and b with ``(k - 1) * dr < r_ij <= k * dr`` and
+    ``dr = rmax / nbins``.  Element 0 of the last axis counts atoms at
+    identical positions.
+
+    Instead of searching for the pairs, they can be taken from a
+    :class:`~ase.neighborlist.NeighborList` *nl* updated for *atoms*,
+    with ``bothways=True``, ``self_interaction=False`` and cutoffs of
+    at least rmax / 2.
+    """
+    dr = float(rmax / nbins)
+    species, types = np.unique(atoms.numbers, return_inverse=True)
+    ntypes = len(species)
+    counts = np.zeros(ntypes * ntypes * (nbins + 1), dtype=int)
+
+    if nl is None:
+        # Include pairs at exactly rmax:
+        cutoff = np.nextafter(rmax, np.inf)
+        chunks = neighbor_list_chunks('ijd', atoms, cutoff,
+                                      max_memory=max_memory)
+    else:
+        first_neigh, j, _, D = nl.get_all_neighbors(atoms)
+        i = np.repeat(np.arange(len(atoms)), np.diff(first_neigh))
+        chunks = [(i, j, np.sqrt((D**2).sum(1)))]
+
+    for i, j, d in chunks:
+        index = np.ceil(d / dr).astype(int)
+        mask = index <= nbins
+        key = (types[i[mask]] * ntypes + types[j[mask]]) * (nbins + 1)
+        counts += np.bincount(key + index[mask], minlength=len(counts))
+
+    return species, counts.reshape((ntypes, ntypes, nbins + 1))
+
+
+def get_partial_rdfs(atoms: Atoms, rmax: float, nbins: int,
+                     no_dists: Optional[bool] = False,
+                     volume: Optional[float] = None,
+                     nl: Optional[NeighborList] = None):
+    """Returns the partial radial distribution functions of all pairs
+    of elements.
+
+    The pairs are only counted once for all partial rdfs.  Returns a
+    dictionary with the partial rdf for each pair (Z1, Z2) of atomic
+    numbers, normalized as ``get_rdf(atoms, rmax, nbins, elements=(Z1,
+    Z2))``, and the corresponding distances unless no_dists = True.  See
+    :func:`get_rdf` for the parameters and :func:`get_rdf_counts` for
+    *nl*.
+    """
+    vol = atoms.cell.volume if volume is None else volume
+    if vol < 1.0e-10:
+        raise VolumeNotDefined
+
+    check_cell_and_r_max(atoms, rmax)
+
+    dr = float(rmax / nbins)
+    rr = np.arange(dr / 2, rmax, dr)
+    species, counts = get_rdf_counts(atoms, rmax, nbins, nl=nl)
+    natoms_per_element = np.bincount(np.searchsorted(species, atoms.numbers))
+
+    rdfs = {}
+    for a, Z1 in enumerate(species):
+        norm = 4.0 * math.pi * dr * natoms_per_element[a] / vol * len(atoms)
+        for b, Z2 in enumerate(species):
+            rdfs[(Z1, Z2)] = counts[a, b, 1:] / (norm * (rr * rr +
+                                                         (dr * dr / 12)))
+
+    if no_dists:
+        return rdfs
+
+    return rdfs, rr
+
+
+class RDFAccumulator:
+    """Radial distribution functions averaged over many configurations.
+
+    Configurations are added one at a time with :meth:`add`, for example
+    while reading a trajectory with :func:`ase.io.iread`, so only one of
+    them needs to be in memory::
+
+        acc = RDFAccumulator(rmax=5.0, nbins=100)
+        for atoms in iread('md.traj'):
+            acc.add(atoms)
+        rdf, r = acc.get_rdf()
+        rdf_OH = acc.get_rdf(elements=(8, 1), no_dists=True)
+
+    The total and the partial rdfs of all pairs of elements are
+    accumulated together.  See :func:`get_rdf` for the parameters.
+
+    If *skin* is given, the pairs are taken from a neighbor list with
+    this skin, which is only rebuilt when an atom has moved more than
+    *skin* since the last build.  This saves the neighbor search for
+    most frames of a molecular dynamics trajectory.
+    """
+
+    def __init__(self, rmax: float, nbins: int,
+                 volume: Optional[float] = None,
+                 skin: Optional[float] = None):
+        self.rmax = rmax
+        self.nbins = nbins
+        self.volume = volume
+        self.skin = skin
+        self.nl: Optional[NeighborList] = None
+        self.nimages = 0
+        self.rdf = np.zeros(nbins)
+        self.partial_rdfs: Dict[Tuple[int, int], np.ndarray] = {}
+
+    @property
+    def distances(self) -> np.ndarray:
+        dr = float(self.rmax / self.nbins)
+        return np.arange(dr / 2, self.rmax, dr)
+
+    def add(self, atoms: Atoms) -> None:
+        """Add the rdfs of a configuration to the averages."""
+        if self.skin is not None:
+            if self.nl is None or len(self.nl.nl.cutoffs) != len(atoms):
+                self.nl = NeighborList([self.rmax / 2] * len(atoms),
+                                       skin=self.skin,
+                                       self_interaction=False,
+                                       bothways=True,
+                                       primitive=NewPrimitiveNeighborList)
+            self.nl.update(atoms)
+
+        rdfs = get_partial_rdfs(atoms, self.rmax, self.nbins, no_dists=True,
+                                volume=self.volume, nl=self.nl)
+        natoms = len(atoms)
+        rdf = np.zeros(self.nbins)
+        for (Z1, Z2), partial in rdfs.items():
+            rdf += partial * np.count_nonzero(atoms.numbers == Z1) / natoms
+
+        # Elements missing in this or earlier configurations have zero rdfs:
+        for key in set(rdfs) | set(self.partial_rdfs):
+            self.partial_rdfs[key] = (
+                self.partial_rdfs.get(key, 0.0) * self.nimages +
+                rdfs.get(key, 0.0)) / (self.nimages + 1)
+        self.rdf = (self.rdf * self.nimages + rdf) / (self.nimages + 1)
+        self.nimages += 1
+
+    def get_rdf(self, elements: Optional[Union[List[int], Tuple]] = None,
+                no_dists: Optional[bool] = False):
+        """Return the averaged rdf, or partial rdf for two elements."""
+        if elements is None:
+            rdf = self.rdf.copy()
+        else:
+            rdf = self.partial_rdfs.get(tuple(elements),
+                                        np.zeros(self.nbins)).copy()
+
+        if no_dists:
+            return rdf
+
+        return rdf, self.distances
+
+
 def check_cell_and_r_max(atoms: Atoms, rmax: float) -> None:
     cell = atoms.get_cell()
     pbc = atoms.get_pbc()
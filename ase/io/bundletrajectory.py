@@ -17,7 +17,13 @@ so this text needs updating::
             ...
         F1 (dir)
 
-There is a folder for each frame, and the data is in the ASE Ulm format.
+There is a folder for each frame, and the data is in the ASE Ulm format
+(or in NumPy's .npy format with the npy backend).
+
+In a bundle of subtype 'split', every MPI task writes its part of the
+atoms to separate files (positions_0.ulm, positions_1.ulm, ...) together
+with the indices of the atoms (ID_0.ulm, ...).  The parts are merged
+when reading.
 """
 
 import os
@@ -69,16 +75,26 @@ class BundleTrajectory:
         Use backup=False to disable renaming of an existing file.
 
     backend='ulm':
-        Request a backend.  Currently only 'ulm' is supported.
+        Request a backend: 'ulm' or 'npy'.  The npy backend stores each
+        array in a .npy file, which can be memory-mapped when reading.
         Only honored when writing.
 
     singleprecision=False:
         Store floating point data in single precision (ulm backend only).
+
+    split=False:
+        Write a bundle of subtype 'split', where each MPI task writes
+        its own atoms.  Distributed atoms carrying the global indices of
+        the local atoms in an 'ID' array (like Asap's parallel atoms)
+        are written as they are.  Otherwise every task must have all the
+        atoms and writes its share of them.  This avoids collecting the
+        data on the master task, and the tasks write at the same time.
+        Only honored when writing.
     """
     slavelog = True  # Log from all nodes
 
     def __init__(self, filename, mode='r', atoms=None, backup=True,
-                 backend='ulm', singleprecision=False):
+                 backend='ulm', singleprecision=False, split=False):
         self.state = 'constructing'
         self.filename = filename
         self.pre_observers = []  # callback functions before write is performed
@@ -92,6 +108,8 @@ class BundleTrajectory:
                 raise ValueError('You cannot specify atoms in read mode.')
             self._open_read()
         elif mode == 'w':
+            if split:
+                self.subtype = 'split'
             self._open_write(atoms, backup, backend)
         elif mode == 'a':
             self._open_append(atoms)
@@ -120,10 +138,18 @@ class BundleTrajectory:
 
         if self.backend_name == 'ulm':
             self.backend = UlmBundleBackend(self.master, self.singleprecision)
+        elif self.backend_name == 'npy':
+            if self.singleprecision:
+                raise ValueError('The npy backend does not support '
+                                 'singleprecision.')
+            self.backend = NpyBundleBackend(self.master)
         else:
             raise NotImplementedError(
                 'This version of ASE cannot use BundleTrajectory '
                 'with backend "%s"' % self.backend_name)
+        if self.subtype == 'split':
+            # All tasks write their part of the atoms.
+            self.backend.writelarge = True
 
     def write(self, atoms=None):
         """Write the atoms to the file.
@@ -149,6 +175,8 @@ class BundleTrajectory:
         self._call_observers(self.pre_observers)
         self.log('Beginning to write frame ' + str(self.nframes))
         framedir = self._make_framedir(self.nframes)
+        if self.subtype == 'split':
+            barrier()  # all tasks write to framedir
 
         # Check which data should be written the first time:
         # Modify datatypes so any element of type 'once' becomes true
@@ -164,6 +192,8 @@ class BundleTrajectory:
                      'cell': atoms.get_cell(),
                      'natoms': atoms.get_global_number_of_atoms(),
                      'constraints': atoms.constraints}
+        if self.subtype == 'split':
+            smalldata['fragments'] = world.size
         if datatypes.get('energy'):
             try:
                 smalldata['energy'] = atoms.get_potential_energy()
@@ -177,29 +207,41 @@ class BundleTrajectory:
         self.backend.write_small(framedir, smalldata)
 
         # Write the large arrays.
+        if self.subtype == 'split':
+            if atoms.has('ID'):
+                # Distributed atoms (e.g. Asap's parallel atoms): every
+                # task holds its own atoms and their global indices.
+                self.fragment = slice(None)
+                self._write_array(framedir, 'ID', atoms.get_array('ID'))
+            else:
+                # Replicated atoms: every task writes its share.
+                n = len(atoms)
+                self.fragment = slice(world.rank * n // world.size,
+                                      (world.rank + 1) * n // world.size)
+                self._write_array(framedir, 'ID', np.arange(n))
         if datatypes.get('positions'):
-            self.backend.write(framedir, 'positions', atoms.get_positions())
+            self._write_array(framedir, 'positions', atoms.get_positions())
         if datatypes.get('numbers'):
-            self.backend.write(framedir, 'numbers', atoms.get_atomic_numbers())
+            self._write_array(framedir, 'numbers', atoms.get_atomic_numbers())
         if datatypes.get('tags'):
             if atoms.has('tags'):
-                self.backend.write(framedir, 'tags', atoms.get_tags())
+                self._write_array(framedir, 'tags', atoms.get_tags())
             else:
                 self.datatypes['tags'] = False
         if datatypes.get('masses'):
             if atoms.has('masses'):
-                self.backend.write(framedir, 'masses', atoms.get_masses())
+                self._write_array(framedir, 'masses', atoms.get_masses())
             else:
                 self.datatypes['masses'] = False
         if datatypes.get('momenta'):
             if atoms.has('momenta'):
-                self.backend.write(framedir, 'momenta', atoms.get_momenta())
+                self._write_array(framedir, 'momenta', atoms.get_momenta())
             else:
                 self.datatypes['momenta'] = False
         if datatypes.get('magmoms'):
             if atoms.has('initial_magmoms'):
-                self.backend.write(framedir, 'magmoms',
-                                   atoms.get_initial_magnetic_moments())
+                self._write_array(framedir, 'magmoms',
+                                  atoms.get_initial_magnetic_moments())
             else:
                 self.datatypes['magmoms'] = False
         if datatypes.get('forces'):
@@ -208,7 +250,7 @@ class BundleTrajectory:
             except (RuntimeError, PropertyNotImplementedError):
                 self.datatypes['forces'] = False
             else:
-                self.backend.write(framedir, 'forces', x)
+                self._write_array(framedir, 'forces', x)
                 del x
         if datatypes.get('energies'):
             try:
@@ -216,21 +258,26 @@ class BundleTrajectory:
             except (RuntimeError, PropertyNotImplementedError):
                 self.datatypes['energies'] = False
             else:
-                self.backend.write(framedir, 'energies', x)
+                self._write_array(framedir, 'energies', x)
                 del x
         # Write any extra data
         for (label, source, once) in self.extra_data:
             if self.nframes == 0 or not once:
                 if source is not None:
                     x = source()
+                    # Not per-atom data, so not split.
+                    if self.master or self.subtype != 'split':
+                        self.backend.write(framedir, label, x)
                 else:
                     x = atoms.get_array(label)
-                self.backend.write(framedir, label, x)
+                    self._write_array(framedir, label, x)
                 del x
                 if once:
                     self.datatypes[label] = 'once'
                 else:
                     self.datatypes[label] = True
+        if self.subtype == 'split':
+            barrier()  # frame is complete when all tasks are done
         # Finally, write metadata if it is the first frame
         if self.nframes == 0:
             metadata = {'datatypes': self.datatypes}
@@ -240,6 +287,16 @@ class BundleTrajectory:
         self.log('Done writing frame ' + str(self.nframes))
         self.nframes += 1
 
+    def _write_array(self, framedir, name, data):
+        """Write per-atom array.
+
+        In a split bundle, every task writes its part of the atoms."""
+        if self.subtype == 'split':
+            self.backend.write(framedir, '%s_%d' % (name, world.rank),
+                               data[self.fragment])
+        else:
+            self.backend.write(framedir, name, data)
+
     def select_data(self, data, value):
         """Selects if a given data type should be written.
 
@@ -345,18 +402,22 @@ class BundleTrajectory:
         for name in ('positions', 'numbers', 'tags', 'masses',
                      'momenta'):
             if self.datatypes.get(name):
-                atoms.arrays[name] = self._read_data(framezero, framedir,
-                                                     name, self.atom_id)
+                x = self._read_data(framezero, framedir, name, self.atom_id)
+                if not x.flags.writeable:
+                    x = x.copy()  # memory-mapped
+                atoms.arrays[name] = x
                 assert len(atoms.arrays[name]) == natoms
 
         # Create the atoms object
         if self.datatypes.get('energy'):
             if self.datatypes.get('forces'):
-                forces = self.backend.read(framedir, 'forces')
+                forces = self._read_data(framezero, framedir, 'forces',
+                                         self.atom_id)
             else:
                 forces = None
             if self.datatypes.get('magmoms'):
-                magmoms = self.backend.read(framedir, 'magmoms')
+                magmoms = self._read_data(framezero, framedir, 'magmoms',
+                                          self.atom_id)
             else:
                 magmoms = None
             calc = SinglePointCalculator(atoms,
@@ -560,7 +621,7 @@ class BundleTrajectory:
         metadata['version'] = self.version
         metadata['subtype'] = self.subtype
         metadata['backend'] = self.backend_name
-        if self.backend_name == 'ulm':
+        if self.backend_name == 'ulm':  # the npy backend has no options
             metadata['ulm.singleprecision'] = self.singleprecision
         metadata['python_ver'] = tuple(sys.version_info)
         encode = jsonio.MyEncoder(indent=4).encode
@@ -712,6 +773,9 @@ class BundleTrajectory:
 class UlmBundleBackend:
     """Backend for BundleTrajectories stored as ASE Ulm files."""
 
+    # Extension of the files with the arrays:
+    ext = '.ulm'
+
     def __init__(self, master, singleprecision):
         # Store if this backend will actually write anything
         self.writesmall = master
@@ -745,7 +809,9 @@ class UlmBundleBackend:
             stored_as = dtype
             all_identical = False
             # Check if it a type that can be stored with less space
-            if np.issubdtype(data.dtype, np.integer):
+            if data.size == 0:
+                pass  # Empty fragment of a split bundle
+            elif np.issubdtype(data.dtype, np.integer):
                 # An integer type, we may want to convert
                 minval = data.min()
                 maxval = data.max()
@@ -806,7 +872,7 @@ class UlmBundleBackend:
         Information is a dictionary containing as aminimum the shape and
         type.
         """
-        fn = os.path.join(framedir, name + '.ulm')
+        fn = os.path.join(framedir, name + self.ext)
         if split is None or os.path.exists(fn):
             with ulmopen(fn, 'r') as fd:
                 info = dict()
@@ -846,7 +912,7 @@ class UlmBundleBackend:
         split files were used.
         """
         data = []
-        if os.path.exists(os.path.join(framedir, name + '.ulm')):
+        if os.path.exists(os.path.join(framedir, name + self.ext)):
             # Not stored in split form!
             return (self.read(framedir, name), False)
         for i in range(self.nfrag):
@@ -863,6 +929,50 @@ class UlmBundleBackend:
         pass
 
 
+class NpyBundleBackend(UlmBundleBackend):
+    """Backend for BundleTrajectories with arrays stored as .npy files.
+
+    The small data is still stored in Ulm files.  Arrays are read as
+    read-only memory-mapped arrays, so that only the parts that are
+    used are read from disk."""
+
+    ext = '.npy'
+
+    def __init__(self, master):
+        UlmBundleBackend.__init__(self, master, False)
+
+    def write(self, framedir, name, data):
+        "Write data to separate file."
+        if self.writelarge:
+            np.save(os.path.join(framedir, name + '.npy'),
+                    np.asarray(data))
+
+    def read(self, framedir, name):
+        "Read data from separate file."
+        return np.load(os.path.join(framedir, name + '.npy'),
+                       mmap_mode='r')
+
+    def read_info(self, framedir, name, split=None):
+        """Read information about file contents without reading the data.
+
+        Information is a dictionary containing as aminimum the shape and
+        type.
+        """
+        if split is None or os.path.exists(
+                os.path.join(framedir, name + '.npy')):
+            names = [name]
+        else:
+            names = ['%s_%d' % (name, i) for i in range(split)]
+        shape = None
+        for name in names:
+            data = self.read(framedir, name)
+            if shape is None:
+                shape = list(data.shape)
+            else:
+                shape[0] += data.shape[0]
+        return {'shape': tuple(shape), 'type': str(data.dtype)}
+
+
 def read_bundletrajectory(filename, index=-1):
     """Reads one or more atoms objects from a BundleTrajectory.
 
@@ -939,6 +1049,8 @@ def print_bundletrajectory_info(filename):
     # Look at first frame
     if metadata['backend'] == 'ulm':
         backend = UlmBundleBackend(True, False)
+    elif metadata['backend'] == 'npy':
+        backend = NpyBundleBackend(True)
     else:
         raise NotImplementedError('Backend %s not supported.'
                                   % (metadata['backend'],))
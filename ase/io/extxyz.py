@@ -9,7 +9,10 @@ Contributed by James Kermode <james.kermode@gmail.com>
 """
 
 
-from itertools import islice
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+import os
 import re
 import warnings
 from io import StringIO, UnsupportedOperation
@@ -21,13 +24,15 @@ import numbers
 from ase.atoms import Atoms
 from ase.calculators.calculator import all_properties, Calculator
 from ase.calculators.singlepoint import SinglePointCalculator
+from ase.data import chemical_symbols
 from ase.spacegroup.spacegroup import Spacegroup
+from ase.symbols import symbols2numbers
 from ase.parallel import paropen
 from ase.constraints import FixAtoms, FixCartesian
-from ase.io.formats import index2range
-from ase.utils import reader
+from ase.io.formats import index2range, open_with_compression
+from ase.utils import get_workers, reader
 
-__all__ = ['read_xyz', 'write_xyz', 'iread_xyz']
+__all__ = ['read_xyz', 'write_xyz', 'iread_xyz', 'XYZWriter']
 
 PROPERTY_NAME_MAP = {'positions': 'pos',
                      'numbers': 'Z',
@@ -369,6 +374,51 @@ def parse_properties(prop_str):
     return properties, properties_list, dtype, converters
 
 
+def _parse_xyz_columns(lines, dtype):
+    """Parse the atom lines of a frame column-wise with numpy.
+
+    Returns a structured array with the fields of *dtype* from
+    :func:`parse_properties`, or None if the lines cannot be parsed this
+    way, e.g. because a line has too few columns or a value cannot be
+    converted.  Extra columns are ignored, as by the line-by-line parser.
+    """
+    if len(lines) == 0:
+        return None
+
+    # Logical and integer values are converted afterwards, since numpy
+    # reads booleans only as integers and accepts integers like "1.0":
+    names = dtype.names
+    converted = [dtype[name].kind in 'bi' for name in names]
+    read_dtype = np.dtype([(name, object if c else dtype[name])
+                           for name, c in zip(names, converted)])
+    try:
+        data = np.loadtxt(lines, dtype=read_dtype, comments=None,
+                          usecols=range(len(names)), ndmin=1)
+    except (ValueError, TypeError, OverflowError):
+        return None
+
+    # Empty lines are skipped by numpy:
+    if len(data) != len(lines):
+        return None
+
+    if any(converted):
+        result = np.empty(len(data), dtype)
+        for name, c in zip(names, converted):
+            column = data[name]
+            if not c:
+                result[name] = column
+            elif dtype[name].kind == 'b':
+                result[name] = (column == 'T') | (column == 'True')
+            else:
+                try:
+                    result[name] = np.array([int(x) for x in column],
+                                            dtype[name])
+                except (ValueError, OverflowError):
+                    return None
+        data = result
+    return data
+
+
 def _read_xyz_frame(lines, natoms, properties_parser=key_val_str_to_dict,
                     nvec=0):
     # comment line
@@ -405,22 +455,27 @@ def _read_xyz_frame(lines, natoms, properties_parser=key_val_str_to_dict,
     properties, names, dtype, convs = parse_properties(info['Properties'])
     del info['Properties']
 
-    data = []
-    for ln in range(natoms):
-        try:
-            line = next(lines)
-        except StopIteration:
-            raise XYZError('ase.io.extxyz: Frame has {} atoms, expected {}'
-                           .format(len(data), natoms))
-        vals = line.split()
-        row = tuple([conv(val) for conv, val in zip(convs, vals)])
-        data.append(row)
+    atom_lines = list(islice(lines, natoms))
+    data = _parse_xyz_columns(atom_lines, dtype)
+    if data is None:
+        # Parse line by line, which also gives the errors for bad input
+        atom_lines = iter(atom_lines)
+        data = []
+        for ln in range(natoms):
+            try:
+                line = next(atom_lines)
+            except StopIteration:
+                raise XYZError('ase.io.extxyz: Frame has {} atoms, '
+                               'expected {}'.format(len(data), natoms))
+            vals = line.split()
+            row = tuple([conv(val) for conv, val in zip(convs, vals)])
+            data.append(row)
 
-    try:
-        data = np.array(data, dtype)
-    except TypeError:
-        raise XYZError('Badly formatted data '
-                       'or end of file reached before end of frame')
+        try:
+            data = np.array(data, dtype)
+        except TypeError:
+            raise XYZError('Badly formatted data '
+                           'or end of file reached before end of frame')
 
     # Read VEC entries if present
     if nvec > 0:
@@ -460,15 +515,18 @@ def _read_xyz_frame(lines, natoms, properties_parser=key_val_str_to_dict,
                                for c in range(cols)]).T
         arrays[ase_name] = value
 
-    symbols = None
+    numbers = None
     if 'symbols' in arrays:
-        symbols = [s.capitalize() for s in arrays['symbols']]
+        # Look up each element only once:
+        species, inverse = np.unique(arrays['symbols'].astype(str),
+                                     return_inverse=True)
+        numbers = np.array(symbols2numbers([s.capitalize() for s in species]),
+                           dtype=int)[inverse]
         del arrays['symbols']
 
-    numbers = None
     duplicate_numbers = None
     if 'numbers' in arrays:
-        if symbols is None:
+        if numbers is None:
             numbers = arrays['numbers']
         else:
             duplicate_numbers = arrays['numbers']
@@ -484,8 +542,7 @@ def _read_xyz_frame(lines, natoms, properties_parser=key_val_str_to_dict,
         positions = arrays['positions']
         del arrays['positions']
 
-    atoms = Atoms(symbols=symbols,
-                  positions=positions,
+    atoms = Atoms(positions=positions,
                   numbers=numbers,
                   charges=initial_charges,
                   cell=cell,
@@ -542,13 +599,65 @@ class XYZError(IOError):
 
 
 class XYZChunk:
-    def __init__(self, lines, natoms):
+    def __init__(self, lines, natoms, nvec=0,
+                 properties_parser=key_val_str_to_dict):
         self.lines = lines
         self.natoms = natoms
+        self.nvec = nvec
+        self.properties_parser = properties_parser
 
     def build(self):
         """Convert unprocessed chunk into Atoms."""
-        return _read_xyz_frame(iter(self.lines), self.natoms)
+        return _read_xyz_frame(iter(self.lines), self.natoms,
+                               self.properties_parser, self.nvec)
+
+
+def _build_chunks(chunks):
+    return [chunk.build() for chunk in chunks]
+
+
+def build_chunks(chunks, workers=1, batch_size=10000):
+    """Convert unprocessed chunks into Atoms.
+
+    With *workers* > 1, the chunks are built in that many processes, or
+    one per CPU for -1.  Consecutive chunks are sent to the processes in
+    batches of about *batch_size* atoms.  The Atoms are yielded in the
+    order of the chunks, and at most two batches per process are read
+    ahead of the Atoms yielded, so the memory used does not depend on the
+    number of chunks.
+    """
+    workers = get_workers(workers)
+    if workers == 1:
+        for chunk in chunks:
+            yield chunk.build()
+        return
+
+    def batches():
+        batch = []
+        natoms = 0
+        for chunk in chunks:
+            batch.append(chunk)
+            natoms += chunk.natoms
+            if natoms >= batch_size:
+                yield batch
+                batch = []
+                natoms = 0
+        if batch:
+            yield batch
+
+    pending = deque()
+    with ProcessPoolExecutor(workers) as executor:
+        try:
+            for batch in batches():
+                pending.append(executor.submit(_build_chunks, batch))
+                if len(pending) >= 2 * workers:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            # Do not wait for chunks that are no longer needed:
+            for future in pending:
+                future.cancel()
 
 
 def ixyzchunks(fd):
@@ -572,15 +681,14 @@ class ImageIterator:
     def __init__(self, ichunks):
         self.ichunks = ichunks
 
-    def __call__(self, fd, indices=-1):
+    def __call__(self, fd, indices=-1, workers=1):
         if not hasattr(indices, 'start'):
             if indices < 0:
                 indices = slice(indices - 1, indices)
             else:
                 indices = slice(indices, indices + 1)
 
-        for chunk in self._getslice(fd, indices):
-            yield chunk.build()
+        yield from build_chunks(self._getslice(fd, indices), workers)
 
     def _getslice(self, fd, indices):
         try:
@@ -602,8 +710,99 @@ class ImageIterator:
 iread_xyz = ImageIterator(ixyzchunks)
 
 
+INDEX_FILE_VERSION = 1
+
+
+def get_index_filename(filename):
+    """Return the name of the frame index file of an extxyz file."""
+    return filename + '.idx'
+
+
+def scan_xyz(fileobj, last_frame=None):
+    """Find the frames of an extxyz file.
+
+    Returns an integer array with the position in the file, the number of
+    atoms and the number of VEC lines of each frame, reading from the
+    beginning of *fileobj* up to and including frame *last_frame*, or the
+    end of the file if *last_frame* is None."""
+    fileobj.seek(0)
+    frames = []
+    while True:
+        frame_pos = fileobj.tell()
+        line = fileobj.readline()
+        if line.strip() == '':
+            break
+        try:
+            natoms = int(line)
+        except ValueError as err:
+            raise XYZError('ase.io.extxyz: Expected xyz header but got: {}'
+                           .format(err))
+        fileobj.readline()  # read comment line
+        for i in range(natoms):
+            fileobj.readline()
+        # check for VEC
+        nvec = 0
+        while True:
+            lastPos = fileobj.tell()
+            line = fileobj.readline()
+            if line.lstrip().startswith('VEC'):
+                nvec += 1
+                if nvec > 3:
+                    raise XYZError('ase.io.extxyz: More than 3 VECX entries')
+            else:
+                fileobj.seek(lastPos)
+                break
+        frames.append((frame_pos, natoms, nvec))
+        if last_frame is not None and len(frames) > last_frame:
+            break
+    return np.array(frames, dtype=np.int64).reshape((-1, 3))
+
+
+def _file_stat(filename):
+    stat = os.stat(filename)
+    return np.array([stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+
+
+def read_frame_index(filename, index_filename=None):
+    """Read the frame index of an extxyz file.
+
+    Returns the frames as from :func:`scan_xyz` or None if there is no
+    index file or if the extxyz file has changed since the index was
+    written, as detected from its size and modification time."""
+    if index_filename is None:
+        index_filename = get_index_filename(filename)
+    try:
+        with np.load(index_filename) as data:
+            if (data['version'] != INDEX_FILE_VERSION or
+                    (data['stat'] != _file_stat(filename)).any()):
+                return None
+            return data['frames']
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def write_frame_index(filename, index_filename=None, frames=None):
+    """Scan an extxyz file and write its frame index.
+
+    The index contains the position of every frame in the file, so that
+    :func:`read_xyz` can go directly to any frame, see its *index_file*
+    parameter.  Returns the frames as from :func:`scan_xyz`."""
+    if index_filename is None:
+        index_filename = get_index_filename(filename)
+    if frames is None:
+        with open_with_compression(filename) as fileobj:
+            frames = scan_xyz(fileobj)
+    tmp = index_filename + '.tmp'
+    with open(tmp, 'wb') as fd:
+        np.savez(fd, version=INDEX_FILE_VERSION, stat=_file_stat(filename),
+                 frames=frames)
+    os.replace(tmp, index_filename)
+    return frames
+
+
 @reader
-def read_xyz(fileobj, index=-1, properties_parser=key_val_str_to_dict):
+def read_xyz(fileobj, index=-1, properties_parser=key_val_str_to_dict,
+             index_file=None, workers=1):
     r"""
     Read from a file in Extended XYZ format
 
@@ -715,6 +914,26 @@ def read_xyz(fileobj, index=-1, properties_parser=key_val_str_to_dict):
     (from `v2.4 beta
     <http://www.ovito.org/index.php/component/content/article?id=25>`_
     onwards).
+
+    To find the requested frames, the file has to be read from the
+    beginning.  For large files, the positions of the frames can be
+    stored in an index file next to it, ``<filename>.idx``, so that any
+    frame is read directly.  *index_file* controls its use:
+
+     - None (default): Use the index file if it exists and is up to date.
+     - True: Use the index file and (re)write it if it is missing or out
+       of date.  ``read('big.xyz', index=-1, index_file=True)``
+     - False: Do not use an index file.
+     - A filename: Like True, with this filename for the index file.
+
+    An index file is out of date if the size or modification time of the
+    extxyz file has changed.
+
+    With *workers* > 1, the frames are converted to Atoms in that many
+    processes, or one per CPU for -1, while the file is read in this
+    process.  The frames are still returned in order, and only a few
+    frames per process are held in memory.  This pays off for many or
+    large frames, e.g. ``iread('big.xyz', workers=-1)``.
     """  # noqa: E501
 
     if not isinstance(index, int) and not isinstance(index, slice):
@@ -728,46 +947,47 @@ def read_xyz(fileobj, index=-1, properties_parser=key_val_str_to_dict):
         if index.stop is not None and index.stop >= 0:
             last_frame = index.stop
 
-    # scan through file to find where the frames start
     try:
         fileobj.seek(0)
     except UnsupportedOperation:
         fileobj = StringIO(fileobj.read())
         fileobj.seek(0)
-    frames = []
-    while True:
-        frame_pos = fileobj.tell()
-        line = fileobj.readline()
-        if line.strip() == '':
-            break
-        try:
-            natoms = int(line)
-        except ValueError as err:
-            raise XYZError('ase.io.extxyz: Expected xyz header but got: {}'
-                           .format(err))
-        fileobj.readline()  # read comment line
-        for i in range(natoms):
-            fileobj.readline()
-        # check for VEC
-        nvec = 0
-        while True:
-            lastPos = fileobj.tell()
-            line = fileobj.readline()
-            if line.lstrip().startswith('VEC'):
-                nvec += 1
-                if nvec > 3:
-                    raise XYZError('ase.io.extxyz: More than 3 VECX entries')
-            else:
-                fileobj.seek(lastPos)
-                break
-        frames.append((frame_pos, natoms, nvec))
-        if last_frame is not None and len(frames) > last_frame:
-            break
+
+    frames = None
+    if index_file is not False:
+        filename = getattr(fileobj, 'name', None)
+        if not isinstance(filename, str) or not os.path.isfile(filename):
+            if index_file is not None:
+                raise ValueError('An index file requires a named file')
+        else:
+            index_filename = None
+            if isinstance(index_file, (str, os.PathLike)):
+                index_filename = str(index_file)
+            frames = read_frame_index(filename, index_filename)
+            if frames is None and index_file is not None:
+                frames = write_frame_index(filename, index_filename,
+                                           scan_xyz(fileobj))
+
+    if frames is None:
+        # scan through file to find where the frames start
+        frames = scan_xyz(fileobj, last_frame)
 
     trbl = index2range(index, len(frames))
 
+    if workers != 1:
+        def chunks():
+            for index in trbl:
+                frame_pos, natoms, nvec = (int(x) for x in frames[index])
+                fileobj.seek(frame_pos)
+                assert int(fileobj.readline()) == natoms
+                lines = list(islice(fileobj, 1 + natoms + nvec))
+                yield XYZChunk(lines, natoms, nvec, properties_parser)
+
+        yield from build_chunks(chunks(), workers)
+        return
+
     for index in trbl:
-        frame_pos, natoms, nvec = frames[index]
+        frame_pos, natoms, nvec = (int(x) for x in frames[index])
         fileobj.seek(frame_pos)
         # check for consistency with frame index table
         assert int(fileobj.readline()) == natoms
@@ -779,6 +999,14 @@ def output_column_format(atoms, columns, arrays,
     """
     Helper function to build extended XYZ comment line
     """
+    props_str, property_ncols, dtype, fmt = _column_format(columns, arrays)
+    comment_str = _comment_line(atoms, props_str, write_info, results)
+    return comment_str, property_ncols, dtype, fmt
+
+
+def _column_format(columns, arrays):
+    """Return Properties string, column counts, record dtype and format
+    for the given columns."""
     fmt_map = {'d': ('R', '%16.8f'),
                'f': ('R', '%16.8f'),
                'i': ('I', '%8d'),
@@ -787,13 +1015,6 @@ def output_column_format(atoms, columns, arrays,
                'U': ('S', '%-2s'),
                'b': ('L', ' %.1s')}
 
-    # NB: Lattice is stored as tranpose of ASE cell,
-    # with Fortran array ordering
-    lattice_str = ('Lattice="'
-                   + ' '.join([str(x) for x in np.reshape(atoms.cell.T,
-                                                          9, order='F')]) +
-                   '"')
-
     property_names = []
     property_types = []
     property_ncols = []
@@ -826,6 +1047,21 @@ def output_column_format(atoms, columns, arrays,
                               property_types,
                               [str(nc) for nc in property_ncols])])
 
+    dtype = np.dtype(dtypes)
+    fmt = ' '.join(formats) + '\n'
+
+    return props_str, property_ncols, dtype, fmt
+
+
+def _comment_line(atoms, props_str, write_info=True, results=None):
+    """Build the comment line of a frame from its Properties string."""
+    # NB: Lattice is stored as tranpose of ASE cell,
+    # with Fortran array ordering
+    lattice_str = ('Lattice="'
+                   + ' '.join([str(x) for x in np.reshape(atoms.cell.T,
+                                                          9, order='F')]) +
+                   '"')
+
     comment_str = ''
     if atoms.cell.any():
         comment_str += lattice_str + ' '
@@ -838,11 +1074,70 @@ def output_column_format(atoms, columns, arrays,
         info.update(results)
     info['pbc'] = atoms.get_pbc()  # always save periodic boundary conditions
     comment_str += ' ' + key_val_dict_to_str(info)
+    return comment_str
 
-    dtype = np.dtype(dtypes)
-    fmt = ' '.join(formats) + '\n'
 
-    return comment_str, property_ncols, dtype, fmt
+def _frame_columns(atoms, columns=None):
+    """Return the columns to write with symbols and positions first."""
+    if columns is None:
+        fr_cols = (['symbols', 'positions']
+                   + [key for key in atoms.arrays.keys() if
+                      key not in ['symbols', 'positions', 'numbers',
+                                  'species', 'pos']])
+    else:
+        fr_cols = columns[:]
+
+    # Move symbols and positions to first two properties
+    if 'symbols' in fr_cols:
+        i = fr_cols.index('symbols')
+        fr_cols[0], fr_cols[i] = fr_cols[i], fr_cols[0]
+
+    if 'positions' in fr_cols:
+        i = fr_cols.index('positions')
+        fr_cols[1], fr_cols[i] = fr_cols[i], fr_cols[1]
+
+    return fr_cols
+
+
+def _calculator_results(atoms):
+    """Return per-frame and per-atom results of the attached calculator."""
+    per_frame_results = {}
+    per_atom_results = {}
+    calculator = atoms.calc
+    if (calculator is not None
+            and isinstance(calculator, Calculator)):
+        for key in all_properties:
+            value = calculator.results.get(key, None)
+            if value is None:
+                # skip missing calculator results
+                continue
+            if (key in per_atom_properties and len(value.shape) >= 1
+                and value.shape[0] == len(atoms)):
+                # per-atom quantities (forces, energies, stresses)
+                per_atom_results[key] = value
+            elif key in per_config_properties:
+                # per-frame quantities (energy, stress)
+                # special case for stress, which should be converted
+                # to 3x3 matrices before writing
+                if key == 'stress':
+                    xx, yy, zz, yz, xz, xy = value
+                    value = np.array(
+                        [(xx, xy, xz), (xy, yy, yz), (xz, yz, zz)])
+                per_frame_results[key] = value
+    return per_frame_results, per_atom_results
+
+
+def _pack_columns(natoms, columns, ncols, dtype, arrays):
+    """Pack columns into a record array."""
+    data = np.zeros(natoms, dtype)
+    for column, ncol in zip(columns, ncols):
+        value = arrays[column]
+        if ncol == 1:
+            data[column] = np.squeeze(value)
+        else:
+            for c in range(ncol):
+                data[column + str(c)] = value[:, c]
+    return data
 
 
 def write_xyz(fileobj, images, comment='', columns=None,
@@ -876,58 +1171,20 @@ def write_xyz(fileobj, images, comment='', columns=None,
     for atoms in images:
         natoms = len(atoms)
 
-        if columns is None:
-            fr_cols = None
-        else:
-            fr_cols = columns[:]
-
-        if fr_cols is None:
-            fr_cols = (['symbols', 'positions']
-                       + [key for key in atoms.arrays.keys() if
-                          key not in ['symbols', 'positions', 'numbers',
-                                      'species', 'pos']])
-
         if vec_cell:
             plain = True
 
         if plain:
-            fr_cols = ['symbols', 'positions']
+            fr_cols = _frame_columns(atoms, ['symbols', 'positions'])
             write_info = False
             write_results = False
+        else:
+            fr_cols = _frame_columns(atoms, columns)
 
         per_frame_results = {}
         per_atom_results = {}
         if write_results:
-            calculator = atoms.calc
-            if (calculator is not None
-                    and isinstance(calculator, Calculator)):
-                for key in all_properties:
-                    value = calculator.results.get(key, None)
-                    if value is None:
-                        # skip missing calculator results
-                        continue
-                    if (key in per_atom_properties and len(value.shape) >= 1
-                        and value.shape[0] == len(atoms)):
-                        # per-atom quantities (forces, energies, stresses)
-                        per_atom_results[key] = value
-                    elif key in per_config_properties:
-                        # per-frame quantities (energy, stress)
-                        # special case for stress, which should be converted
-                        # to 3x3 matrices before writing
-                        if key == 'stress':
-                            xx, yy, zz, yz, xz, xy = value
-                            value = np.array(
-                                [(xx, xy, xz), (xy, yy, yz), (xz, yz, zz)])
-                        per_frame_results[key] = value
-
-        # Move symbols and positions to first two properties
-        if 'symbols' in fr_cols:
-            i = fr_cols.index('symbols')
-            fr_cols[0], fr_cols[i] = fr_cols[i], fr_cols[0]
-
-        if 'positions' in fr_cols:
-            i = fr_cols.index('positions')
-            fr_cols[1], fr_cols[i] = fr_cols[i], fr_cols[1]
+            per_frame_results, per_atom_results = _calculator_results(atoms)
 
         # Check first column "looks like" atomic symbols
         if fr_cols[0] in atoms.arrays:
@@ -1016,25 +1273,128 @@ def write_xyz(fileobj, images, comment='', columns=None,
                 raise ValueError('Comment line should not have line breaks.')
 
         # Pack fr_cols into record array
-        data = np.zeros(natoms, dtype)
-        for column, ncol in zip(fr_cols, ncols):
-            value = arrays[column]
-            if ncol == 1:
-                data[column] = np.squeeze(value)
-            else:
-                for c in range(ncol):
-                    data[column + str(c)] = value[:, c]
+        data = _pack_columns(natoms, fr_cols, ncols, dtype, arrays)
 
         nat = natoms
         if vec_cell:
             nat -= nPBC
         # Write the output
-        fileobj.write('%d\n' % nat)
-        fileobj.write('%s\n' % comm)
-        for i in range(natoms):
-            fileobj.write(fmt % tuple(data[i]))
+        fileobj.write(format_xyz_frame(nat, comm, fmt, data))
+
+
+def format_xyz_frame(natoms, comment, fmt, data):
+    """Format a frame as text.
+
+    *fmt* is the format of one line and *data* the record array with
+    the values of all lines, as from :func:`output_column_format`.  All
+    lines are formatted at once."""
+    rows = data.tolist()
+    return ('%d\n%s\n' % (natoms, comment) +
+            (fmt * len(rows)) % tuple(chain.from_iterable(rows)))
 
 
 # create aliases for read/write functions
 read_extxyz = read_xyz
 write_extxyz = write_xyz
+
+
+class XYZWriter:
+    """Write frames to an extended XYZ file one at a time.
+
+    Meant for dumping snapshots during a simulation: the file is kept
+    open and the column layout (Properties) is checked and worked out
+    for the first frame only.  Later frames with the same arrays and
+    calculator results reuse it, so only the comment line and the
+    columns themselves are formatted, and each frame is written with a
+    single ``write()`` call.  The output is the same as that of
+    :func:`write_xyz`.
+
+    fileobj: str or file
+        File name or file object opened for writing.
+    mode: str
+        Use ``'a'`` to append to an existing file.  Only used if
+        *fileobj* is a file name.
+    columns, write_info, write_results:
+        As for :func:`write_xyz`.
+
+    Example::
+
+        with XYZWriter('md.xyz', mode='a') as writer:
+            for step in range(nsteps):
+                dyn.run(10)
+                writer.write(atoms)
+    """
+
+    def __init__(self, fileobj, mode='w', columns=None, write_info=True,
+                 write_results=True):
+        if isinstance(fileobj, str):
+            fileobj = paropen(fileobj, mode)
+            self.close_file = True
+        else:
+            self.close_file = False
+        self.fileobj = fileobj
+        self.columns = columns
+        self.write_info = write_info
+        self.write_results = write_results
+        self.layout = None
+        self.format = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        if self.close_file:
+            self.fileobj.close()
+
+    def write(self, atoms):
+        """Write one frame."""
+        per_frame_results = {}
+        per_atom_results = {}
+        if self.write_results:
+            per_frame_results, per_atom_results = _calculator_results(atoms)
+
+        layout = ([(key, array.dtype, array.shape)
+                   for key, array in atoms.arrays.items()],
+                  [(key, value.dtype, value.shape)
+                   for key, value in per_atom_results.items()])
+
+        if layout != self.layout:
+            # New layout: write the frame with all the checks
+            self.layout = None
+            write_xyz(self.fileobj, atoms, columns=self.columns,
+                      write_info=self.write_info,
+                      write_results=self.write_results)
+            fr_cols = _frame_columns(atoms, self.columns)
+            if 'move_mask' in fr_cols:
+                # constraints are not part of the layout
+                return
+            fr_cols += [key for key in per_atom_results
+                        if key not in fr_cols]
+            arrays = self._get_arrays(atoms, fr_cols, per_atom_results)
+            self.format = (fr_cols,) + _column_format(fr_cols, arrays)
+            self.layout = layout
+            return
+
+        fr_cols, props_str, ncols, dtype, fmt = self.format
+        arrays = self._get_arrays(atoms, fr_cols, per_atom_results)
+        comm = _comment_line(atoms, props_str, self.write_info,
+                             per_frame_results)
+        data = _pack_columns(len(atoms), fr_cols, ncols, dtype, arrays)
+        self.fileobj.write(format_xyz_frame(len(atoms), comm, fmt, data))
+
+    @staticmethod
+    def _get_arrays(atoms, columns, per_atom_results):
+        arrays = {}
+        for column in columns:
+            if column in per_atom_results:
+                arrays[column] = per_atom_results[column]
+            elif column in atoms.arrays:
+                arrays[column] = atoms.arrays[column]
+            elif column == 'symbols':
+                arrays[column] = np.array(chemical_symbols)[atoms.numbers]
+            else:
+                raise ValueError('Missing array "%s"' % column)
+        return arrays
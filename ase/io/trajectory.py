@@ -1,4 +1,8 @@
+import atexit
+import queue
+import threading
 import warnings
+from copy import deepcopy
 from typing import Tuple
 
 import numpy as np
@@ -8,6 +12,7 @@ from ase.calculators.singlepoint import SinglePointCalculator, all_properties
 from ase.constraints import dict2constraint
 from ase.calculators.calculator import PropertyNotImplementedError
 from ase.atoms import Atoms
+from ase.data import atomic_masses
 from ase.io.jsonio import encode, decode
 from ase.io.pickletrajectory import PickleTrajectory
 from ase.parallel import world
@@ -17,7 +22,8 @@ from ase.utils import tokenize_version
 __all__ = ['Trajectory', 'PickleTrajectory']
 
 
-def Trajectory(filename, mode='r', atoms=None, properties=None, master=None):
+def Trajectory(filename, mode='r', atoms=None, properties=None, master=None,
+               mmap=False, compression=None):
     """A Trajectory can be created in read, write or append mode.
 
     Parameters:
@@ -43,18 +49,24 @@ def Trajectory(filename, mode='r', atoms=None, properties=None, master=None):
         Controls which process does the actual writing. The
         default is that process number 0 does this.  If this
         argument is given, processes where it is True will write.
+    mmap: bool
+        Memory-map the file in read mode, see :class:`TrajectoryReader`.
+    compression: str or dict
+        Compress arrays in write or append mode, see
+        :class:`TrajectoryWriter`.
 
     The atoms, properties and master arguments are ignores in read mode.
     """
     if mode == 'r':
-        return TrajectoryReader(filename)
-    return TrajectoryWriter(filename, mode, atoms, properties, master=master)
+        return TrajectoryReader(filename, mmap=mmap)
+    return TrajectoryWriter(filename, mode, atoms, properties, master=master,
+                            compression=compression)
 
 
 class TrajectoryWriter:
     """Writes Atoms objects to a .traj file."""
     def __init__(self, filename, mode='w', atoms=None, properties=None,
-                 extra=[], master=None):
+                 extra=[], master=None, compression=None):
         """A Trajectory writer, in write or append mode.
 
         Parameters:
@@ -80,12 +92,19 @@ class TrajectoryWriter:
             Controls which process does the actual writing. The
             default is that process number 0 does this.  If this
             argument is given, processes where it is True will write.
+        compression: str or dict
+            Compress arrays with 'zlib' or 'lzma' and/or store them in
+            single precision ('float32').  Combine with '+', e.g.
+            'float32+zlib'.  Use a dict to compress only some arrays:
+            ``{'positions': 'float32+zlib', 'momenta': 'float32+zlib'}``.
+            See :func:`ase.io.ulm.parse_codec`.
         """
         if master is None:
             master = (world.rank == 0)
         self.master = master
         self.atoms = atoms
         self.properties = properties
+        self.compression = compression
 
         self.description = {}
         self.header_data = None
@@ -107,7 +126,8 @@ class TrajectoryWriter:
         if mode not in 'aw':
             raise ValueError('mode must be "w" or "a".')
         if self.master:
-            self.backend = ulm.open(filename, mode, tag='ASE-Trajectory')
+            self.backend = ulm.open(filename, mode, tag='ASE-Trajectory',
+                                    compression=self.compression)
             if len(self.backend) > 0 and mode == 'a':
                 with Trajectory(filename) as traj:
                     atoms = traj[0]
@@ -132,6 +152,48 @@ class TrajectoryWriter:
             self._write_atoms(image, **kwargs)
 
     def _write_atoms(self, atoms, **kwargs):
+        self._write_image(atoms, self._get_calculator_data(atoms, kwargs))
+
+    def _get_calculator_data(self, atoms, kwargs):
+        """Collect name, parameters and results of the calculator."""
+        calc = atoms.calc
+
+        if calc is None and len(kwargs) > 0:
+            calc = SinglePointCalculator(atoms)
+
+        if calc is None:
+            return None
+
+        if not hasattr(calc, 'get_property'):
+            calc = OldCalculatorWrapper(calc)
+        parameters = None
+        if hasattr(calc, 'todict'):
+            parameters = calc.todict()
+        results = {}
+        for prop in all_properties:
+            if prop in kwargs:
+                x = kwargs[prop]
+            else:
+                if self.properties is not None:
+                    if prop in self.properties:
+                        x = calc.get_property(prop, atoms)
+                    else:
+                        x = None
+                else:
+                    try:
+                        x = calc.get_property(prop, atoms,
+                                              allow_calculation=False)
+                    except (PropertyNotImplementedError, KeyError):
+                        # KeyError is needed for Jacapo.
+                        # XXX We can perhaps remove this.
+                        x = None
+            if x is not None:
+                if prop in ['stress', 'dipole']:
+                    x = x.tolist()
+                results[prop] = x
+        return calc.name, parameters, results
+
+    def _write_image(self, atoms, calculator_data):
         b = self.backend
 
         if self.header_data is None:
@@ -155,39 +217,14 @@ class TrajectoryWriter:
 
         write_atoms(b, atoms, write_header=write_header)
 
-        calc = atoms.calc
-
-        if calc is None and len(kwargs) > 0:
-            calc = SinglePointCalculator(atoms)
-
-        if calc is not None:
-            if not hasattr(calc, 'get_property'):
-                calc = OldCalculatorWrapper(calc)
+        if calculator_data is not None:
+            name, parameters, results = calculator_data
             c = b.child('calculator')
-            c.write(name=calc.name)
-            if hasattr(calc, 'todict'):
-                c.write(parameters=calc.todict())
-            for prop in all_properties:
-                if prop in kwargs:
-                    x = kwargs[prop]
-                else:
-                    if self.properties is not None:
-                        if prop in self.properties:
-                            x = calc.get_property(prop, atoms)
-                        else:
-                            x = None
-                    else:
-                        try:
-                            x = calc.get_property(prop, atoms,
-                                                  allow_calculation=False)
-                        except (PropertyNotImplementedError, KeyError):
-                            # KeyError is needed for Jacapo.
-                            # XXX We can perhaps remove this.
-                            x = None
-                if x is not None:
-                    if prop in ['stress', 'dipole']:
-                        x = x.tolist()
-                    c.write(prop, x)
+            c.write(name=name)
+            if parameters is not None:
+                c.write(parameters=parameters)
+            for prop, x in results.items():
+                c.write(prop, x)
 
         info = {}
         for key, value in atoms.info.items():
@@ -210,19 +247,128 @@ class TrajectoryWriter:
         return world.sum(len(self.backend))
 
 
+class BufferedTrajectoryWriter(TrajectoryWriter):
+    """Writes Atoms objects to a .traj file in a background thread.
+
+    A copy of the atoms and the calculator results is taken by
+    :meth:`write`, and the rest of the work is done in a background
+    thread.  Images waiting in the queue are written together with a
+    single write to the file, and the file is always readable up to
+    the last image written.  Remember to call :meth:`close` (or use a
+    with-statement) to write the remaining images.
+
+    Use for MD or optimizations with cheap calculators where writing the
+    trajectory takes a noticeable part of the time::
+
+        with BufferedTrajectoryWriter('md.traj', 'w', atoms) as traj:
+            dyn.attach(traj.write, interval=10)
+            dyn.run(100000)
+    """
+    def __init__(self, filename, mode='w', atoms=None, properties=None,
+                 master=None, maxsize=100, batch_size=100, compression=None):
+        """A buffered Trajectory writer, in write or append mode.
+
+        See :class:`TrajectoryWriter` for the other parameters.
+
+        maxsize: int
+            Maximum number of images waiting to be written.  When the
+            queue is full, :meth:`write` waits.
+        batch_size: int
+            Maximum number of images written to the file in one go.
+        """
+        TrajectoryWriter.__init__(self, filename, mode, atoms, properties,
+                                  master=master, compression=compression)
+        self.batch_size = batch_size
+        self.error = None
+        self.queue = queue.Queue(maxsize)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        # Write remaining images if user forgets to close:
+        atexit.register(self.close)
+
+    def _open(self, filename, mode):
+        import ase.io.ulm as ulm
+        if mode not in 'aw':
+            raise ValueError('mode must be "w" or "a".')
+        if self.master:
+            self.backend = ulm.Writer(filename, mode, tag='ASE-Trajectory',
+                                      buffered=True,
+                                      compression=self.compression)
+            if len(self.backend) > 0 and mode == 'a':
+                with Trajectory(filename) as traj:
+                    atoms = traj[0]
+                self.header_data = get_header_data(atoms)
+        else:
+            self.backend = ulm.DummyWriter()
+
+    def _write_atoms(self, atoms, **kwargs):
+        self._check_error()
+        calculator_data = self._get_calculator_data(atoms, kwargs)
+        if calculator_data is not None:
+            calculator_data = deepcopy(calculator_data)
+        self.queue.put((atoms.copy(), calculator_data))
+
+    def _run(self):
+        nbatch = 0
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    break
+                if self.error is not None:
+                    # Drop images so that write() does not hang
+                    continue
+                self._write_image(*item)
+                nbatch += 1
+                if nbatch == self.batch_size or self.queue.empty():
+                    self.backend.flush()
+                    nbatch = 0
+            except Exception as ex:
+                self.error = ex
+            finally:
+                self.queue.task_done()
+
+    def _check_error(self):
+        if self.error is not None:
+            error = self.error
+            self.error = None
+            raise error
+
+    def flush(self):
+        """Wait for the images in the queue to be written."""
+        self.queue.join()
+        self._check_error()
+
+    def close(self):
+        """Write remaining images and close the trajectory file."""
+        atexit.unregister(self.close)
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+        try:
+            self._check_error()
+        finally:
+            self.backend.close()
+
+
 class TrajectoryReader:
     """Reads Atoms objects from a .traj file."""
-    def __init__(self, filename):
+    def __init__(self, filename, mmap=False):
         """A Trajectory in read mode.
 
         The filename traditionally ends in .traj.
+
+        With mmap=True the file is memory-mapped instead of read, and the
+        arrays of the backend (``traj.backend[i].forces`` etc.) are
+        read-only views into the file.  Only the parts of the file that
+        are used are then read from disk.
         """
 
         self.numbers = None
         self.pbc = None
         self.masses = None
 
-        self._open(filename)
+        self._open(filename, mmap)
 
     def __enter__(self):
         return self
@@ -230,9 +376,9 @@ class TrajectoryReader:
     def __exit__(self, exc_type, exc_value, tb):
         self.close()
 
-    def _open(self, filename):
+    def _open(self, filename, mmap=False):
         import ase.io.ulm as ulm
-        self.backend = ulm.open(filename, 'r')
+        self.backend = ulm.open(filename, 'r', mmap=mmap)
         self._read_header()
 
     def _read_header(self):
@@ -291,6 +437,82 @@ class TrajectoryReader:
         for i in range(len(self)):
             yield self[i]
 
+    def iter_arrays(self, name, indices=None):
+        """Iterate over one property of the images without creating Atoms.
+
+        name: str
+            Calculator property like 'energy', 'forces' or 'stress', or
+            one of 'positions', 'cell', 'pbc', 'numbers', 'masses',
+            'momenta', 'tags', 'initial_magmoms' or 'initial_charges'.
+        indices: slice or list of int
+            Images to read.  Default is all images.
+
+        Only the requested item is read from each image.  Raises KeyError
+        for images without the calculator property."""
+        if indices is None:
+            indices = range(len(self))
+        elif isinstance(indices, slice):
+            indices = range(len(self))[indices]
+        for i in indices:
+            yield self._read_property(i, name)
+
+    def get_property_array(self, name, indices=None):
+        """Return one property of the images as a single array.
+
+        Stacks the values from :meth:`iter_arrays`, e.g. all energies
+        or all forces of a trajectory::
+
+            energies = traj.get_property_array('energy')
+            forces = traj.get_property_array('forces', slice(-10, None))
+        """
+        return np.array(list(self.iter_arrays(name, indices)))
+
+    def _read_property(self, i, name):
+        b = self.backend[i]
+
+        if name in all_properties:
+            if 'calculator' not in b or name not in b.calculator:
+                raise KeyError('No {} in image {}'.format(name, i))
+            value = b.calculator.get(name)
+            if isinstance(value, list):
+                value = np.array(value)
+            return value
+
+        if name in ['positions', 'cell']:
+            return np.array(b.get(name))
+
+        if 'numbers' in b:
+            header = b
+        else:
+            header = self.backend
+        numbers = header.numbers
+        if name == 'numbers':
+            return numbers
+        if name == 'pbc':
+            return np.array(header.pbc)
+        if name == 'masses':
+            masses = header.get('masses')
+            if masses is None:
+                masses = atomic_masses[numbers]
+            return masses
+
+        key = {'momenta': 'momenta',
+               'tags': 'tags',
+               'initial_magmoms': 'magmoms',
+               'initial_charges': 'charges'}.get(name)
+        if key is None:
+            raise KeyError(name)
+        value = b.get(key)
+        if value is None:
+            # Same defaults as the Atoms object:
+            if name == 'momenta':
+                value = np.zeros((len(numbers), 3))
+            elif name == 'tags':
+                value = np.zeros(len(numbers), int)
+            else:
+                value = np.zeros(len(numbers))
+        return value
+
 
 class SlicedTrajectory:
     """Wrapper to return a slice from a trajectory without loading
@@ -109,6 +109,24 @@ argument:
 >>> r.close()
 
 
+Compression
+-----------
+
+Arrays can be compressed with zlib or lzma and/or stored in single
+precision:
+
+>>> with ulm.open('z.ulm', 'w', compression='float32+zlib') as w:
+...     w.write(a=np.ones(1000))
+>>> with ulm.open('z.ulm') as r:
+...     print(r.proxy('a').codec)
+float32+zlib
+
+A dictionary can be used to give the codec for each name
+(``compression={'positions': 'float32+zlib'}``).  The codec of every
+array is stored in the json data and ``ase ulm`` shows the compression
+ratios.
+
+
 Versions
 --------
 
@@ -120,8 +138,12 @@ Versions
 3) Changed magic string from "AFFormat" to "- of Ulm".
 """
 
+import lzma
+import mmap
 import os
 import numbers
+import zlib
+from functools import lru_cache
 from pathlib import Path
 from typing import Union, Set
 
@@ -133,9 +155,14 @@ from ase.utils import plural
 
 VERSION = 3
 N1 = 42  # block size - max number of items: 1, N1, N1*N1, N1*N1*N1, ...
+CHUNK_SIZE = 2**20  # size of compressed chunks before compression (bytes)
 
+compressors = {'zlib': (zlib.compress, zlib.decompress),
+               'lzma': (lzma.compress, lzma.decompress)}
 
-def open(filename, mode='r', index=None, tag=None):
+
+def open(filename, mode='r', index=None, tag=None, mmap=False,
+         compression=None):
     """Open ulm-file.
 
     filename: str
@@ -147,17 +174,24 @@ def open(filename, mode='r', index=None, tag=None):
         Index of item to read.  Defaults to 0.
     tag: str
         Magic ID string.
+    mmap: bool
+        Memory-map the file and return ndarrays as read-only views into
+        it instead of reading them into memory.  Only for mode 'r'.
+    compression: str or dict
+        Compression of ndarrays, see :class:`Writer`.  Only for modes
+        'w' and 'a'.
 
     Returns a :class:`Reader` or a :class:`Writer` object.  May raise
     :class:`InvalidULMFileError`.
     """
     if mode == 'r':
         assert tag is None
-        return Reader(filename, index or 0)
+        return Reader(filename, index or 0, mmap=mmap)
     if mode not in 'wa':
         2 / 0
     assert index is None
-    return Writer(filename, mode, tag or '')
+    assert not mmap
+    return Writer(filename, mode, tag or '', compression=compression)
 
 
 ulmopen = open
@@ -192,6 +226,38 @@ def readints(fd, n):
     return a
 
 
+def parse_codec(codec):
+    """Check codec string and return list of filters.
+
+    A codec is 'float32' (store float64/complex128 arrays with single
+    precision), a compressor ('zlib' or 'lzma') or both joined with a
+    '+', e.g. 'float32+zlib'.  Before compression, the bytes are
+    shuffled so that the first bytes of all numbers come first, then the
+    second bytes and so on.  This makes floating point numbers compress
+    better."""
+    filters = codec.split('+')
+    ncompressors = 0
+    for f in filters:
+        if f in compressors:
+            ncompressors += 1
+        elif f != 'float32':
+            raise ValueError('Unknown codec: {!r}'.format(f))
+    if ncompressors > 1 or len(set(filters)) < len(filters):
+        raise ValueError('Bad codec: {!r}'.format(codec))
+    return filters
+
+
+def stored_dtype(dtype, filters):
+    """Data type of array on file."""
+    dtype = np.dtype(dtype)
+    if 'float32' in filters:
+        if dtype == np.float64:
+            return np.dtype(np.float32)
+        if dtype == np.complex128:
+            return np.dtype(np.complex64)
+    return dtype
+
+
 def file_has_fileno(fd):
     """Tell whether file implements fileio() or not.
 
@@ -209,8 +275,30 @@ def file_has_fileno(fd):
     return True
 
 
+class WriteBuffer:
+    """Collect data in memory before writing it to a file.
+
+    Positions are those in the file where the data will end up."""
+    def __init__(self, pos):
+        self.pos = pos
+        self.chunks = []
+
+    def tell(self):
+        return self.pos
+
+    def write(self, data):
+        self.chunks.append(data)
+        self.pos += len(data)
+
+    def getvalue(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
 class Writer:
-    def __init__(self, fd, mode='w', tag='', data=None):
+    def __init__(self, fd, mode='w', tag='', data=None, buffered=False,
+                 compression=None):
         """Create writer object.
 
         fd: str
@@ -220,10 +308,29 @@ class Writer:
             existing one) and 'a' for appending to an existing file.
         tag: str
             Magic ID string.
+        buffered: bool
+            Keep items in memory after sync() until flush() is called.
+            All buffered items are then written in one go, followed by
+            an update of the item count.  A file that was not closed
+            properly will still be readable up to the last flush.
+        compression: str or dict
+            Codec used for ndarrays, see :func:`parse_codec`.  Use a
+            dict to give the codec for each name
+            (``{'positions': 'float32+zlib', 'forces': 'zlib'}``).
+            Arrays are compressed in chunks along the first axis, so
+            that parts of an array can still be read without reading
+            all of it.
         """
 
         assert mode in 'aw'
 
+        if isinstance(compression, str):
+            parse_codec(compression)
+        elif compression is not None:
+            for codec in compression.values():
+                parse_codec(codec)
+        self.compression = compression
+
         # Header to be written later:
         self.header = b''
 
@@ -266,6 +373,16 @@ class Writer:
                 self.offsets = np.concatenate((offsets, padding))
                 fd.seek(0, 2)
 
+        # File and position of first item not yet on the file
+        # (buffered mode):
+        self.file = None
+        self.nflushed = None
+
+        if buffered:
+            self.file = fd
+            self.nflushed = self.nitems
+            fd = WriteBuffer(fd.tell())
+
         self.fd = fd
         self.hasfileno = file_has_fileno(fd)
 
@@ -275,6 +392,8 @@ class Writer:
         self.nmissing = 0  # number of missing numbers
         self.shape = None
         self.dtype = None
+        self.filters = None  # codec of array being filled
+        self.chunks = None  # list of (number of rows, bytes) for chunks
 
     def __enter__(self):
         return self
@@ -282,11 +401,12 @@ class Writer:
     def __exit__(self, exc_type, exc_value, tb):
         self.close()
 
-    def add_array(self, name, shape, dtype=float):
+    def add_array(self, name, shape, dtype=float, codec=None):
         """Add ndarray object.
 
         Set name, shape and dtype for array and fill in the data in chunks
-        later with the fill() method.
+        later with the fill() method.  The codec defaults to the one
+        given by the compression argument of the writer.
         """
 
         self._write_header()
@@ -296,10 +416,24 @@ class Writer:
 
         shape = tuple(int(s) for s in shape)  # Convert np.int64 to int
 
+        if codec is None:
+            codec = self.get_codec(name)
+
         i = align(self.fd)
 
-        self.data[name + '.'] = {
-            'ndarray': (shape, np.dtype(dtype).name, i)}
+        if codec is None:
+            self.data[name + '.'] = {
+                'ndarray': (shape, np.dtype(dtype).name, i)}
+            self.filters = None
+        else:
+            self.filters = parse_codec(codec)
+            self.chunks = []
+            self.data[name + '.'] = {
+                'compressed_ndarray': {'shape': shape,
+                                       'dtype': np.dtype(dtype).name,
+                                       'offset': i,
+                                       'codec': codec,
+                                       'chunks': self.chunks}}
 
         assert self.nmissing == 0, 'last array not done'
 
@@ -307,6 +441,12 @@ class Writer:
         self.shape = shape
         self.nmissing = np.prod(shape)
 
+    def get_codec(self, name):
+        """Codec for array called name (None for no compression)."""
+        if isinstance(self.compression, dict):
+            return self.compression.get(name)
+        return self.compression
+
     def _write_header(self):
         # We want to delay writing until there is any real data written.
         # Some people rely on zero file size.
@@ -321,11 +461,30 @@ class Writer:
         self.nmissing -= a.size
         assert self.nmissing >= 0
 
-        if self.hasfileno:
+        if self.filters is not None:
+            self._fill_compressed(a)
+        elif self.hasfileno:
             a.tofile(self.fd)
         else:
             self.fd.write(a.tobytes())
 
+    def _fill_compressed(self, a):
+        # Chunks are whole rows:
+        assert a.ndim >= len(self.shape) - 1
+        a = a.reshape((-1,) + self.shape[1:])
+        a = a.astype(stored_dtype(a.dtype, self.filters), copy=False)
+        rowsize = max(a[:1].nbytes, 1)
+        nrows = max(CHUNK_SIZE // rowsize, 1)
+        for start in range(0, max(len(a), 1), nrows):
+            data = a[start:start + nrows].tobytes()
+            for f in self.filters:
+                if f in compressors:
+                    data = np.frombuffer(data, np.uint8).reshape(
+                        (-1, a.itemsize)).T.tobytes()  # shuffle
+                    data = compressors[f][0](data)
+            self.fd.write(data)
+            self.chunks.append((len(a[start:start + nrows]), len(data)))
+
     def sync(self):
         """Write data dictionary.
 
@@ -352,20 +511,46 @@ class Writer:
                 buf.tofile(self.fd)
             else:
                 self.fd.write(buf.tobytes())
-            writeint(self.fd, self.pos0, 40)
+            if self.file is None:
+                writeint(self.fd, self.pos0, 40)
             self.offsets = offsets
 
         self.offsets[self.nitems] = i
-        writeint(self.fd, i, self.pos0 + self.nitems * 8)
+        if self.file is None:
+            writeint(self.fd, i, self.pos0 + self.nitems * 8)
         self.nitems += 1
-        writeint(self.fd, self.nitems, 32)
-        self.fd.flush()
-        self.fd.seek(0, 2)  # end of file
+        if self.file is None:
+            writeint(self.fd, self.nitems, 32)
+            self.fd.flush()
+            self.fd.seek(0, 2)  # end of file
         if np.little_endian:
             self.data = {}
         else:
             self.data = {'_little_endian': False}
 
+    def flush(self):
+        """Write items buffered since last flush to the file.
+
+        Only needed in buffered mode.  The data goes first, then the
+        offsets of the new items and finally the item count, so that
+        the file is valid at any time."""
+        if self.file is None:
+            return
+        self._write_header()
+        fd = self.file
+        fd.write(self.fd.getvalue())
+        if self.nitems > self.nflushed:
+            offsets = self.offsets[self.nflushed:self.nitems]
+            if not np.little_endian:
+                offsets = offsets.byteswap()
+            fd.seek(self.pos0 + self.nflushed * 8)
+            fd.write(offsets.tobytes())
+            writeint(fd, self.pos0, 40)
+            writeint(fd, self.nitems, 32)
+            self.nflushed = self.nitems
+        fd.flush()
+        fd.seek(0, 2)  # end of file
+
     def write(self, *args, **kwargs):
         """Write data.
 
@@ -405,7 +590,7 @@ class Writer:
         """Create child-writer object."""
         self._write_header()
         dct = self.data[name + '.'] = {}
-        return Writer(self.fd, data=dct)
+        return Writer(self.fd, data=dct, compression=self.compression)
 
     def close(self):
         """Close file."""
@@ -417,7 +602,12 @@ class Writer:
         else:
             # Make sure header has been written (empty ulm-file):
             self._write_header()
-        self.fd.close()
+        if self.file is not None:
+            if not self.file.closed:
+                self.flush()
+                self.file.close()
+        else:
+            self.fd.close()
 
     def __len__(self):
         return int(self.nitems)
@@ -439,6 +629,9 @@ class DummyWriter:
     def sync(self):
         pass
 
+    def flush(self):
+        pass
+
     def write(self, *args, **kwargs):
         pass
 
@@ -452,24 +645,85 @@ class DummyWriter:
         return 0
 
 
-def read_header(fd):
+def read_header(fd, lazy=False):
+    """Read tag, version, number of items and the offsets of the items.
+
+    With lazy=True, the offsets are returned as an :class:`OffsetTable`
+    that reads them from the file when needed."""
     fd.seek(0)
     if fd.read(8) not in [b'- of Ulm', b'AFFormat']:
         raise InvalidULMFileError('This is not an ULM formatted file.')
     tag = fd.read(16).decode('ascii').rstrip()
     version, nitems, pos0 = readints(fd, 3)
-    fd.seek(pos0)
-    offsets = readints(fd, nitems)
+    if lazy:
+        offsets = OffsetTable(fd, pos0, nitems)
+    else:
+        fd.seek(pos0)
+        offsets = readints(fd, nitems)
     return tag, version, nitems, pos0, offsets
 
 
+class OffsetTable:
+    """Offsets of the items in a file.
+
+    The offsets are read from the file in pages of *pagesize* items when
+    needed, and the *maxpages* last used pages are kept in memory.  This
+    makes opening files with millions of items fast."""
+    def __init__(self, fd, pos0, nitems, pagesize=4096, maxpages=64):
+        self.fd = fd
+        self.pos0 = int(pos0)
+        self.nitems = int(nitems)
+        self.pagesize = pagesize
+        self.read_page = lru_cache(maxpages)(self._read_page)
+
+    def __len__(self):
+        return self.nitems
+
+    def _read_page(self, page):
+        start = page * self.pagesize
+        self.fd.seek(self.pos0 + start * 8)
+        return readints(self.fd, min(self.pagesize, self.nitems - start))
+
+    def __getitem__(self, index):
+        index = int(index)
+        if index < 0:
+            index += self.nitems
+        if not 0 <= index < self.nitems:
+            raise IndexError('Item index out of range: {}'.format(index))
+        page, i = divmod(index, self.pagesize)
+        return self.read_page(page)[i]
+
+
 class InvalidULMFileError(IOError):
     pass
 
 
+def map_file(fd):
+    """Memory-map whole file for reading.
+
+    Returns None if the file can't be mapped (no fileno() or empty file)."""
+    if not file_has_fileno(fd):
+        return None
+    try:
+        return mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ)
+    except (ValueError, OSError):
+        return None
+
+
 class Reader:
-    def __init__(self, fd, index=0, data=None, _little_endian=None):
-        """Create reader."""
+    def __init__(self, fd, index=0, data=None, _little_endian=None,
+                 mmap=False, _buffer=None, cache_size=128):
+        """Create reader.
+
+        With mmap=True, the file is memory-mapped and ndarrays are
+        returned as read-only views into the mapping, so that only the
+        pages actually used are read from disk.  Falls back to normal
+        reading for file objects that can't be mapped.
+
+        The offsets of the items are read when needed, and the json data
+        of the last *cache_size* items read is kept, so that reading an
+        item again is fast.  Reading the same item twice therefore gives
+        the same (not copied) dicts and lists."""
 
         self._little_endian = _little_endian
 
@@ -479,9 +733,14 @@ class Reader:
         self._fd = fd
         self._index = index
 
+        if mmap:
+            _buffer = map_file(fd)
+        self._buffer = _buffer
+
         if data is None:
             (self._tag, self._version, self._nitems, self._pos0,
-             self._offsets) = read_header(fd)
+             self._offsets) = read_header(fd, lazy=True)
+            self._read_json = lru_cache(cache_size)(self._read_json)
             if self._nitems > 0:
                 data = self._read_data(index)
             else:
@@ -506,10 +765,18 @@ class Reader:
                                           shape,
                                           np.dtype(dtype),
                                           offset,
-                                          self._little_endian)
+                                          self._little_endian,
+                                          self._buffer)
+                elif 'compressed_ndarray' in value:
+                    value = CompressedNDArrayReader(
+                        self._fd,
+                        little_endian=self._little_endian,
+                        buffer=self._buffer,
+                        **value['compressed_ndarray'])
                 else:
                     value = Reader(self._fd, data=value,
-                                   _little_endian=self._little_endian)
+                                   _little_endian=self._little_endian,
+                                   _buffer=self._buffer)
                 name = name[:-1]
 
             self._data[name] = value
@@ -573,16 +840,23 @@ class Reader:
         return int(self._nitems)
 
     def _read_data(self, index):
+        if index < 0:
+            index += self._nitems
+        data, self._little_endian = self._read_json(index)
+        return data
+
+    def _read_json(self, index):
         self._fd.seek(self._offsets[index])
         size = int(readints(self._fd, 1)[0])
         data = decode(self._fd.read(size).decode(), False)
-        self._little_endian = data.pop('_little_endian', True)
-        return data
+        little_endian = data.pop('_little_endian', True)
+        return data, little_endian
 
     def __getitem__(self, index):
         """Return Reader for item *index*."""
         data = self._read_data(index)
-        return Reader(self._fd, index, data, self._little_endian)
+        return Reader(self._fd, index, data, self._little_endian,
+                      _buffer=self._buffer)
 
     def tostr(self, verbose=False, indent='    '):
         keys = sorted(self._data)
@@ -591,7 +865,11 @@ class Reader:
             value = self._data[key]
             if verbose and isinstance(value, NDArrayReader):
                 value = value.read()
-            if isinstance(value, NDArrayReader):
+            if isinstance(value, CompressedNDArrayReader):
+                s = ('<ndarray shape={} dtype={} codec={} ratio={:.2f}>'
+                     .format(value.shape, value.dtype, value.codec,
+                             value.compression_ratio()))
+            elif isinstance(value, NDArrayReader):
                 s = '<ndarray shape={} dtype={}>'.format(value.shape,
                                                          value.dtype)
             elif isinstance(value, Reader):
@@ -605,12 +883,20 @@ class Reader:
         return self.tostr(False, '').replace('\n', ' ')
 
     def close(self):
+        if self._buffer is not None:
+            try:
+                self._buffer.close()
+            except BufferError:
+                # Arrays still point into the mapping.  It will be
+                # unmapped when they are gone.
+                pass
         self._fd.close()
 
 
 class NDArrayReader:
-    def __init__(self, fd, shape, dtype, offset, little_endian):
+    def __init__(self, fd, shape, dtype, offset, little_endian, buffer=None):
         self.fd = fd
+        self.buffer = buffer
         self.hasfileno = file_has_fileno(fd)
         self.shape = tuple(shape)
         self.dtype = dtype
@@ -639,24 +925,35 @@ class NDArrayReader:
         start, stop, step = i.indices(len(self))
         stride = np.prod(self.shape[1:], dtype=int)
         offset = self.offset + start * self.itemsize * stride
-        self.fd.seek(offset)
         count = (stop - start) * stride
-        if self.hasfileno:
+        mapped = (self.buffer is not None and
+                  offset + count * self.itemsize <= len(self.buffer))
+        if mapped:
+            # Read-only view into memory-mapped file:
+            a = np.frombuffer(self.buffer, self.dtype, count, offset)
+        elif self.hasfileno:
+            self.fd.seek(offset)
             a = np.fromfile(self.fd, self.dtype, count)
         else:
             # Not as fast, but works for reading from tar-files:
+            self.fd.seek(offset)
             a = np.frombuffer(self.fd.read(int(count * self.itemsize)),
                               self.dtype)
         a.shape = (stop - start,) + self.shape[1:]
         if step != 1:
-            a = a[::step].copy()
+            a = a[::step]
+            if not mapped:
+                a = a.copy()
         if self.little_endian != np.little_endian:
             # frombuffer() returns readonly array
             a = a.byteswap(inplace=a.flags.writeable)
         if self.length_of_last_dimension is not None:
             a = a[..., :self.length_of_last_dimension]
         if self.scale != 1.0:
-            a *= self.scale
+            if mapped:
+                a = a * self.scale
+            else:
+                a *= self.scale
         return a
 
     def proxy(self, *indices):
@@ -667,11 +964,101 @@ class NDArrayReader:
             stride //= self.shape[i + 1]
         offset = self.offset + start * self.itemsize
         p = NDArrayReader(self.fd, self.shape[i + 1:], self.dtype,
-                          offset, self.little_endian)
+                          offset, self.little_endian, self.buffer)
         p.scale = self.scale
         return p
 
 
+class CompressedNDArrayReader(NDArrayReader):
+    """Reader for ndarray stored in compressed chunks."""
+    def __init__(self, fd, shape, dtype, offset, codec, chunks,
+                 little_endian=True, buffer=None):
+        NDArrayReader.__init__(self, fd, shape, np.dtype(dtype.encode()),
+                               offset, little_endian, buffer)
+        self.codec = codec
+        self.filters = parse_codec(codec)
+        self.stored_dtype = stored_dtype(self.dtype, self.filters)
+        nrows, nbytes = np.array(chunks, int).reshape((-1, 2)).T
+        self.rows = np.concatenate([[0], np.cumsum(nrows)])
+        self.offsets = offset + np.concatenate([[0], np.cumsum(nbytes)])
+
+    def compression_ratio(self):
+        """Size of array in memory divided by size on file."""
+        return self.nbytes / max(self.offsets[-1] - self.offset, 1)
+
+    def _read_chunk(self, c):
+        start = int(self.offsets[c])
+        nbytes = int(self.offsets[c + 1]) - start
+        if self.buffer is not None and start + nbytes <= len(self.buffer):
+            data = memoryview(self.buffer)[start:start + nbytes]
+        else:
+            self.fd.seek(start)
+            data = self.fd.read(nbytes)
+        for f in self.filters[::-1]:
+            if f in compressors:
+                data = compressors[f][1](data)
+                itemsize = self.stored_dtype.itemsize
+                data = np.frombuffer(data, np.uint8).reshape(
+                    (itemsize, -1)).T.tobytes()  # unshuffle
+        return np.frombuffer(data, self.stored_dtype).reshape(
+            (-1,) + self.shape[1:])
+
+    def __getitem__(self, i):
+        if isinstance(i, numbers.Integral):
+            if i < 0:
+                i += len(self)
+            return self[i:i + 1][0]
+        rows = np.arange(*i.indices(len(self)))
+        if len(rows) == 0:
+            a = np.empty((0,) + self.shape[1:], self.dtype)
+        else:
+            # Chunks containing the rows:
+            c1 = np.searchsorted(self.rows, rows.min(), 'right') - 1
+            c2 = np.searchsorted(self.rows, rows.max(), 'right')
+            a = np.concatenate([self._read_chunk(c) for c in range(c1, c2)])
+            a = a[rows - self.rows[c1]]
+            if self.little_endian != np.little_endian:
+                a.byteswap(True)
+            a = a.astype(self.dtype, copy=False)
+        if self.length_of_last_dimension is not None:
+            a = a[..., :self.length_of_last_dimension]
+        if self.scale != 1.0:
+            a *= self.scale
+        return a
+
+    def proxy(self, *indices):
+        return CompressedNDArrayProxy(self, indices)
+
+
+class CompressedNDArrayProxy:
+    """Lazy view of ``reader[indices]`` for a CompressedNDArrayReader.
+
+    Only the chunk holding the selected row is decoded, and only when
+    data is accessed."""
+    def __init__(self, reader, indices):
+        self.reader = reader
+        self.indices = tuple(indices)
+        shape = list(reader.shape[len(indices):])
+        if shape and reader.length_of_last_dimension is not None:
+            shape[-1] = reader.length_of_last_dimension
+        self.shape = tuple(shape)
+        self.dtype = reader.dtype
+        self.ndim = len(self.shape)
+
+    def __len__(self):
+        return int(self.shape[0])
+
+    def read(self):
+        return self[:]
+
+    def __getitem__(self, i):
+        row = self.reader[self.indices[0]]
+        return row[self.indices[1:]][i]
+
+    def proxy(self, *indices):
+        return CompressedNDArrayProxy(self.reader, self.indices + indices)
+
+
 def print_ulm_info(filename, index=None, verbose=False):
     b = ulmopen(filename, 'r')
     if index is None:
@@ -701,11 +1088,14 @@ def copy(reader: Union[str, Path, Reader],
     for key, value in reader._data.items():
         if name + '.' + key in exclude:
             continue
-        if isinstance(value, NDArrayReader):
-            value = value.read()
-        if isinstance(value, Reader):
+        if isinstance(value, CompressedNDArrayReader):
+            writer.add_array(key, value.shape, value.dtype, value.codec)
+            writer.fill(value.read())
+        elif isinstance(value, Reader):
             copy(value, writer.child(key), exclude, name + '.' + key)
         else:
+            if isinstance(value, NDArrayReader):
+                value = value.read()
             writer.write(key, value)
     if close_reader:
         reader.close()
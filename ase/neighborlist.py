@@ -1,5 +1,6 @@
 import numpy as np
 import itertools
+from concurrent.futures import ThreadPoolExecutor
 from scipy import sparse as sp
 from scipy.spatial import cKDTree
 import scipy.sparse.csgraph as csgraph
@@ -8,6 +9,7 @@ from ase.data import atomic_numbers, covalent_radii
 from ase.geometry import complete_cell, find_mic, wrap_positions
 from ase.geometry import minkowski_reduce
 from ase.cell import Cell
+from ase.utils import get_workers
 
 
 def natural_cutoffs(atoms, mult=1, **kwargs):
@@ -138,70 +140,78 @@ def mic(dr, cell, pbc=True):
     return dr
 
 
-def primitive_neighbor_list(quantities, pbc, cell, positions, cutoff,
-                            numbers=None, self_interaction=False,
-                            use_scaled_positions=False, max_nbins=1e6):
-    """Compute a neighbor list for an atomic configuration.
+def _map_in_order(function, args, workers, group=False):
+    """Map *function* over *args* with a pool of *workers* threads.
 
-    Atoms outside periodic boundaries are mapped into the box. Atoms
-    outside nonperiodic boundaries are included in the neighbor list
-    but complexity of neighbor list search for those can become n^2.
+    Results are yielded in the order of *args*.  With *group*, lists of
+    at most *workers* results are yielded, and only that many tasks are
+    run at a time."""
+    if workers == 1:
+        for arg in args:
+            yield [function(*arg)] if group else function(*arg)
+        return
 
-    The neighbor list is sorted by first atom index 'i', but not by second
-    atom index 'j'.
+    with ThreadPoolExecutor(workers) as executor:
+        if group:
+            for k in range(0, len(args), workers):
+                yield list(executor.map(lambda arg: function(*arg),
+                                        args[k:k + workers]))
+        else:
+            yield from executor.map(lambda arg: function(*arg), args)
 
-    Parameters:
 
-    quantities: str
-        Quantities to compute by the neighbor list algorithm. Each character
-        in this string defines a quantity. They are returned in a tuple of
-        the same order. Possible quantities are
+def _empty_neighbor_list(quantities):
+    """Return empty arrays for the given quantities."""
+    empty_types = dict(i=(int, (0, )),
+                       j=(int, (0, )),
+                       D=(float, (0, 3)),
+                       d=(float, (0, )),
+                       S=(int, (0, 3)))
+    retvals = []
+    for q in quantities:
+        if q not in empty_types:
+            raise ValueError('Unsupported quantity specified.')
+        dtype, shape = empty_types[q]
+        retvals += [np.array([], dtype=dtype).reshape(shape)]
+    return retvals
 
-            * 'i' : first atom index
-            * 'j' : second atom index
-            * 'd' : absolute distance
-            * 'D' : distance vector
-            * 'S' : shift vector (number of cell boundaries crossed by the bond
-              between atom i and j). With the shift vector S, the
-              distances D between atoms can be computed from:
-              D = positions[j]-positions[i]+S.dot(cell)
-    pbc: array_like
-        3-tuple indicating giving periodic boundaries in the three Cartesian
-        directions.
-    cell: 3x3 matrix
-        Unit cell vectors.
-    positions: list of xyz-positions
-        Atomic positions.  Anything that can be converted to an ndarray of
-        shape (n, 3) will do: [(x1,y1,z1), (x2,y2,z2), ...]. If
-        use_scaled_positions is set to true, this must be scaled positions.
-    cutoff: float or dict
-        Cutoff for neighbor search. It can be:
 
-            * A single float: This is a global cutoff for all elements.
-            * A dictionary: This specifies cutoff values for element
-              pairs. Specification accepts element numbers of symbols.
-              Example: {(1, 6): 1.1, (1, 1): 1.0, ('C', 'C'): 1.85}
-            * A list/array with a per atom value: This specifies the radius of
-              an atomic sphere for each atoms. If spheres overlap, atoms are
-              within each others neighborhood. See :func:`~ase.neighborlist.natural_cutoffs`
-              for an example on how to get such a list.
-    self_interaction: bool
-        Return the atom itself as its own neighbor if set to true.
-        Default: False
-    use_scaled_positions: bool
-        If set to true, positions are expected to be scaled positions.
-    max_nbins: int
-        Maximum number of bins used in neighbor search. This is used to limit
-        the maximum amount of memory required by the neighbor list.
+def _assemble_neighbor_list(quantities, first_at_neightuple_n,
+                            secnd_at_neightuple_n, cell_shift_vector_n,
+                            distance_vector_nc, abs_distance_vector_n):
+    """Return the requested quantities of a neighbor list as a list."""
+    retvals = []
+    for q in quantities:
+        if q == 'i':
+            retvals += [first_at_neightuple_n]
+        elif q == 'j':
+            retvals += [secnd_at_neightuple_n]
+        elif q == 'D':
+            retvals += [distance_vector_nc]
+        elif q == 'd':
+            retvals += [abs_distance_vector_n]
+        elif q == 'S':
+            retvals += [cell_shift_vector_n]
+        else:
+            raise ValueError('Unsupported quantity specified.')
+    return retvals
 
-    Returns:
 
-    i, j, ... : array
-        Tuple with arrays for each quantity specified above. Indices in `i`
-        are returned in ascending order 0..len(a)-1, but the order of (i,j)
-        pairs is not guaranteed.
+def _neighbor_pair_chunks(pbc, cell, positions, cutoff, numbers,
+                          self_interaction, use_scaled_positions, max_nbins,
+                          max_memory, stats, retain, workers=1):
+    """Search for neighbor pairs in chunks of spatial bins.
 
-    """
+    Yields tuples (i, j, S, D, d) of arrays, one for each chunk of
+    consecutive bins.  All pairs with the same first atom are found in
+    the same chunk and appear in the same order regardless of the size of
+    the chunks, but the chunks are not sorted.  With more than one worker,
+    the chunks are searched in parallel threads, but still yielded in
+    order.
+
+    If *stats* is a dictionary, the number of chunks and the estimated
+    peak memory are stored in it.  With *retain*, the memory of the pairs
+    of earlier chunks is included in the estimate."""
 
     # Naming conventions: Suffixes indicate the dimension of an array. The
     # following convention is used here:
@@ -215,21 +225,13 @@ def primitive_neighbor_list(quantities, pbc, cell, positions, cutoff,
     #     p: Pair index, can have value 0 or 1
     #     n: (Linear) neighbor index
 
+    if stats is not None:
+        stats['nchunks'] = 0
+        stats['peak_memory'] = 0
+
     # Return empty neighbor list if no atoms are passed here
     if len(positions) == 0:
-        empty_types = dict(i=(int, (0, )),
-                           j=(int, (0, )),
-                           D=(float, (0, 3)),
-                           d=(float, (0, )),
-                           S=(int, (0, 3)))
-        retvals = []
-        for i in quantities:
-            dtype, shape = empty_types[i]
-            retvals += [np.array([], dtype=dtype).reshape(shape)]
-        if len(retvals) == 1:
-            return retvals[0]
-        else:
-            return tuple(retvals)
+        return
 
     # Compute reciprocal lattice vectors.
     b1_c, b2_c, b3_c = np.linalg.pinv(cell).T
@@ -251,6 +253,23 @@ def primitive_neighbor_list(quantities, pbc, cell, positions, cutoff,
             cutoff = np.asarray(cutoff)
             max_cutoff = 2*np.max(cutoff)
 
+    if isinstance(cutoff, dict) and numbers is not None:
+        # If cutoff is a dictionary, then the cutoff radii are specified per
+        # element pair.  Tabulate them for all pairs of atomic numbers.
+        numbers = np.asarray(numbers)
+        per_pair_cutoffs = {}
+        for (atomic_number1, atomic_number2), c in cutoff.items():
+            atomic_number1 = atomic_numbers.get(atomic_number1,
+                                                atomic_number1)
+            atomic_number2 = atomic_numbers.get(atomic_number2,
+                                                atomic_number2)
+            per_pair_cutoffs[atomic_number1, atomic_number2] = c
+        nz = max(max(numbers), *itertools.chain(*per_pair_cutoffs)) + 1
+        per_pair_cutoff_zz = np.zeros((nz, nz))
+        for (atomic_number1, atomic_number2), c in per_pair_cutoffs.items():
+            per_pair_cutoff_zz[atomic_number1, atomic_number2] = c
+            per_pair_cutoff_zz[atomic_number2, atomic_number1] = c
+
     # We use a minimum bin size of 3 A
     bin_size = max(max_cutoff, 3)
     # Compute number of bins such that a sphere of radius cutoff fits into
@@ -331,17 +350,7 @@ def primitive_neighbor_list(quantities, pbc, cell, positions, cutoff,
                                dtype=int)
     atom_pairs_pn = atom_pairs_pn.reshape(2, -1)
 
-    # Initialized empty neighbor list buffers.
-    first_at_neightuple_nn = []
-    secnd_at_neightuple_nn = []
-    cell_shift_vector_x_n = []
-    cell_shift_vector_y_n = []
-    cell_shift_vector_z_n = []
-
-    # This is the main neighbor list search. We loop over neighboring bins and
-    # then construct all possible pairs of atoms between two bins, assuming
-    # that each bin contains exactly max_natoms_per_bin atoms. We then throw
-    # out pairs involving pad atoms with atom index -1 below.
+    # The bins are searched in chunks of consecutive bins.
     binz_xyz, biny_xyz, binx_xyz = np.meshgrid(np.arange(nbins_c[2]),
                                                np.arange(nbins_c[1]),
                                                np.arange(nbins_c[0]),
@@ -352,165 +361,315 @@ def primitive_neighbor_list(quantities, pbc, cell, positions, cutoff,
     #     b_b = (binx_xyz + nbins_c[0] * (biny_xyz + nbins_c[1] *
     #                                     binz_xyz)).ravel()
     #     assert (b_b == np.arange(np.prod(nbins_c))).all()
+    binx_b = binx_xyz.ravel()
+    biny_b = biny_xyz.ravel()
+    binz_b = binz_xyz.ravel()
+
+    # Each candidate pair needs two atom indices and a mask, and at most
+    # two more indices, three shifts and a distance vector and distance if
+    # it is not a pad pair.
+    # With several workers, each gets a few chunks for load balancing, and
+    # the memory limit is shared between the chunks searched at a time.
+    workers = get_workers(workers)
+    nbytes_per_candidate = 17 + 8 * 9
+    nbins_per_chunk = -(-nbins // (4 * workers)) if workers > 1 else nbins
+    if max_memory is not None:
+        nbins_per_chunk = min(nbins_per_chunk,
+                              int(max_memory // (workers *
+                                                 nbytes_per_candidate *
+                                                 max_natoms_per_bin**2)))
+        nbins_per_chunk = max(nbins_per_chunk, 1)
+
+    def search_chunk(b0, b1):
+        # This is the main neighbor list search. We loop over neighboring
+        # bins and then construct all possible pairs of atoms between two
+        # bins, assuming that each bin contains exactly max_natoms_per_bin
+        # atoms. We then throw out pairs involving pad atoms with atom index
+        # -1 below, and all pairs that are too far apart.
+        first_at_neightuple_nn = []
+        secnd_at_neightuple_nn = []
+        cell_shift_vector_nn = []
+        distance_vector_nn = []
+        abs_distance_vector_nn = []
+        peak_nbytes = 0
+
+        # First atoms in pair.
+        _first_at_neightuple_bn = atoms_in_bin_ba[b0:b1][:, atom_pairs_pn[0]]
+        for dz in range(-neigh_search_z, neigh_search_z+1):
+            for dy in range(-neigh_search_y, neigh_search_y+1):
+                for dx in range(-neigh_search_x, neigh_search_x+1):
+                    # Bin index of neighboring bin and shift vector.
+                    shiftx_b, neighbinx_b = divmod(binx_b[b0:b1] + dx,
+                                                   nbins_c[0])
+                    shifty_b, neighbiny_b = divmod(biny_b[b0:b1] + dy,
+                                                   nbins_c[1])
+                    shiftz_b, neighbinz_b = divmod(binz_b[b0:b1] + dz,
+                                                   nbins_c[2])
+                    neighbin_b = (neighbinx_b + nbins_c[0] *
+                                  (neighbiny_b + nbins_c[1] * neighbinz_b))
+
+                    # Second atom in pair.
+                    _secnd_at_neightuple_bn = \
+                        atoms_in_bin_ba[neighbin_b][:, atom_pairs_pn[1]]
+
+                    # We have created too many pairs because we assumed each
+                    # bin has exactly max_natoms_per_bin atoms. Remove all
+                    # surperfluous pairs. Those are pairs that involve an
+                    # atom with index -1.
+                    mask_bn = np.logical_and(_first_at_neightuple_bn != -1,
+                                             _secnd_at_neightuple_bn != -1)
+                    first_at_neightuple_n = _first_at_neightuple_bn[mask_bn]
+                    secnd_at_neightuple_n = _secnd_at_neightuple_bn[mask_bn]
+
+                    # Shift vectors, with the global cell shift added.
+                    cell_shift_vector_n = np.empty(
+                        (len(first_at_neightuple_n), 3), dtype=int)
+                    for c, shift_b in enumerate([shiftx_b, shifty_b,
+                                                 shiftz_b]):
+                        cell_shift_vector_n[:, c] = np.broadcast_to(
+                            shift_b[:, np.newaxis], mask_bn.shape)[mask_bn]
+                    cell_shift_vector_n += \
+                        cell_shift_ic[first_at_neightuple_n] - \
+                        cell_shift_ic[secnd_at_neightuple_n]
+
+                    # Remove all self-pairs that do not cross the cell
+                    # boundary.
+                    m = np.ones(len(first_at_neightuple_n), dtype=bool)
+                    if not self_interaction:
+                        m &= np.logical_not(np.logical_and(
+                            first_at_neightuple_n == secnd_at_neightuple_n,
+                            (cell_shift_vector_n == 0).all(axis=1)))
+
+                    # For nonperiodic directions, remove any bonds that cross
+                    # the domain boundary.
+                    for c in range(3):
+                        if not pbc[c]:
+                            m &= cell_shift_vector_n[:, c] == 0
+
+                    first_at_neightuple_n = first_at_neightuple_n[m]
+                    secnd_at_neightuple_n = secnd_at_neightuple_n[m]
+                    cell_shift_vector_n = cell_shift_vector_n[m]
+
+                    # Compute distance vectors.
+                    distance_vector_nc = positions[secnd_at_neightuple_n] - \
+                        positions[first_at_neightuple_n] + \
+                        cell_shift_vector_n.dot(cell)
+                    abs_distance_vector_n = \
+                        np.sqrt(np.sum(distance_vector_nc*distance_vector_nc,
+                                       axis=1))
+
+                    peak_nbytes = max(
+                        peak_nbytes,
+                        _first_at_neightuple_bn.nbytes +
+                        _secnd_at_neightuple_bn.nbytes + mask_bn.nbytes +
+                        first_at_neightuple_n.nbytes +
+                        secnd_at_neightuple_n.nbytes +
+                        cell_shift_vector_n.nbytes +
+                        distance_vector_nc.nbytes +
+                        abs_distance_vector_n.nbytes)
+
+                    # We have still created too many pairs. Only keep those
+                    # with distance smaller than max_cutoff.
+                    mask = abs_distance_vector_n < max_cutoff
+                    if isinstance(cutoff, dict) and numbers is not None:
+                        # We now have a list up to maximum cutoff.
+                        per_pair_cutoff_n = per_pair_cutoff_zz[
+                            numbers[first_at_neightuple_n],
+                            numbers[secnd_at_neightuple_n]]
+                        mask &= abs_distance_vector_n < per_pair_cutoff_n
+                    elif not np.isscalar(cutoff):
+                        # If cutoff is neither a dictionary nor a scalar, then
+                        # we assume it is a list or numpy array that contains
+                        # atomic radii. Atoms are neighbors if their radii
+                        # overlap.
+                        mask &= abs_distance_vector_n < \
+                            cutoff[first_at_neightuple_n] + \
+                            cutoff[secnd_at_neightuple_n]
+
+                    first_at_neightuple_nn += [first_at_neightuple_n[mask]]
+                    secnd_at_neightuple_nn += [secnd_at_neightuple_n[mask]]
+                    cell_shift_vector_nn += [cell_shift_vector_n[mask]]
+                    distance_vector_nn += [distance_vector_nc[mask]]
+                    abs_distance_vector_nn += [abs_distance_vector_n[mask]]
+
+        chunk = (np.concatenate(first_at_neightuple_nn),
+                 np.concatenate(secnd_at_neightuple_nn),
+                 np.concatenate(cell_shift_vector_nn),
+                 np.concatenate(distance_vector_nn),
+                 np.concatenate(abs_distance_vector_nn))
+        return chunk, peak_nbytes
+
+    # Memory used by the bins and the pairs found so far:
+    nbytes = (atoms_in_bin_ba.nbytes + bin_index_ic.nbytes +
+              cell_shift_ic.nbytes + atom_pairs_pn.nbytes +
+              3 * binx_b.nbytes)
+    bin_ranges = [(b0, min(b0 + nbins_per_chunk, nbins))
+                  for b0 in range(0, nbins, nbins_per_chunk)]
+    for results in _map_in_order(search_chunk, bin_ranges, workers,
+                                 group=True):
+        chunks_nbytes = [sum(x.nbytes for x in chunk)
+                         for chunk, peak_nbytes in results]
+        if stats is not None:
+            stats['nchunks'] += len(results)
+            stats['peak_memory'] = max(
+                stats['peak_memory'],
+                nbytes + sum(peak_nbytes for chunk, peak_nbytes in results) +
+                sum(chunks_nbytes))
+        for chunk, peak_nbytes in results:
+            yield chunk
+        if retain:
+            nbytes += sum(chunks_nbytes)
 
-    # First atoms in pair.
-    _first_at_neightuple_n = atoms_in_bin_ba[:, atom_pairs_pn[0]]
-    for dz in range(-neigh_search_z, neigh_search_z+1):
-        for dy in range(-neigh_search_y, neigh_search_y+1):
-            for dx in range(-neigh_search_x, neigh_search_x+1):
-                # Bin index of neighboring bin and shift vector.
-                shiftx_xyz, neighbinx_xyz = divmod(binx_xyz + dx, nbins_c[0])
-                shifty_xyz, neighbiny_xyz = divmod(biny_xyz + dy, nbins_c[1])
-                shiftz_xyz, neighbinz_xyz = divmod(binz_xyz + dz, nbins_c[2])
-                neighbin_b = (neighbinx_xyz + nbins_c[0] *
-                              (neighbiny_xyz + nbins_c[1] * neighbinz_xyz)
-                              ).ravel()
-
-                # Second atom in pair.
-                _secnd_at_neightuple_n = \
-                    atoms_in_bin_ba[neighbin_b][:, atom_pairs_pn[1]]
-
-                # Shift vectors.
-                _cell_shift_vector_x_n = \
-                    np.resize(shiftx_xyz.reshape(-1, 1),
-                              (max_natoms_per_bin**2, shiftx_xyz.size)).T
-                _cell_shift_vector_y_n = \
-                    np.resize(shifty_xyz.reshape(-1, 1),
-                              (max_natoms_per_bin**2, shifty_xyz.size)).T
-                _cell_shift_vector_z_n = \
-                    np.resize(shiftz_xyz.reshape(-1, 1),
-                              (max_natoms_per_bin**2, shiftz_xyz.size)).T
-
-                # We have created too many pairs because we assumed each bin
-                # has exactly max_natoms_per_bin atoms. Remove all surperfluous
-                # pairs. Those are pairs that involve an atom with index -1.
-                mask = np.logical_and(_first_at_neightuple_n != -1,
-                                      _secnd_at_neightuple_n != -1)
-                if mask.sum() > 0:
-                    first_at_neightuple_nn += [_first_at_neightuple_n[mask]]
-                    secnd_at_neightuple_nn += [_secnd_at_neightuple_n[mask]]
-                    cell_shift_vector_x_n += [_cell_shift_vector_x_n[mask]]
-                    cell_shift_vector_y_n += [_cell_shift_vector_y_n[mask]]
-                    cell_shift_vector_z_n += [_cell_shift_vector_z_n[mask]]
-
-    # Flatten overall neighbor list.
-    first_at_neightuple_n = np.concatenate(first_at_neightuple_nn)
-    secnd_at_neightuple_n = np.concatenate(secnd_at_neightuple_nn)
-    cell_shift_vector_n = np.transpose([np.concatenate(cell_shift_vector_x_n),
-                                        np.concatenate(cell_shift_vector_y_n),
-                                        np.concatenate(cell_shift_vector_z_n)])
-
-    # Add global cell shift to shift vectors
-    cell_shift_vector_n += cell_shift_ic[first_at_neightuple_n] - \
-        cell_shift_ic[secnd_at_neightuple_n]
-
-    # Remove all self-pairs that do not cross the cell boundary.
-    if not self_interaction:
-        m = np.logical_not(np.logical_and(
-            first_at_neightuple_n == secnd_at_neightuple_n,
-            (cell_shift_vector_n == 0).all(axis=1)))
-        first_at_neightuple_n = first_at_neightuple_n[m]
-        secnd_at_neightuple_n = secnd_at_neightuple_n[m]
-        cell_shift_vector_n = cell_shift_vector_n[m]
-
-    # For nonperiodic directions, remove any bonds that cross the domain
-    # boundary.
-    for c in range(3):
-        if not pbc[c]:
-            m = cell_shift_vector_n[:, c] == 0
-            first_at_neightuple_n = first_at_neightuple_n[m]
-            secnd_at_neightuple_n = secnd_at_neightuple_n[m]
-            cell_shift_vector_n = cell_shift_vector_n[m]
-
-    # Sort neighbor list.
-    i = np.argsort(first_at_neightuple_n)
-    first_at_neightuple_n = first_at_neightuple_n[i]
-    secnd_at_neightuple_n = secnd_at_neightuple_n[i]
-    cell_shift_vector_n = cell_shift_vector_n[i]
-
-    # Compute distance vectors.
-    distance_vector_nc = positions[secnd_at_neightuple_n] - \
-        positions[first_at_neightuple_n] + \
-        cell_shift_vector_n.dot(cell)
-    abs_distance_vector_n = \
-        np.sqrt(np.sum(distance_vector_nc*distance_vector_nc, axis=1))
-
-    # We have still created too many pairs. Only keep those with distance
-    # smaller than max_cutoff.
-    mask = abs_distance_vector_n < max_cutoff
-    first_at_neightuple_n = first_at_neightuple_n[mask]
-    secnd_at_neightuple_n = secnd_at_neightuple_n[mask]
-    cell_shift_vector_n = cell_shift_vector_n[mask]
-    distance_vector_nc = distance_vector_nc[mask]
-    abs_distance_vector_n = abs_distance_vector_n[mask]
 
-    if isinstance(cutoff, dict) and numbers is not None:
-        # If cutoff is a dictionary, then the cutoff radii are specified per
-        # element pair. We now have a list up to maximum cutoff.
-        per_pair_cutoff_n = np.zeros_like(abs_distance_vector_n)
-        for (atomic_number1, atomic_number2), c in cutoff.items():
-            try:
-                atomic_number1 = atomic_numbers[atomic_number1]
-            except KeyError:
-                pass
-            try:
-                atomic_number2 = atomic_numbers[atomic_number2]
-            except KeyError:
-                pass
-            if atomic_number1 == atomic_number2:
-                mask = np.logical_and(
-                    numbers[first_at_neightuple_n] == atomic_number1,
-                    numbers[secnd_at_neightuple_n] == atomic_number2)
-            else:
-                mask = np.logical_or(
-                    np.logical_and(
-                        numbers[first_at_neightuple_n] == atomic_number1,
-                        numbers[secnd_at_neightuple_n] == atomic_number2),
-                    np.logical_and(
-                        numbers[first_at_neightuple_n] == atomic_number2,
-                        numbers[secnd_at_neightuple_n] == atomic_number1))
-            per_pair_cutoff_n[mask] = c
-        mask = abs_distance_vector_n < per_pair_cutoff_n
-        first_at_neightuple_n = first_at_neightuple_n[mask]
-        secnd_at_neightuple_n = secnd_at_neightuple_n[mask]
-        cell_shift_vector_n = cell_shift_vector_n[mask]
-        distance_vector_nc = distance_vector_nc[mask]
-        abs_distance_vector_n = abs_distance_vector_n[mask]
-    elif not np.isscalar(cutoff):
-        # If cutoff is neither a dictionary nor a scalar, then we assume it is
-        # a list or numpy array that contains atomic radii. Atoms are neighbors
-        # if their radii overlap.
-        mask = abs_distance_vector_n < \
-            cutoff[first_at_neightuple_n] + cutoff[secnd_at_neightuple_n]
-        first_at_neightuple_n = first_at_neightuple_n[mask]
-        secnd_at_neightuple_n = secnd_at_neightuple_n[mask]
-        cell_shift_vector_n = cell_shift_vector_n[mask]
-        distance_vector_nc = distance_vector_nc[mask]
-        abs_distance_vector_n = abs_distance_vector_n[mask]
-
-    # Assemble return tuple.
-    retvals = []
-    for q in quantities:
-        if q == 'i':
-            retvals += [first_at_neightuple_n]
-        elif q == 'j':
-            retvals += [secnd_at_neightuple_n]
-        elif q == 'D':
-            retvals += [distance_vector_nc]
-        elif q == 'd':
-            retvals += [abs_distance_vector_n]
-        elif q == 'S':
-            retvals += [cell_shift_vector_n]
-        else:
-            raise ValueError('Unsupported quantity specified.')
+def primitive_neighbor_list(quantities, pbc, cell, positions, cutoff,
+                            numbers=None, self_interaction=False,
+                            use_scaled_positions=False, max_nbins=1e6,
+                            max_memory=None, stats=None, workers=1):
+    """Compute a neighbor list for an atomic configuration.
+
+    Atoms outside periodic boundaries are mapped into the box. Atoms
+    outside nonperiodic boundaries are included in the neighbor list
+    but complexity of neighbor list search for those can become n^2.
+
+    The neighbor list is sorted by first atom index 'i', but not by second
+    atom index 'j'.
+
+    Parameters:
+
+    quantities: str
+        Quantities to compute by the neighbor list algorithm. Each character
+        in this string defines a quantity. They are returned in a tuple of
+        the same order. Possible quantities are
+
+            * 'i' : first atom index
+            * 'j' : second atom index
+            * 'd' : absolute distance
+            * 'D' : distance vector
+            * 'S' : shift vector (number of cell boundaries crossed by the bond
+              between atom i and j). With the shift vector S, the
+              distances D between atoms can be computed from:
+              D = positions[j]-positions[i]+S.dot(cell)
+    pbc: array_like
+        3-tuple indicating giving periodic boundaries in the three Cartesian
+        directions.
+    cell: 3x3 matrix
+        Unit cell vectors.
+    positions: list of xyz-positions
+        Atomic positions.  Anything that can be converted to an ndarray of
+        shape (n, 3) will do: [(x1,y1,z1), (x2,y2,z2), ...]. If
+        use_scaled_positions is set to true, this must be scaled positions.
+    cutoff: float or dict
+        Cutoff for neighbor search. It can be:
+
+            * A single float: This is a global cutoff for all elements.
+            * A dictionary: This specifies cutoff values for element
+              pairs. Specification accepts element numbers of symbols.
+              Example: {(1, 6): 1.1, (1, 1): 1.0, ('C', 'C'): 1.85}
+            * A list/array with a per atom value: This specifies the radius of
+              an atomic sphere for each atoms. If spheres overlap, atoms are
+              within each others neighborhood. See :func:`~ase.neighborlist.natural_cutoffs`
+              for an example on how to get such a list.
+    self_interaction: bool
+        Return the atom itself as its own neighbor if set to true.
+        Default: False
+    use_scaled_positions: bool
+        If set to true, positions are expected to be scaled positions.
+    max_nbins: int
+        Maximum number of bins used in neighbor search. This is used to limit
+        the maximum amount of memory required by the neighbor list.
+    max_memory: float
+        Approximate limit in bytes for the temporary arrays of candidate
+        pairs.  The bins are then searched in chunks, so that the memory
+        needed beyond the returned arrays stays bounded.  The result does
+        not depend on the chunk size.  Default: search all bins at once.
+    stats: dict
+        If a dictionary is given, the number of chunks ('nchunks') and the
+        estimated peak memory in bytes ('peak_memory') of the search,
+        including the returned arrays, are stored in it.
+    workers: int
+        Number of threads used to search the bins in parallel, -1 for
+        one per CPU.  The result is the same as with a single thread.
+        Default: 1
+
+    Returns:
+
+    i, j, ... : array
+        Tuple with arrays for each quantity specified above. Indices in `i`
+        are returned in ascending order 0..len(a)-1, but the order of (i,j)
+        pairs is not guaranteed.
+
+    """
+
+    chunks = list(_neighbor_pair_chunks(
+        pbc, cell, positions, cutoff, numbers, self_interaction,
+        use_scaled_positions, max_nbins, max_memory, stats, retain=True,
+        workers=workers))
+
+    if not chunks:
+        retvals = _empty_neighbor_list(quantities)
+    else:
+        arrays = [np.concatenate(x) for x in zip(*chunks)]
+        del chunks
+        # Sort neighbor list.  A stable sort keeps the pairs of each atom in
+        # the order they were found, which does not depend on the chunks.
+        i = np.argsort(arrays[0], kind='stable')
+        retvals = _assemble_neighbor_list(quantities,
+                                          *[x[i] for x in arrays])
+
     if len(retvals) == 1:
         return retvals[0]
     else:
         return tuple(retvals)
 
 
+def primitive_neighbor_list_chunks(quantities, pbc, cell, positions, cutoff,
+                                   numbers=None, self_interaction=False,
+                                   use_scaled_positions=False, max_nbins=1e6,
+                                   max_memory=1e8, stats=None, workers=1):
+    """Compute a neighbor list chunk by chunk.
+
+    Like :func:`~ase.neighborlist.primitive_neighbor_list`, but yields the
+    neighbor list in chunks, so that the complete list never has to be
+    held in memory.  Each chunk is a tuple with arrays for the requested
+    quantities (or a single array), sorted by first atom index 'i'.
+    All neighbors of an atom
+    are in the same chunk, in the order returned by
+    :func:`~ase.neighborlist.primitive_neighbor_list`, but the first atoms
+    of different chunks are interleaved.
+
+    *max_memory* (default 100 MB) limits the temporary arrays used to
+    find the chunks, see :func:`~ase.neighborlist.primitive_neighbor_list`
+    for this and the other parameters.  With several *workers*, that many
+    chunks are searched at a time.  If *stats* is a dictionary, the
+    number of chunks and the peak memory of the search are stored in it
+    as the chunks are produced.
+
+    Example::
+
+        coordination = np.zeros(len(positions), int)
+        for i in primitive_neighbor_list_chunks('i', pbc, cell, positions,
+                                                cutoff=3.0):
+            coordination += np.bincount(i, minlength=len(positions))
+    """
+
+    for q in quantities:
+        if q not in 'ijdDS':
+            raise ValueError('Unsupported quantity specified.')
+
+    for chunk in _neighbor_pair_chunks(
+            pbc, cell, positions, cutoff, numbers, self_interaction,
+            use_scaled_positions, max_nbins, max_memory, stats,
+            retain=False, workers=workers):
+        i = np.argsort(chunk[0], kind='stable')
+        retvals = _assemble_neighbor_list(quantities, *[x[i] for x in chunk])
+        if len(retvals) == 1:
+            yield retvals[0]
+        else:
+            yield tuple(retvals)
+
+
 def neighbor_list(quantities, a, cutoff, self_interaction=False,
-                  max_nbins=1e6):
+                  max_nbins=1e6, max_memory=None, stats=None, workers=1):
     """Compute a neighbor list for an atomic configuration.
 
     Atoms outside periodic boundaries are mapped into the box. Atoms
@@ -555,6 +714,15 @@ def neighbor_list(quantities, a, cutoff, self_interaction=False,
     max_nbins: int
         Maximum number of bins used in neighbor search. This is used to limit
         the maximum amount of memory required by the neighbor list.
+    max_memory: float
+        Approximate limit in bytes for the temporary arrays used in the
+        search, see :func:`~ase.neighborlist.primitive_neighbor_list`.
+    stats: dict
+        Dictionary to store the number of chunks and the peak memory in, see
+        :func:`~ase.neighborlist.primitive_neighbor_list`.
+    workers: int
+        Number of threads used for the search, -1 for one per CPU.  The
+        result does not depend on the number of threads.  Default: 1
 
     Returns:
 
@@ -620,7 +788,35 @@ def neighbor_list(quantities, a, cutoff, self_interaction=False,
                                    a.get_cell(complete=True),
                                    a.positions, cutoff, numbers=a.numbers,
                                    self_interaction=self_interaction,
-                                   max_nbins=max_nbins)
+                                   max_nbins=max_nbins,
+                                   max_memory=max_memory, stats=stats,
+                                   workers=workers)
+
+
+def neighbor_list_chunks(quantities, a, cutoff, self_interaction=False,
+                         max_nbins=1e6, max_memory=1e8, stats=None,
+                         workers=1):
+    """Compute a neighbor list for an atomic configuration chunk by chunk.
+
+    See :func:`~ase.neighborlist.neighbor_list` for the parameters and
+    :func:`~ase.neighborlist.primitive_neighbor_list_chunks` for the
+    chunks.  Only one chunk of the neighbor list is held in memory at a
+    time.
+
+    Example: Pair distribution function of a large system::
+
+        hist = np.zeros(100)
+        for d in neighbor_list_chunks('d', a, 10.0, max_memory=1e9):
+            hist += np.histogram(d, bins=100, range=(0, 10.0))[0]
+    """
+    return primitive_neighbor_list_chunks(quantities, a.pbc,
+                                          a.get_cell(complete=True),
+                                          a.positions, cutoff,
+                                          numbers=a.numbers,
+                                          self_interaction=self_interaction,
+                                          max_nbins=max_nbins,
+                                          max_memory=max_memory, stats=stats,
+                                          workers=workers)
 
 
 def first_neighbors(natoms, first_atom):
@@ -714,14 +910,18 @@ def get_connectivity_matrix(nl, sparse=True):
     if nl.nupdates <= 0:
         raise RuntimeError('Must call update(atoms) on your neighborlist first!')
 
+    first_neigh, indices, offsets = nl.get_all_neighbors()
+    first = np.repeat(np.arange(nAtoms), np.diff(first_neigh))
+
     if sparse:
-        matrix = sp.dok_matrix((nAtoms, nAtoms), dtype=np.int8)
+        pairs = np.unique(first * nAtoms + indices)
+        first, indices = divmod(pairs, nAtoms)
+        matrix = sp.coo_matrix((np.ones(len(pairs), dtype=np.int8),
+                                (first, indices)),
+                               shape=(nAtoms, nAtoms)).todok()
     else:
         matrix = np.zeros((nAtoms, nAtoms), dtype=np.int8)
-
-    for i in range(nAtoms):
-        for idx in nl.get_neighbors(i)[0]:
-            matrix[i, idx] = 1
+        matrix[first, indices] = 1
 
     return matrix
 
@@ -746,6 +946,9 @@ class NewPrimitiveNeighborList:
     bothways: bool
         Return all neighbors.  Default is to return only "half" of
         the neighbors.
+    workers: int
+        Number of threads used to build the list, -1 for one per CPU.
+        See :func:`~ase.neighborlist.primitive_neighbor_list`.
 
     Example::
 
@@ -755,7 +958,7 @@ class NewPrimitiveNeighborList:
     """
 
     def __init__(self, cutoffs, skin=0.3, sorted=False, self_interaction=True,
-                 bothways=False, use_scaled_positions=False):
+                 bothways=False, use_scaled_positions=False, workers=1):
         self.cutoffs = np.asarray(cutoffs) + skin
         self.skin = skin
         self.sorted = sorted
@@ -763,6 +966,7 @@ class NewPrimitiveNeighborList:
         self.bothways = bothways
         self.nupdates = 0
         self.use_scaled_positions = use_scaled_positions
+        self.workers = workers
         self.nneighbors = 0
         self.npbcneighbors = 0
 
@@ -791,7 +995,8 @@ class NewPrimitiveNeighborList:
             primitive_neighbor_list(
                 'ijS', pbc, cell, positions, self.cutoffs, numbers=numbers,
                 self_interaction=self.self_interaction,
-                use_scaled_positions=self.use_scaled_positions)
+                use_scaled_positions=self.use_scaled_positions,
+                workers=self.workers)
 
         if len(positions) > 0 and not self.bothways:
             offset_x, offset_y, offset_z = offset_vec.T
@@ -841,6 +1046,13 @@ class NewPrimitiveNeighborList:
         return (self.pair_second[self.first_neigh[a]:self.first_neigh[a+1]],
                 self.offset_vec[self.first_neigh[a]:self.first_neigh[a+1]])
 
+    def get_all_neighbors(self):
+        """Return the neighbors of all atoms.
+
+        See :meth:`ase.neighborlist.NeighborList.get_all_neighbors`."""
+
+        return self.first_neigh, self.pair_second, self.offset_vec
+
 
 class PrimitiveNeighborList:
     """Neighbor list that works without Atoms objects.
@@ -905,6 +1117,7 @@ class PrimitiveNeighborList:
         natoms = len(positions)
         self.nneighbors = 0
         self.npbcneighbors = 0
+        self.all_neighbors = None
         self.neighbors = [np.empty(0, int) for a in range(natoms)]
         self.displacements = [np.empty((0, 3), int) for a in range(natoms)]
         self.nupdates += 1
@@ -1002,6 +1215,285 @@ class PrimitiveNeighborList:
 
         return self.neighbors[a], self.displacements[a]
 
+    def get_all_neighbors(self):
+        """Return the neighbors of all atoms.
+
+        See :meth:`ase.neighborlist.NeighborList.get_all_neighbors`.
+        The arrays are built from the per-atom lists on the first call
+        after each rebuild of the list."""
+
+        if self.all_neighbors is None:
+            natoms = len(self.neighbors)
+            first_neigh = np.zeros(natoms + 1, int)
+            first_neigh[1:] = np.cumsum([len(i) for i in self.neighbors])
+            if natoms > 0:
+                indices = np.concatenate(self.neighbors).astype(int)
+                offsets = np.concatenate(self.displacements).astype(int)
+            else:
+                indices = np.empty(0, int)
+                offsets = np.empty((0, 3), int)
+            self.all_neighbors = (first_neigh, indices,
+                                  offsets.reshape((-1, 3)))
+        return self.all_neighbors
+
+
+class LinkedCellNeighborList:
+    """Neighbor list built with linked cells.
+
+    Atoms are sorted into cells (bins) at least as large as the longest
+    interaction range, and neighbors are only searched for in the
+    surrounding cells.  The build is therefore O(N) and only uses array
+    operations.  The result is stored in compressed sparse row form:
+    the neighbors of atom a are ``pair_second[first_neigh[a]:first_neigh[a
+    + 1]]`` with shift vectors ``offset_vec[first_neigh[a]:first_neigh[a +
+    1]]``.
+
+    The displacement of every atom since the last build is tracked, and
+    the list is only rebuilt when some atom has moved more than the skin.
+    Atoms are only sorted into cells again if some atom has changed cell.
+
+    The parameters are the same as for
+    :class:`~ase.neighborlist.NewPrimitiveNeighborList`.  With several
+    workers, the neighboring cells are searched in parallel threads.
+    """
+
+    def __init__(self, cutoffs, skin=0.3, sorted=False, self_interaction=True,
+                 bothways=False, use_scaled_positions=False, max_nbins=1e6,
+                 workers=1):
+        self.cutoffs = np.asarray(cutoffs) + skin
+        self.skin = skin
+        self.sorted = sorted
+        self.self_interaction = self_interaction
+        self.bothways = bothways
+        self.nupdates = 0
+        self.nbinnings = 0
+        self.use_scaled_positions = use_scaled_positions
+        self.max_nbins = max_nbins
+        self.workers = workers
+        self.nneighbors = 0
+        self.npbcneighbors = 0
+        self.bins = None
+
+    def update(self, pbc, cell, coordinates):
+        """Make sure the list is up to date."""
+
+        if self.nupdates == 0:
+            self.build(pbc, cell, coordinates)
+            return True
+
+        if ((self.pbc != pbc).any() or (self.cell != cell).any() or
+                len(self.coordinates) != len(coordinates)):
+            self.build(pbc, cell, coordinates)
+            return True
+
+        if self.use_scaled_positions:
+            positions = np.dot(coordinates, complete_cell(cell))
+        else:
+            positions = coordinates
+        self.displacements = positions - self.positions
+        if (self.displacements**2).sum(1).max(initial=0) > self.skin**2:
+            self.build(pbc, cell, coordinates)
+            return True
+
+        return False
+
+    def build(self, pbc, cell, coordinates):
+        """Build the list.
+
+        Coordinates are taken to be scaled or not according
+        to self.use_scaled_positions.
+        """
+        self.pbc = pbc = np.array(pbc, dtype=bool, copy=True)
+        self.cell = cell = np.array(cell, dtype=float, copy=True)
+        self.coordinates = coordinates = np.array(coordinates, dtype=float,
+                                                  copy=True)
+        natoms = len(coordinates)
+
+        if len(self.cutoffs) != natoms:
+            raise ValueError('Wrong number of cutoff radii: {0} != {1}'
+                             .format(len(self.cutoffs), natoms))
+
+        cell_cv = complete_cell(cell)
+        if self.use_scaled_positions:
+            scaled_ic = coordinates
+            positions = np.dot(scaled_ic, cell_cv)
+        else:
+            positions = coordinates
+            scaled_ic = np.linalg.solve(cell_cv.T, positions.T).T
+        self.positions = positions
+        self.displacements = np.zeros((natoms, 3))
+
+        if natoms == 0:
+            self.set_pairs(np.empty(0, int), np.empty(0, int),
+                           np.empty((0, 3), int))
+            return
+
+        # Wrap atoms into the cell along periodic directions:
+        cell_shift_ic = np.zeros((natoms, 3), int)
+        cell_shift_ic[:, pbc] = np.floor(scaled_ic[:, pbc]).astype(int)
+        scaled_ic = scaled_ic - cell_shift_ic
+
+        rcmax = 2 * self.cutoffs.max()
+        bins = self.bin_atoms(pbc, cell_cv, scaled_ic, rcmax)
+        nbins_c, search_c, bin_index_ic, atom_order_a, bin_start_b = bins
+
+        def search_cell(dx, dy, dz):
+            # Pair up all atoms with the atoms in the neighboring cell at
+            # (dx, dy, dz):
+            neighbin_ic = bin_index_ic + (dx, dy, dz)
+            binshift_ic = np.zeros_like(neighbin_ic)
+            valid_i = np.ones(natoms, bool)
+            for c in range(3):
+                if pbc[c]:
+                    binshift_ic[:, c], neighbin_ic[:, c] = divmod(
+                        neighbin_ic[:, c], nbins_c[c])
+                else:
+                    valid_i &= ((neighbin_ic[:, c] >= 0) &
+                                (neighbin_ic[:, c] < nbins_c[c]))
+            first_i = np.arange(natoms)[valid_i]
+            neighbin_i = (neighbin_ic[valid_i, 0] + nbins_c[0] *
+                          (neighbin_ic[valid_i, 1] + nbins_c[1] *
+                           neighbin_ic[valid_i, 2]))
+
+            # Expand every atom to all atoms of its neighboring cell:
+            count_i = bin_start_b[neighbin_i + 1] - bin_start_b[neighbin_i]
+            npairs = count_i.sum()
+            start_i = np.cumsum(count_i) - count_i
+            index_n = (np.repeat(bin_start_b[neighbin_i] - start_i,
+                                 count_i) + np.arange(npairs))
+            first = np.repeat(first_i, count_i)
+            second = atom_order_a[index_n]
+            shift = (np.repeat(binshift_ic[valid_i], count_i, axis=0) +
+                     cell_shift_ic[first] - cell_shift_ic[second])
+
+            D = (positions[second] - positions[first] +
+                 np.dot(shift, cell_cv))
+            rc = self.cutoffs[first] + self.cutoffs[second]
+            mask = (D**2).sum(1) < rc**2
+            if not self.self_interaction:
+                mask &= ((first != second) | shift.any(1))
+            return first[mask], second[mask], shift[mask]
+
+        # Loop over neighboring cells.  The pairs are collected in the same
+        # order with any number of workers.
+        offsets = list(itertools.product(range(-search_c[0], search_c[0] + 1),
+                                         range(-search_c[1], search_c[1] + 1),
+                                         range(-search_c[2], search_c[2] + 1)))
+        pairs = list(_map_in_order(search_cell, offsets,
+                                   get_workers(self.workers)))
+        pair_first = np.concatenate([p[0] for p in pairs])
+        pair_second = np.concatenate([p[1] for p in pairs])
+        offset_vec = np.concatenate([p[2] for p in pairs]).reshape((-1, 3))
+
+        if not self.bothways:
+            offset_x, offset_y, offset_z = offset_vec.T
+
+            mask = offset_z > 0
+            mask &= offset_y == 0
+            mask |= offset_y > 0
+            mask &= offset_x == 0
+            mask |= offset_x > 0
+            mask |= (pair_first <= pair_second) & (offset_vec == 0).all(axis=1)
+
+            pair_first = pair_first[mask]
+            pair_second = pair_second[mask]
+            offset_vec = offset_vec[mask]
+
+        self.set_pairs(pair_first, pair_second, offset_vec)
+
+    def bin_atoms(self, pbc, cell_cv, scaled_ic, rcmax):
+        """Sort atoms into cells.
+
+        Returns the number of cells and the number of neighboring cells
+        to search along each direction, the cell index of every atom,
+        the atoms ordered by cell and the start of each cell within this
+        order.  If no atom has changed cell since the last build, the
+        previous sorting is reused."""
+
+        # Distances between opposite cell faces:
+        face_dist_c = 1 / np.linalg.norm(np.linalg.inv(cell_cv), axis=0)
+
+        # Along nonperiodic directions, only the region with atoms is binned:
+        origin_c = np.zeros(3)
+        extent_c = np.ones(3)
+        for c in range(3):
+            if not pbc[c]:
+                origin_c[c] = scaled_ic[:, c].min()
+                extent_c[c] = scaled_ic[:, c].max() - origin_c[c]
+
+        # We use a minimum cell size of 3 Angstrom
+        bin_size = max(rcmax, 3)
+        nbins_c = np.maximum((extent_c * face_dist_c / bin_size).astype(int),
+                             1)
+        while np.prod(nbins_c) > self.max_nbins:
+            nbins_c = np.maximum(nbins_c // 2, 1)
+        width_c = extent_c / nbins_c
+
+        bin_index_ic = np.zeros(scaled_ic.shape, int)
+        search_c = np.zeros(3, int)
+        for c in range(3):
+            if width_c[c] == 0:
+                continue
+            bin_index_ic[:, c] = np.clip(
+                np.floor((scaled_ic[:, c] - origin_c[c]) / width_c[c]),
+                0, nbins_c[c] - 1)
+            search_c[c] = np.ceil(rcmax / (width_c[c] * face_dist_c[c]))
+            if not pbc[c]:
+                search_c[c] = min(search_c[c], nbins_c[c] - 1)
+
+        if (self.bins is not None and
+                (self.bins[0] == nbins_c).all() and
+                self.bins[2].shape == bin_index_ic.shape and
+                (self.bins[2] == bin_index_ic).all()):
+            self.bins = (nbins_c, search_c) + self.bins[2:]
+            return self.bins
+
+        bin_index_a = (bin_index_ic[:, 0] + nbins_c[0] *
+                       (bin_index_ic[:, 1] + nbins_c[1] * bin_index_ic[:, 2]))
+        atom_order_a = np.argsort(bin_index_a, kind='stable')
+        bin_start_b = np.zeros(np.prod(nbins_c) + 1, int)
+        bin_start_b[1:] = np.cumsum(np.bincount(bin_index_a,
+                                                minlength=np.prod(nbins_c)))
+        self.nbinnings += 1
+        self.bins = (nbins_c, search_c, bin_index_ic, atom_order_a,
+                     bin_start_b)
+        return self.bins
+
+    def set_pairs(self, pair_first, pair_second, offset_vec):
+        """Sort the pairs by first atom and build the index arrays."""
+        if self.sorted:
+            order = np.lexsort((pair_second, pair_first))
+        else:
+            order = np.argsort(pair_first, kind='stable')
+        self.pair_first = pair_first[order]
+        self.pair_second = pair_second[order]
+        self.offset_vec = offset_vec[order]
+
+        natoms = len(self.coordinates)
+        self.first_neigh = np.zeros(natoms + 1, int)
+        self.first_neigh[1:] = np.cumsum(np.bincount(self.pair_first,
+                                                     minlength=natoms))
+
+        self.nneighbors = len(self.pair_first)
+        self.npbcneighbors = self.offset_vec.any(1).sum()
+        self.nupdates += 1
+
+    def get_neighbors(self, a):
+        """Return neighbors of atom number a.
+
+        See :meth:`ase.neighborlist.PrimitiveNeighborList.get_neighbors`.
+        """
+
+        return (self.pair_second[self.first_neigh[a]:self.first_neigh[a + 1]],
+                self.offset_vec[self.first_neigh[a]:self.first_neigh[a + 1]])
+
+    def get_all_neighbors(self):
+        """Return the neighbors of all atoms.
+
+        See :meth:`ase.neighborlist.NeighborList.get_all_neighbors`."""
+
+        return self.first_neigh, self.pair_second, self.offset_vec
+
 
 class NeighborList:
     """Neighbor list object.
@@ -1022,10 +1514,20 @@ class NeighborList:
     bothways: bool
         Return all neighbors.  Default is to return only "half" of
         the neighbors.
-    primitive: :class:`~ase.neighborlist.PrimitiveNeighborList` or :class:`~ase.neighborlist.NewPrimitiveNeighborList` class
+    primitive: :class:`~ase.neighborlist.PrimitiveNeighborList`, :class:`~ase.neighborlist.NewPrimitiveNeighborList` or :class:`~ase.neighborlist.LinkedCellNeighborList` class
         Define which implementation to use. Older and quadratically-scaling
-        :class:`~ase.neighborlist.PrimitiveNeighborList` or newer and
-        linearly-scaling :class:`~ase.neighborlist.NewPrimitiveNeighborList`.
+        :class:`~ase.neighborlist.PrimitiveNeighborList`, newer and
+        linearly-scaling :class:`~ase.neighborlist.NewPrimitiveNeighborList`
+        or linearly-scaling
+        :class:`~ase.neighborlist.LinkedCellNeighborList`, which only
+        rebuilds what is needed when atoms have moved.
+    workers: int
+        Number of threads used to build the list, -1 for one per CPU.
+        Only supported by
+        :class:`~ase.neighborlist.NewPrimitiveNeighborList` and
+        :class:`~ase.neighborlist.LinkedCellNeighborList`; a ValueError is
+        raised for other primitives unless workers is 1.  The list does
+        not depend on the number of threads.
 
     Example::
 
@@ -1035,10 +1537,19 @@ class NeighborList:
     """
 
     def __init__(self, cutoffs, skin=0.3, sorted=False, self_interaction=True,
-                 bothways=False, primitive=PrimitiveNeighborList):
+                 bothways=False, primitive=PrimitiveNeighborList, workers=1):
+        kwargs = {}
+        if workers != 1:
+            if not issubclass(primitive, (NewPrimitiveNeighborList,
+                                          LinkedCellNeighborList)):
+                raise ValueError(
+                    'workers={} requires NewPrimitiveNeighborList or '
+                    'LinkedCellNeighborList as primitive, not {}'
+                    .format(workers, primitive.__name__))
+            kwargs['workers'] = workers
         self.nl = primitive(cutoffs, skin, sorted,
                             self_interaction=self_interaction,
-                            bothways=bothways)
+                            bothways=bothways, **kwargs)
 
     def update(self, atoms):
         """
@@ -1059,6 +1570,36 @@ class NeighborList:
 
         return self.nl.get_neighbors(a)
 
+    def get_all_neighbors(self, atoms=None):
+        """Return the neighbors of all atoms as flat arrays.
+
+        Returns *first_neigh*, *indices* and *offsets*.  The neighbors of
+        atom a are ``indices[first_neigh[a]:first_neigh[a + 1]]`` with
+        the offsets ``offsets[first_neigh[a]:first_neigh[a + 1]]``, as
+        returned by :meth:`get_neighbors`.  The arrays are owned by the
+        neighbor list and must not be modified.
+
+        If *atoms* is given, the distance vectors from each atom to its
+        neighbors are returned as a fourth array::
+
+          first, indices, offsets, D = nl.get_all_neighbors(atoms)
+          i = np.repeat(np.arange(len(atoms)), np.diff(first))
+          # D[n] == positions[indices[n]] + offsets[n] @ cell - positions[i[n]]
+        """
+        if self.nl.nupdates <= 0:
+            raise RuntimeError('Must call update(atoms) on your neighborlist '
+                               'first!')
+
+        first_neigh, indices, offsets = self.nl.get_all_neighbors()
+        if atoms is None:
+            return first_neigh, indices, offsets
+
+        first = np.repeat(np.arange(len(first_neigh) - 1),
+                          np.diff(first_neigh))
+        D = (atoms.positions[indices] - atoms.positions[first] +
+             offsets @ atoms.cell.complete())
+        return first_neigh, indices, offsets, D
+
     def get_connectivity_matrix(self, sparse=True):
         """
         See :func:`~ase.neighborlist.get_connectivity_matrix`.
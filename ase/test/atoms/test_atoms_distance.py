@@ -1,4 +1,8 @@
 import itertools
+
+import numpy as np
+import pytest
+
 from ase import Atoms
 from ase.geometry import get_distances
 from ase.lattice.cubic import FaceCenteredCubic
@@ -69,3 +73,21 @@ def test_antisymmetry():
 
     for i, j in itertools.combinations(range(len(atoms)), 2):
         assert (vmin[i, j] == -vmin[j, i]).all()
+
+
+@pytest.mark.parametrize('mic', [False, True])
+def test_all_distances_cutoff(mic):
+    atoms = FaceCenteredCubic(size=[2, 2, 2], symbol='Cu',
+                              latticeconstant=3.6, pbc=(1, 1, 0))
+    atoms.rattle(stdev=0.1, seed=1)
+    dm = atoms.get_all_distances(mic=mic)
+    D = atoms.get_all_distances(mic=mic, vector=True)
+
+    i, j, d = atoms.get_all_distances(mic=mic, cutoff=3.0)
+    ref_i, ref_j = np.nonzero((dm < 3.0) & ~np.eye(len(atoms), dtype=bool))
+    assert (i == ref_i).all()
+    assert (j == ref_j).all()
+    assert d == pytest.approx(dm[i, j])
+
+    i, j, vectors = atoms.get_all_distances(mic=mic, vector=True, cutoff=3.0)
+    assert vectors == pytest.approx(D[i, j])
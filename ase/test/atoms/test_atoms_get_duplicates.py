@@ -26,3 +26,26 @@ def test_atoms_get_duplicates():
     dups = get_duplicate_atoms(at)
 
     assert dups.size == 0
+
+
+def test_atoms_get_duplicates_mic():
+    from ase.build import bulk
+    from ase.geometry import get_duplicate_atoms
+    from ase.neighborlist import neighbor_list
+
+    atoms = bulk('Cu', 'fcc', a=3.6) * (2, 2, 2)
+    atoms += atoms[:1]
+    # A periodic image of atom 0 shifted by 0.05 Angstrom:
+    atoms.positions[-1] += atoms.cell[0] + [0.05, 0, 0]
+    assert get_duplicate_atoms(atoms, cutoff=0.2).size == 0
+    dups = get_duplicate_atoms(atoms, cutoff=0.2, mic=True)
+    assert dups.tolist() == [[0, 8]]
+
+    # Cutoff above half the cell, where the search uses a neighbor list:
+    dups = get_duplicate_atoms(atoms, cutoff=3.0, mic=True)
+    i, j = neighbor_list('ij', atoms, 3.0)
+    pairs = {(a, b) for a, b in zip(i.tolist(), j.tolist()) if a < b}
+    assert dups.tolist() == [list(pair) for pair in sorted(pairs)]
+
+    get_duplicate_atoms(atoms, cutoff=0.2, delete=True, mic=True)
+    assert len(atoms) == 8
@@ -0,0 +1,123 @@
+import os
+
+import numpy as np
+import pytest
+from scipy.interpolate import InterpolatedUnivariateSpline as spline
+
+from ase.build import bulk, fcc111
+from ase.calculators import eam
+from ase.calculators.eam import EAM
+
+cutoff = 6.0
+
+
+def make_eam(form):
+    # smooth two-element potential built from analytic functions
+    rs = np.linspace(0.5, cutoff, 40)
+    rhos = np.linspace(0, 4, 40)
+    tail = (cutoff - rs)**2
+
+    embedded_energy = np.array([spline(rhos, -(1 + 0.1 * a) *
+                                       np.sqrt(rhos + 0.1))
+                                for a in range(2)])
+    phi = np.empty((2, 2), object)
+    density = np.empty((2, 2), object)
+    for a in range(2):
+        for b in range(2):
+            phi[a, b] = spline(rs, (1 + 0.2 * (a + b)) * tail / 10 *
+                               (np.exp(-2 * (rs - 2.5)) -
+                                2 * np.exp(-(rs - 2.5))))
+            density[a, b] = spline(rs, (1 + 0.3 * a + 0.1 * b) *
+                                   np.exp(-rs) * tail)
+    if form != 'fs':
+        density = density[:, 0].copy()
+
+    def deriv(functions):
+        return np.array([EAM.deriv(None, f) for f in functions.flat],
+                        object).reshape(functions.shape)
+
+    adp = {}
+    if form == 'adp':
+        d = np.empty((2, 2), object)
+        q = np.empty((2, 2), object)
+        for a in range(2):
+            for b in range(2):
+                d[a, b] = spline(rs, 0.05 * (1 + a + b) * tail * np.exp(-rs))
+                q[a, b] = spline(rs, 0.03 * (2 + a * b) * tail * np.exp(-rs))
+        adp = dict(d=d, q=q, d_d=deriv(d), d_q=deriv(q))
+
+    return EAM(elements=['Cu', 'Ag'], form=form, cutoff=cutoff,
+               embedded_energy=embedded_energy, electron_density=density,
+               phi=phi,
+               d_embedded_energy=deriv(embedded_energy),
+               d_electron_density=deriv(density),
+               d_phi=deriv(phi), **adp)
+
+
+def systems():
+    atoms = bulk('Cu', 'fcc', a=3.7, cubic=True) * (2, 2, 2)
+    atoms.symbols[::3] = 'Ag'
+    atoms.rattle(stdev=0.1, seed=7)
+    yield atoms
+
+    slab = fcc111('Cu', (2, 2, 3), a=3.7, vacuum=5.0)
+    slab.symbols[:2] = 'Ag'
+    yield slab
+
+
+@pytest.mark.parametrize('form', ['alloy', 'fs', 'adp'])
+@pytest.mark.parametrize('atoms', systems())
+def test_forces(form, atoms):
+    atoms.calc = make_eam(form)
+    forces = atoms.get_forces()
+    numerical = atoms.calc.calculate_numerical_forces(atoms, d=1e-4)
+    assert forces == pytest.approx(numerical, abs=1e-5)
+
+
+def test_adp_energy():
+    # energies from the previous atom-by-atom implementation
+    for atoms, energy in zip(systems(), [-442.5277331281, -123.4633842845]):
+        atoms.calc = make_eam('adp')
+        assert atoms.get_potential_energy() == pytest.approx(energy,
+                                                             abs=1e-8)
+
+
+def test_potential_cache(pt_eam_potential_file, testdir, monkeypatch):
+    eam.clear_potential_cache()
+    filename = 'Pt_u3.eam'
+    with open(filename, 'w') as fd:
+        fd.write(pt_eam_potential_file.read_text())
+
+    eam1 = EAM(potential=filename, elements=['Pt'])
+    eam2 = EAM(potential=filename, elements=['Pt'])
+    assert eam1.phi[0, 0] is not eam2.phi[0, 0]
+    assert eam1.rphi_data is not eam2.rphi_data
+
+    slab = fcc111('Pt', size=(2, 2, 2), vacuum=5.0)
+    slab.calc = eam1
+    energy = slab.get_potential_energy()
+    slab.calc = eam2
+    assert slab.get_potential_energy() == pytest.approx(energy, abs=1e-12)
+
+    # calculators do not share mutable state
+    eam1.rphi_data[:] = 0.0
+    eam1.phi[0, 0] = None
+    eam3 = EAM(potential=filename, elements=['Pt'])
+    slab.calc = eam3
+    assert slab.get_potential_energy() == pytest.approx(energy, abs=1e-12)
+    assert eam3.rphi_data.any()
+
+    # a modified file must be read again
+    stat = os.stat(filename)
+    os.utime(filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    eam4 = EAM(potential=filename, elements=['Pt'])
+    assert eam4.phi[0, 0] is not eam1.phi[0, 0]
+    assert len(eam._potential_cache) == 2
+
+    monkeypatch.setattr(eam, '_potential_cache_size', 1)
+    os.utime(filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10**9))
+    EAM(potential=filename, elements=['Pt'])
+    assert len(eam._potential_cache) == 1
+
+    eam.clear_potential_cache()
+    assert len(eam._potential_cache) == 0
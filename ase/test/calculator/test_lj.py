@@ -130,3 +130,26 @@ def test_bulk_stress():
     pressure = sum(stress[:3]) / 3
 
     assert pressure == reference_pressure
+
+
+@pytest.mark.parametrize('smooth', [False, True])
+def test_rattled_bulk(smooth):
+    # half neighbor list results must agree with finite differences
+    atoms = bulk("Ar", cubic=True) * (2, 2, 2)
+    atoms.rattle(stdev=0.1, seed=42)
+    atoms.calc = LennardJones(sigma=3.4, epsilon=0.01, rc=9.0, smooth=smooth)
+
+    forces = atoms.get_forces()
+    np.testing.assert_allclose(forces.sum(axis=0), 0, atol=1e-12)
+    np.testing.assert_allclose(
+        forces, atoms.calc.calculate_numerical_forces(atoms, d=1e-5),
+        atol=1e-8)
+
+    stress = atoms.get_stress()
+    np.testing.assert_allclose(
+        stress, atoms.calc.calculate_numerical_stress(atoms, d=1e-5),
+        atol=1e-8)
+
+    # atomic stresses are only computed when asked for
+    assert 'stresses' not in atoms.calc.results
+    assert np.allclose(atoms.get_stresses().sum(axis=0), stress)
@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+from ase import Atoms
+from ase.build import bulk
+from ase.calculators.lj import LennardJones
+from ase.calculators.morse import MorsePotential
+from ase.calculators.pairpotential import (Buckingham,
+                                           TabulatedPairPotential,
+                                           pair_parameter)
+
+
+def rattled_alloy():
+    atoms = bulk('Ar', 'fcc', a=5.3, cubic=True) * (2, 2, 2)
+    atoms.symbols[::3] = 'Xe'
+    atoms.rattle(stdev=0.1, seed=42)
+    return atoms
+
+
+def calculators():
+    yield LennardJones(sigma={('Ar', 'Ar'): 3.4, ('Ar', 'Xe'): 3.7,
+                              ('Xe', 'Xe'): 4.0},
+                       epsilon={('Ar', 'Ar'): 0.010, ('Ar', 'Xe'): 0.014,
+                                ('Xe', 'Xe'): 0.020},
+                       smooth=True)
+    yield MorsePotential(epsilon=0.1, rho0=4.0,
+                         r0={('Ar', 'Ar'): 3.8, ('Ar', 'Xe'): 4.1,
+                             ('Xe', 'Xe'): 4.4})
+    yield Buckingham(A={('Ar', 'Ar'): 4000.0, ('Ar', 'Xe'): 5000.0,
+                        ('Xe', 'Xe'): 6000.0},
+                     rho=0.3, C=60.0, rc=8.0)
+
+    r = np.linspace(2.0, 8.0, 200)
+    energies = {('Ar', 'Ar'): 0.01 * (r - 8.0)**4,
+                ('Ar', 'Xe'): 0.02 * (r - 8.0)**4,
+                ('Xe', 'Xe'): 0.03 * (r - 8.0)**4}
+    yield TabulatedPairPotential(r=r, energies=energies)
+
+
+@pytest.mark.parametrize('calc', calculators())
+def test_consistency(calc):
+    atoms = rattled_alloy()
+    atoms.calc = calc
+
+    energies = atoms.get_potential_energies()
+    assert energies.sum() == pytest.approx(atoms.get_potential_energy())
+
+    forces = atoms.get_forces()
+    assert forces.sum(axis=0) == pytest.approx(np.zeros(3), abs=1e-10)
+    numerical = calc.calculate_numerical_forces(atoms, d=1e-5)
+    assert forces == pytest.approx(numerical, abs=1e-7)
+
+    stress = atoms.get_stress()
+    numerical = calc.calculate_numerical_stress(atoms, d=1e-5)
+    assert stress == pytest.approx(numerical, abs=1e-7)
+    assert atoms.get_stresses().sum(axis=0) == pytest.approx(stress)
+
+
+def test_buckingham_dimer():
+    A, rho, C, rc = 1000.0, 0.3, 30.0, 6.0
+    r = 2.5
+    atoms = Atoms('O2', positions=[(0, 0, 0), (0, 0, r)])
+    atoms.calc = Buckingham(A=A, rho=rho, C=C, rc=rc)
+
+    def u(r):
+        return A * np.exp(-r / rho) - C / r**6
+
+    assert atoms.get_potential_energy() == pytest.approx(u(r) - u(rc))
+    fz = -A / rho * np.exp(-r / rho) + 6 * C / r**7
+    assert atoms.get_forces()[0, 2] == pytest.approx(fz)
+
+
+def test_tabulated_lj():
+    # a fine table of the LJ potential reproduces the LJ calculator
+    sigma, epsilon, rc = 3.4, 0.01, 8.0
+    r = np.linspace(2.8, rc, 2000)
+    energies = 4 * epsilon * ((sigma / r)**12 - (sigma / r)**6)
+    energies -= energies[-1]
+
+    atoms = rattled_alloy()
+    atoms.symbols[:] = 'Ar'
+    atoms.calc = LennardJones(sigma=sigma, epsilon=epsilon, rc=rc)
+    e_lj = atoms.get_potential_energy()
+    f_lj = atoms.get_forces()
+
+    atoms.calc = TabulatedPairPotential(r=r, energies=energies)
+    assert atoms.get_potential_energy() == pytest.approx(e_lj, rel=1e-6)
+    assert atoms.get_forces() == pytest.approx(f_lj, abs=1e-5)
+
+
+def test_tabulated_missing_table():
+    with pytest.raises(ValueError, match="missing 'r'"):
+        TabulatedPairPotential()
+    with pytest.raises(ValueError, match="missing 'energies'"):
+        TabulatedPairPotential(r=np.linspace(1, 3, 5))
+
+
+def test_pair_parameter():
+    table = {('H', 'H'): 1.0, (1, 8): 2.0, ('O', 'O'): 3.0}
+    values = pair_parameter(table, [1, 8, 1, 8], [1, 1, 8, 8])
+    assert values == pytest.approx([1.0, 2.0, 2.0, 3.0])
+    assert pair_parameter(4.0, [1], [8]) == 4.0
+    with pytest.raises(ValueError):
+        pair_parameter(table, [1], [6])
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from ase import Atoms
+from ase.calculators.singlepoint import SinglePointCalculator
+from ase.db import connect
+from ase.db.core import Database
+
+
+def fill(db):
+    for n in range(1, 8):
+        atoms = Atoms('H{}'.format(n), cell=[n, n, n], pbc=True)
+        kvp = {'x': n % 3, 'half': n / 2}
+        if n % 2:
+            atoms.calc = SinglePointCalculator(atoms, energy=-n)
+            kvp['name'] = 'odd{}'.format(n)
+        db.write(atoms, **kvp)
+
+
+@pytest.mark.parametrize('name', ['x.json', 'x.db'])
+def test_select_columns(name, testdir):
+    db = connect(name)
+    fill(db)
+    columns = ['id', 'energy', 'natoms', 'volume', 'user', 'x', 'name',
+               'missing']
+    for kwargs in [{},
+                   {'selection': 'x>0', 'sort': '-natoms', 'limit': 3},
+                   {'sort': 'half', 'offset': 2},
+                   {'selection': 'energy', 'sort': 'name'},
+                   {'selection': 'H>99'}]:
+        d = db.select_columns(columns=columns, **kwargs)
+        rows = list(db.select(**kwargs))
+        assert list(d) == columns
+        assert d['id'].dtype == int
+        assert d['id'].tolist() == [row.id for row in rows]
+        assert d['natoms'].tolist() == [row.natoms for row in rows]
+        assert d['volume'] == pytest.approx([row.volume for row in rows])
+        assert d['user'].tolist() == [row.user for row in rows]
+        assert np.allclose(d['energy'], [row.get('energy', np.nan)
+                                         for row in rows], equal_nan=True)
+        assert d['x'].tolist() == [row.x for row in rows]
+        assert d['name'].tolist() == [row.get('name') for row in rows]
+        assert np.isnan(d['missing']).all()
+
+    a = db.select_columns('H<4', ['natoms', 'half'], structured=True)
+    assert a.dtype.names == ('natoms', 'half')
+    assert a['natoms'].tolist() == [1, 2, 3]
+    assert a['half'].tolist() == [0.5, 1.0, 1.5]
+
+    with pytest.raises(ValueError):
+        db.select_columns(columns=['positions'])
+
+
+def test_select_columns_sql(testdir):
+    db = connect('x.db')
+    fill(db)
+    db.fetch_size = 3
+    d1 = db.select_columns(columns=['id', 'name', 'half'])
+    d2 = Database._select_columns(db, [], [], ['id', 'name', 'half'],
+                                  None, None, 0)
+    assert {name: a.tolist() for name, a in d1.items()} == d2
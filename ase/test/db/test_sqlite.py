@@ -66,3 +66,102 @@ def test_update_vacuum_context():
         update_keys_in_db(db)
     with connect(db_name) as db:
         check_update_function(db)
+
+
+def test_select_in_batches():
+    db = connect('batches.db')
+    write_entries_to_db(db, 25)
+    db.fetch_size = 4
+    ids = [row.id for row in db.select(sort='-id')]
+    assert ids == list(range(25, 0, -1))
+    assert [row.mykey for row in db.select(offset=3, limit=6)] == [
+        f'test_{i}' for i in range(3, 9)]
+
+    # Writing while iterating must not lock the database:
+    for row in db.select():
+        db.update(row.id, x=row.id)
+        if row.id == 2:
+            db.delete([11])
+    assert [row.x for row in db.select(sort='x')] == [
+        i for i in range(1, 26) if i != 11]
+
+
+def test_lazy_row():
+    import pickle
+    import numpy as np
+    from ase.build import molecule
+    from ase.calculators.singlepoint import SinglePointCalculator
+
+    atoms = molecule('H2O')
+    atoms.set_momenta(np.ones((3, 3)))
+    atoms.calc = SinglePointCalculator(atoms, energy=1.0,
+                                       forces=np.ones((3, 3)))
+    db = connect('lazy.db')
+    db.write(atoms, x=1)
+
+    row = db.get(1)
+    assert 'forces' in row and 'forces' in row._lazy
+    assert {'numbers', 'positions', 'cell', 'pbc', 'momenta', 'forces',
+            'energy', 'x'} <= set(row)
+    assert (row.forces == 1).all()
+    assert 'forces' not in row._lazy
+    assert 'stress' not in row and row.get('stress') is None
+
+    row2 = pickle.loads(pickle.dumps(db.get(1)))
+    assert not row2._lazy
+    assert (row2.momenta == 1).all()
+
+    db2 = connect('lazy.json')
+    db2.write(db.get(1))
+    row3 = db2.get(1)
+    assert (row3.positions == atoms.positions).all()
+    assert (row3.forces == 1).all()
+
+
+class WrappedCursor:
+    """Cursor with only the methods of the PostgreSQL/MySQL wrappers."""
+    def __init__(self, cur):
+        self.cur = cur
+
+    def execute(self, sql, params=()):
+        self.cur.execute(sql, params)
+
+    def executemany(self, sql, values):
+        self.cur.executemany(sql, values)
+
+    def fetchone(self):
+        return self.cur.fetchone()
+
+    def fetchall(self):
+        return self.cur.fetchall()
+
+    def fetchmany(self, size):
+        return self.cur.fetchmany(size)
+
+
+class WrappedConnection:
+    def __init__(self, con):
+        self.con = con
+
+    def cursor(self):
+        return WrappedCursor(self.con.cursor())
+
+    def commit(self):
+        self.con.commit()
+
+    def close(self):
+        self.con.close()
+
+    def rollback(self):
+        self.con.rollback()
+
+
+def test_select_wrapped_cursor():
+    from ase.db.sqlite import SQLite3Database
+    db = connect('wrapped.db')
+    write_entries_to_db(db, 7)
+    db._connect = lambda: WrappedConnection(
+        SQLite3Database._connect(db))
+    db.fetch_size = 3
+    assert [row.mykey for row in db.select(sort='-id')] == [
+        f'test_{i}' for i in range(6, -1, -1)]
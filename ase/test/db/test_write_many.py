@@ -0,0 +1,61 @@
+import pytest
+
+from ase import Atoms
+from ase.db import connect
+
+
+@pytest.mark.parametrize('name', ['x.json', 'x.db'])
+def test_write_many(name, testdir, capsys):
+    db = connect(name)
+    db.write(Atoms('H'), x=0)
+    images = [Atoms('H{}O'.format(n)) for n in range(1, 6)]
+    kvps = [{'x': n, 'name': 'h{}'.format(n)} for n in range(1, 6)]
+    ids = db.write_many(images, kvps, data={'a': [1, 2]}, verbosity=1)
+    assert 'rows/s' in capsys.readouterr().out
+    assert ids == [2, 3, 4, 5, 6]
+
+    for id, atoms, kvp in zip(ids, images, kvps):
+        row = db.get(id)
+        assert row.formula == atoms.get_chemical_formula()
+        assert row.key_value_pairs == kvp
+        assert row.data == {'a': [1, 2]}
+    assert db.count('H>2') == 3
+    assert db.count(name='h4') == 1
+
+    ids = db.write_many([None, Atoms('O')], {'ts': 1},
+                        defer_indices=True)
+    assert ids == [7, 8]
+    assert db.count(ts=1) == 2
+
+
+def test_write_many_indices(testdir):
+    db = connect('x.db')
+    db.write(Atoms())
+    with db.managed_connection() as con:
+        indices = db._get_indices(con.cursor())
+    assert len(indices) == 8
+    db.write_many([Atoms('H')] * 3, defer_indices=True)
+    with db.managed_connection() as con:
+        assert db._get_indices(con.cursor()) == indices
+    assert db.count('H') == 3
+
+
+@pytest.mark.parametrize('name', ['x.json', 'x.db'])
+def test_write_many_rollback(name, testdir):
+    db = connect(name)
+    db.write(Atoms())
+    with pytest.raises(ValueError):
+        db.write_many([Atoms('H'), Atoms('O')], [{'x': 1}, {'id': 2}])
+    assert len(db) == 1
+
+
+@pytest.mark.parametrize('name', ['x.json', 'x.db'])
+def test_write_many_length_mismatch(name, testdir):
+    db = connect(name)
+    images = [Atoms('H'), Atoms('O')]
+    with pytest.raises(ValueError, match='Fewer key_value_pairs'):
+        db.write_many(images, [{'x': 1}])
+    with pytest.raises(ValueError, match='More data'):
+        db.write_many(iter(images), {'x': 1}, data=[{}, {}, {'a': 1}])
+    assert len(db) == 0
+    assert db.write_many(images, ({'x': n} for n in range(2))) == [1, 2]
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from ase import Atoms
+from ase.build import bulk, fcc111, molecule
+from ase.calculators.emt import EMT
+
+
+def systems():
+    atoms = bulk('Cu', 'fcc', a=3.6, cubic=True) * (3, 3, 3)
+    atoms.symbols[::5] = 'Au'
+    atoms.rattle(stdev=0.05, seed=42)
+    yield atoms
+
+    slab = fcc111('Pt', size=(3, 3, 4), vacuum=6.0)
+    slab.symbols[-3:] = 'Ni'
+    slab.rattle(stdev=0.02, seed=1)
+    yield slab
+
+    yield molecule('C6H6')
+
+    yield Atoms('Cu', cell=[(0, 1.8, 1.8), (1.8, 0, 1.8), (1.8, 1.8, 0)],
+                pbc=True)
+
+    yield Atoms('Au')
+
+
+@pytest.mark.parametrize('atoms', systems())
+@pytest.mark.parametrize('asap_cutoff', [False, True])
+def test_vectorized_matches_loop(atoms, asap_cutoff):
+    results = []
+    for method in ['loop', 'vectorized']:
+        atoms.calc = EMT(method=method, asap_cutoff=asap_cutoff)
+        res = {'energy': atoms.get_potential_energy(),
+               'energies': atoms.get_potential_energies(),
+               'forces': atoms.get_forces()}
+        if atoms.cell.rank == 3:
+            res['stress'] = atoms.get_stress()
+        results.append(res)
+
+    loop, vectorized = results
+    for key in loop:
+        np.testing.assert_allclose(vectorized[key], loop[key],
+                                   rtol=1e-10, atol=1e-12)
+
+
+def test_unknown_method():
+    atoms = bulk('Cu')
+    atoms.calc = EMT(method='spam')
+    with pytest.raises(ValueError):
+        atoms.get_potential_energy()
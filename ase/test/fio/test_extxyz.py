@@ -3,6 +3,7 @@
 # (which is also included in oi.py test case)
 # maintained by James Kermode <james.kermode@gmail.com>
 
+from io import StringIO
 from pathlib import Path
 import numpy as np
 import pytest
@@ -13,6 +14,7 @@ from ase.io import extxyz
 from ase.atoms import Atoms
 from ase.build import bulk
 from ase.io.extxyz import escape
+from ase.io.formats import string2index
 from ase.calculators.calculator import compare_atoms
 from ase.calculators.emt import EMT
 from ase.constraints import FixAtoms, FixCartesian
@@ -390,3 +392,122 @@ def test_write_read_charges(at, tmpdir, enable_initial_charges, enable_charges):
         assert np.allclose(r.get_initial_charges(), initial_charges)
     if enable_charges:
         assert np.allclose(r.get_charges(), charges)
+
+
+def test_frame_index(images, monkeypatch):
+    for i, atoms in enumerate(images):
+        atoms.info['frame'] = i
+    ase.io.write('index.xyz', images)
+    assert extxyz.read_frame_index('index.xyz') is None
+
+    atoms = ase.io.read('index.xyz', index=-1, index_file=True)
+    assert atoms.info['frame'] == 2
+    frames = extxyz.read_frame_index('index.xyz')
+    assert frames[:, 1].tolist() == [len(atoms) for atoms in images]
+
+    # With an up to date index, the file is not scanned:
+    def scan_xyz(fileobj, last_frame=None):
+        raise AssertionError('the file should not be scanned')
+
+    with monkeypatch.context() as m:
+        m.setattr(extxyz, 'scan_xyz', scan_xyz)
+        for index in [0, 1, -1, -3]:
+            atoms = ase.io.read('index.xyz', index=index)
+            assert atoms == images[index]
+            assert atoms.info['frame'] == index % 3
+        assert ase.io.read('index.xyz', index='::-2') == images[::-2]
+
+    # Appending a frame invalidates the index:
+    ase.io.write('index.xyz', images[0], append=True)
+    assert extxyz.read_frame_index('index.xyz') is None
+    assert ase.io.read('index.xyz', index=-1).info['frame'] == 0
+    assert len(ase.io.read('index.xyz', index=':', index_file=False)) == 4
+
+    ase.io.read('index.xyz', index_file='frames.idx')
+    assert len(extxyz.read_frame_index('index.xyz', 'frames.idx')) == 4
+
+    with pytest.raises(ValueError):
+        with open('index.xyz') as fd:
+            ase.io.read(StringIO(fd.read()), format='extxyz',
+                        index_file=True)
+
+
+def test_parse_columns():
+    properties = 'species:S:1:pos:R:3:flag:L:1:n:I:1:move_mask:L:3'
+    _, _, dtype, _ = extxyz.parse_properties(properties)
+    lines = ['Si 0 0.5 -1e-3 T 1 T F True extra\n',
+             'C 1 2 3 False -2 F F F\n']
+    data = extxyz._parse_xyz_columns(lines, dtype)
+    assert data.dtype == dtype
+    assert data['species'].tolist() == ['Si', 'C']
+    assert data['pos1'].tolist() == [0.5, 2.0]
+    assert data['flag'].tolist() == [True, False]
+    assert data['n'].tolist() == [1, -2]
+    assert data['move_mask1'].tolist() == [False, False]
+
+    # Irregular input is left to the line-by-line parser:
+    for bad in ['Si 0 0 0 T 1 T F\n', 'Si 0 0 0 T 1.0 T F T\n',
+                'Si 1_0 0 0 T 1 T F T\n', '\n']:
+        assert extxyz._parse_xyz_columns(lines[:1] + [bad], dtype) is None
+
+    text = '2\nProperties={}\n'.format(properties) + ''.join(lines)
+    atoms = ase.io.read(StringIO(text), format='extxyz')
+    assert atoms.get_chemical_symbols() == ['Si', 'C']
+    assert atoms.arrays['n'].tolist() == [1, -2]
+    assert len(atoms.constraints) == 2
+
+
+def test_read_workers(images):
+    for i, atoms in enumerate(images):
+        atoms.info['frame'] = i
+        atoms.calc = SinglePointCalculator(atoms, energy=-float(i))
+    ase.io.write('workers.xyz', images * 5)
+
+    ref = ase.io.read('workers.xyz', index=':')
+    for index in [':', '::-2', '-4:']:
+        frames = ase.io.read('workers.xyz', index=index, workers=2)
+        assert frames == ref[string2index(index)]
+        for atoms, ref_atoms in zip(frames, ref[string2index(index)]):
+            assert atoms.info == ref_atoms.info
+            assert (atoms.get_potential_energy() ==
+                    ref_atoms.get_potential_energy())
+
+    # Small batches and stopping early:
+    with open('workers.xyz') as fd:
+        chunks = extxyz.ixyzchunks(fd)
+        iterator = extxyz.build_chunks(chunks, workers=2, batch_size=1)
+        assert next(iterator) == ref[0]
+        assert next(iterator) == ref[1]
+        iterator.close()
+
+    for workers in [0, -2]:
+        with pytest.raises(ValueError, match='workers must be'):
+            ase.io.read('workers.xyz', workers=workers)
+
+
+def test_xyz_writer(images):
+    images = [atoms.copy() for atoms in images] * 2
+    for i, atoms in enumerate(images):
+        atoms.info['frame'] = i
+        atoms.calc = SinglePointCalculator(atoms, energy=-float(i),
+                                           forces=np.ones((len(atoms), 3)))
+    atoms = images[-1].copy()
+    atoms.symbols[0] = 'Au'
+    atoms.new_array('tags2', np.arange(len(atoms)))
+    images.append(atoms)
+
+    ref = StringIO()
+    extxyz.write_xyz(ref, images)
+
+    fd = StringIO()
+    writer = extxyz.XYZWriter(fd)
+    for atoms in images:
+        writer.write(atoms)
+    assert fd.getvalue() == ref.getvalue()
+
+    with extxyz.XYZWriter('writer.xyz') as writer:
+        writer.write(images[0])
+    with extxyz.XYZWriter('writer.xyz', mode='a') as writer:
+        for atoms in images[1:]:
+            writer.write(atoms)
+    assert Path('writer.xyz').read_text() == ref.getvalue()
@@ -1,3 +1,6 @@
+import os
+import threading
+
 import pytest
 import numpy as np
 import sys
@@ -137,3 +140,132 @@ def test_bundletrajectory_info(images, bundletraj, capsys):
                             '-m', 'ase.io.bundletrajectory', bundletraj],
                            encoding='ascii')
     assert expected_substring in output2
+
+
+@pytest.mark.parametrize('backend', ['ulm', 'npy'])
+@pytest.mark.parametrize('split', [False, True])
+def test_bundle_backends(images, backend, split):
+    fname = 'backend.bundle'
+    for atoms in images:
+        atoms.constraints = []  # XXX constraints are read back as dicts
+    traj = BundleTrajectory(fname, 'w', backend=backend, split=split)
+    for atoms in images:
+        traj.write(atoms)
+    traj.close()
+
+    assert BundleTrajectory(fname).subtype == ('split' if split else 'normal')
+    images1 = read(fname, ':')
+    assert len(images1) == len(images)
+    for atoms, atoms1 in zip(images, images1):
+        assert (atoms1.positions == atoms.positions).all()
+        assert (atoms1.get_momenta() == atoms.get_momenta()).all()
+        assert (atoms1.get_tags() == images[0].get_tags()).all()
+        assert (atoms1.get_forces() == atoms.get_forces()).all()
+        assert atoms1.get_potential_energy() == atoms.get_potential_energy()
+        atoms1.positions += 1.0  # must be writable
+
+
+class ThreadWorld:
+    """Fake communicator where every thread is an MPI task."""
+    def __init__(self, size):
+        self.size = size
+        self.local = threading.local()
+
+    @property
+    def rank(self):
+        return self.local.rank
+
+
+def run_tasks(monkeypatch, size, task):
+    """Run task(rank) for every rank of a ThreadWorld."""
+    import ase.io.bundletrajectory as bt
+    world = ThreadWorld(size)
+    monkeypatch.setattr(bt, 'world', world)
+    monkeypatch.setattr(bt, 'barrier',
+                        threading.Barrier(size, timeout=20).wait)
+    monkeypatch.setattr(bt, 'paropen', lambda name, mode: open(
+        name if world.rank == 0 else os.devnull, mode))
+
+    errors = []
+
+    def run(rank):
+        world.local.rank = rank
+        try:
+            task(rank)
+        except Exception as ex:
+            errors.append(ex)
+
+    threads = [threading.Thread(target=run, args=(rank,))
+               for rank in range(size)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors, errors
+    monkeypatch.undo()
+
+
+@pytest.mark.parametrize('backend', ['ulm', 'npy'])
+def test_bundle_split_ranks(monkeypatch, backend):
+    from ase.build import molecule
+    from ase.calculators.singlepoint import SinglePointCalculator
+
+    fname = 'split.bundle'
+    images = []
+    for i in range(2):
+        atoms = molecule('H2')  # fewer atoms than tasks
+        atoms.positions[:, 0] += i
+        atoms.calc = SinglePointCalculator(atoms, energy=-i,
+                                           forces=atoms.positions + 1)
+        images.append(atoms)
+
+    def task(rank):
+        traj = BundleTrajectory(fname, 'w', backend=backend, split=True)
+        for atoms in images:
+            traj.write(atoms)
+        traj.close()
+
+    run_tasks(monkeypatch, 4, task)
+
+    assert os.path.exists(os.path.join(fname, 'F0', 'positions_3' +
+                                       ('.ulm' if backend == 'ulm'
+                                        else '.npy')))
+    images1 = read(fname, ':')
+    assert len(images1) == 2
+    for atoms, atoms1 in zip(images, images1):
+        assert (atoms1.numbers == atoms.numbers).all()
+        assert atoms1.positions == pytest.approx(atoms.positions)
+        assert atoms1.get_forces() == pytest.approx(atoms.positions + 1)
+        assert atoms1.get_potential_energy() == atoms.get_potential_energy()
+
+
+@pytest.mark.parametrize('backend', ['ulm', 'npy'])
+def test_bundle_split_distributed(monkeypatch, backend):
+    from ase.build import bulk
+    from ase.calculators.singlepoint import SinglePointCalculator
+
+    fname = 'distributed.bundle'
+    atoms = bulk('Cu', cubic=True) * (2, 1, 1)
+    atoms.rattle(seed=3)
+    size = 3
+
+    def task(rank):
+        # Every task only holds its own atoms, like Asap's parallel atoms:
+        ids = np.arange(rank, len(atoms), size)
+        local = atoms[ids]
+        local.set_array('ID', ids)
+        local.get_global_number_of_atoms = lambda: len(atoms)
+        local.calc = SinglePointCalculator(local, energy=-1.0,
+                                           forces=local.positions + 1)
+        traj = BundleTrajectory(fname, 'w', backend=backend, split=True)
+        traj.write(local)
+        traj.close()
+
+    run_tasks(monkeypatch, size, task)
+
+    atoms1 = read(fname)
+    assert len(atoms1) == len(atoms)
+    assert (atoms1.numbers == atoms.numbers).all()
+    assert atoms1.positions == pytest.approx(atoms.positions)
+    assert atoms1.get_forces() == pytest.approx(atoms.positions + 1)
+    assert atoms1.get_potential_energy() == -1.0
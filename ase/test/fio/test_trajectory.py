@@ -1,7 +1,10 @@
+import numpy as np
 import pytest
 
 from ase import Atom, Atoms
 from ase.io import Trajectory, read
+from ase.io.trajectory import BufferedTrajectoryWriter
+from ase.calculators.singlepoint import SinglePointCalculator
 from ase.constraints import FixBondLength
 from ase.calculators.calculator import PropertyNotImplementedError
 
@@ -89,6 +92,49 @@ def test_trajectory(trajfile, images):
         assert sliced_traj[1] == sliced_again[0]
 
 
+def test_mmap(trajfile, images):
+    with Trajectory(trajfile, mmap=True) as traj:
+        assert len(traj) == len(images)
+        for atoms, ref in zip(traj, images):
+            assert atoms == ref
+            atoms.positions += 1.0  # must be a copy
+        positions = traj.backend[1].positions
+        assert not positions.flags.writeable
+    assert (positions == images[1].positions).all()
+
+
+def test_property_arrays(trajfile, images):
+    with Trajectory(trajfile) as traj:
+        for name, get in [('positions', Atoms.get_positions),
+                          ('cell', Atoms.get_cell),
+                          ('pbc', Atoms.get_pbc),
+                          ('numbers', Atoms.get_atomic_numbers),
+                          ('masses', Atoms.get_masses),
+                          ('momenta', Atoms.get_momenta),
+                          ('tags', Atoms.get_tags)]:
+            for i, value in enumerate(traj.iter_arrays(name)):
+                assert (value == get(images[i])).all()
+        positions = traj.get_property_array('positions', slice(0, 7))
+        assert positions.shape == (7, 2, 3)
+        assert (positions[3] == images[3].positions).all()
+        with pytest.raises(KeyError):
+            traj.get_property_array('energy')
+        with pytest.raises(KeyError):
+            traj.get_property_array('spam')
+
+    with Trajectory('calc.traj', 'w') as t:
+        for i in range(3):
+            t.write(Atoms('H2'), energy=-i, forces=np.ones((2, 3)) * i,
+                    stress=np.arange(6.0) * i)
+
+    with Trajectory('calc.traj') as traj:
+        assert (traj.get_property_array('energy') == [0, -1, -2]).all()
+        forces = traj.get_property_array('forces', [2, 0])
+        assert (forces == [np.ones((2, 3)) * 2, np.zeros((2, 3))]).all()
+        stress = traj.get_property_array('stress')
+        assert (stress == traj[1].get_stress() * [[0], [1], [2]]).all()
+
+
 def test_append_nonexistent_file(co):
     fname = '2.traj'
     with Trajectory(fname, 'a', co) as t:
@@ -125,3 +171,48 @@ def test_constraint_and_momenta():
         t.write()
     b = read('constraint.traj')
     assert not (b.get_momenta() - a.get_momenta()).any()
+
+
+def test_buffered_writer(images):
+    for i, atoms in enumerate(images):
+        atoms.calc = SinglePointCalculator(atoms, energy=-i,
+                                           forces=np.ones((len(atoms), 3)))
+
+    with Trajectory('ref.traj', 'w') as traj:
+        for atoms in images[:5]:
+            traj.write(atoms)
+    with Trajectory('ref.traj', 'a') as traj:
+        for atoms in images[5:]:
+            traj.write(atoms)
+
+    with BufferedTrajectoryWriter('buf.traj', 'w', batch_size=3) as traj:
+        for atoms in images[:4]:
+            traj.write(atoms)
+            atoms.positions += 42.0  # must not change what is written
+            atoms.positions -= 42.0
+        traj.flush()
+        # File must be readable while writing:
+        assert len(read('buf.traj', ':')) == 4
+        traj.write(images[4])
+    with BufferedTrajectoryWriter('buf.traj', 'a') as traj:
+        for atoms in images[5:]:
+            traj.write(atoms)
+
+    with Trajectory('ref.traj') as ref, Trajectory('buf.traj') as traj:
+        assert len(traj) == len(ref)
+        for i in range(len(ref)):
+            assert str(traj.backend[i].asdict()) == str(
+                ref.backend[i].asdict())
+
+
+def test_compression(images):
+    compression = {'positions': 'float32+zlib', 'forces': 'lzma'}
+    with Trajectory('c.traj', 'w', compression=compression) as traj:
+        for i, atoms in enumerate(images):
+            traj.write(atoms, energy=-i, forces=np.ones((len(atoms), 3)))
+
+    with Trajectory('c.traj') as traj:
+        for atoms, ref in zip(traj, images):
+            assert abs(atoms.positions - ref.positions).max() < 1e-6
+            assert (atoms.get_forces() == 1).all()
+        assert traj.backend[2].proxy('positions').codec == 'float32+zlib'
@@ -81,3 +81,90 @@ def test_ulm_copy(ulmfile):
     with ulm.open(path) as r:
         assert 'a' not in r
         assert 'y' in r
+
+
+def test_mmap(ulmfile):
+    with ulm.open(ulmfile, mmap=True) as r:
+        x = r.a.x
+        z = r[2].z
+        assert not x.flags.writeable
+        assert (x == np.ones((2, 3))).all()
+        assert (z == np.ones(7)).all()
+        assert (r[2].proxy('z')[::2] == 1).all()
+    # Arrays are still valid after closing:
+    assert z.sum() == 7
+
+
+@pytest.mark.parametrize('codec', ['zlib', 'lzma', 'float32',
+                                   'float32+zlib'])
+def test_compression(tmp_path, monkeypatch, codec):
+    monkeypatch.setattr(ulm, 'CHUNK_SIZE', 100)  # several chunks
+    path = tmp_path / 'c.ulm'
+    x = np.linspace(0, 1, 120).reshape((20, 2, 3))
+    with ulm.open(path, 'w', compression={'x': codec}) as w:
+        w.write(x=x, i=np.arange(5))
+        w.add_array('y', (4, 3), codec=codec)
+        w.fill(np.ones((1, 3)))
+        w.fill(np.zeros(3))
+        w.fill(np.ones((0, 3)))
+        w.fill(np.ones((2, 3)))
+
+    if codec.startswith('float32'):
+        x = x.astype(np.float32).astype(float)
+    for mmap in [False, True]:
+        with ulm.open(path, mmap=mmap) as r:
+            assert r.i.dtype == int
+            assert (r.x == x).all()
+            assert r.x.dtype == float
+            assert (r.proxy('x')[3:17:4] == x[3:17:4]).all()
+            assert (r.proxy('x')[-1] == x[-1]).all()
+            assert (r.proxy('x', 5, 1) == x[5, 1]).all()
+            p = r.proxy('x', 7)
+            assert not isinstance(p, np.ndarray)
+            assert p.shape == (2, 3)
+            assert (p.read() == x[7]).all()
+            assert (p[1, ::2] == x[7, 1, ::2]).all()
+            assert (p.proxy(0)[1:] == x[7, 0, 1:]).all()
+            assert (r.proxy('x', -1).read() == x[-1]).all()
+            chunks = []
+            read_chunk = p.reader._read_chunk
+            p.reader._read_chunk = lambda c: chunks.append(c) or read_chunk(c)
+            p.read()
+            assert len(chunks) == 1
+            assert (r.y == [[1, 1, 1], [0, 0, 0], [1, 1, 1], [1, 1, 1]]).all()
+            assert 'codec={}'.format(codec) in r.tostr()
+
+    path2 = tmp_path / 'c2.ulm'
+    ulm.copy(path, path2)
+    with ulm.open(path2) as r:
+        assert r.proxy('x').codec == codec
+        assert (r.x == x).all()
+
+
+def test_bad_codec():
+    with pytest.raises(ValueError):
+        ulm.parse_codec('zlib+lzma')
+    with pytest.raises(ValueError):
+        ulm.parse_codec('gzip')
+
+
+def test_lazy_offsets(tmp_path):
+    path = tmp_path / 'many.ulm'
+    with ulm.open(path, 'w') as w:
+        for i in range(100):
+            w.write(i=i)
+            w.sync()
+
+    with open(path, 'rb') as fd:
+        tag, version, nitems, pos0, offsets = ulm.read_header(fd)
+        table = ulm.OffsetTable(fd, pos0, nitems, pagesize=7, maxpages=2)
+        assert len(table) == 100
+        assert [table[i] for i in range(-100, 100)] == list(offsets) * 2
+        with pytest.raises(IndexError):
+            table[100]
+
+    with ulm.open(path) as r:
+        assert len(r) == 100
+        assert [item.i for item in r] == list(range(100))
+        assert r[-1].i == 99
+        assert r[37].i == 37
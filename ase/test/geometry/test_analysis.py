@@ -1,7 +1,10 @@
 import numpy as np
 import pytest
-from ase.geometry.analysis import Analysis, get_max_volume_estimate
-from ase.build import molecule
+from ase.geometry.analysis import (Analysis, StreamingAnalysis,
+                                   get_max_volume_estimate)
+from ase.build import bulk, molecule
+from ase.io import iread, write
+from ase.geometry.rdf import get_rdf
 
 
 @pytest.fixture
@@ -89,3 +92,101 @@ def test_analysis():
 
     assert len(ana2.get_angles('C', 'C', 'H', unique=False)[0]) == len(ana2.get_angles('C', 'C', 'H', unique=True)[0]) * 2
     assert len(ana2.get_dihedrals('H', 'C', 'C', 'H', unique=False)[0]) == len(ana2.get_dihedrals('H', 'C', 'C', 'H', unique=True)[0]) * 2
+
+
+def rattled(atoms, n, stdev):
+    for seed in range(n):
+        image = atoms.copy()
+        image.rattle(stdev, seed=seed)
+        yield image
+
+
+@pytest.mark.parametrize('symbols', [('C', 'H'), ('C', 'C'), ('C', 'O'),
+                                     ('H', 'C', 'H'), ('C', 'C', 'O'),
+                                     ('H', 'C', 'C', 'O')])
+def test_streaming_analysis(symbols):
+    images = list(rattled(molecule('CH3CH2OH'), 5, 0.02))
+    ana = Analysis(images)
+    get = {2: ana.get_bonds, 3: ana.get_angles, 4: ana.get_dihedrals}
+    tuples = get[len(symbols)](*symbols, unique=True)
+    ref = dict(zip(tuples[0], np.mean(ana.get_values(tuples), axis=0)))
+
+    stream = StreamingAnalysis(iter(images))
+    add = {2: stream.add_bonds, 3: stream.add_angles, 4: stream.add_dihedrals}
+    add[len(symbols)](*symbols)
+    assert stream.run() == 5
+    assert stream.nl.nupdates == 1
+
+    tuples, means, counts = stream.get_values(*symbols, return_counts=True)
+    assert sorted(map(tuple, tuples)) == sorted(ref)
+    assert (counts == 5).all()
+    for tup, mean in zip(tuples, means):
+        assert mean == pytest.approx(ref[tuple(tup)])
+    assert stream.get_mean(*symbols) == pytest.approx(np.mean(means))
+
+
+def test_streaming_analysis_periodic(tmp_path):
+    atoms = bulk('Cu', cubic=True) * 3
+    filename = tmp_path / 'md.traj'
+    write(filename, list(rattled(atoms, 4, 0.05)))
+
+    stream = StreamingAnalysis(iread(filename))
+    stream.add_bonds('Cu', 'Cu')
+    stream.add_angles('Cu', 'Cu', 'Cu')
+    stream.add_rdf(5.0, 50)
+    stream.run()
+    assert stream.nimages == 4
+    assert stream.nl.nupdates == 1
+    assert stream.rdf.nl.nupdates == 1
+
+    # 12 nearest neighbors:
+    bonds, lengths = stream.get_values('Cu', 'Cu')
+    assert len(bonds) == len(atoms) * 6
+    assert lengths.mean() == pytest.approx(3.6 / np.sqrt(2), abs=0.01)
+    assert len(stream.get_values('Cu', 'Cu', 'Cu')[0]) == len(atoms) * 66
+
+    rdfs = [get_rdf(image, 5.0, 50, no_dists=True) for image in iread(filename)]
+    rdf, dists = stream.get_rdf()
+    assert rdf == pytest.approx(np.mean(rdfs, axis=0))
+    assert stream.get_rdf(elements=('Cu', 'Cu'), return_dists=False) == pytest.approx(rdf)
+
+
+def test_streaming_analysis_bond_breaking():
+    images = [molecule('H2'), molecule('H2')]
+    images[1].positions[1, 2] += 5.0
+    stream = StreamingAnalysis()
+    stream.add_bonds('H', 'H')
+    for atoms in images:
+        stream.add(atoms)
+    assert stream.nl.nupdates == 2
+    bonds, lengths, counts = stream.get_values('H', 'H', return_counts=True)
+    assert bonds.tolist() == [[0, 1]]
+    assert counts.tolist() == [1]
+    assert lengths[0] == pytest.approx(images[0].get_distance(0, 1))
+
+    with pytest.raises(ValueError):
+        stream.get_values('H', 'O')
+
+
+def test_streaming_analysis_steps():
+    images = rattled(molecule('H2O'), 5, 0.02)
+    stream = StreamingAnalysis(images)
+    stream.add_bonds('O', 'H')
+    stream.add_bonds('H', 'H')
+    assert stream.run(2) == 2
+    assert stream.run(2) == 2
+    assert stream.run() == 1
+    assert stream.nimages == 5
+    with pytest.raises(ValueError, match='No H-H found'):
+        stream.get_mean('H', 'H')
+
+
+def test_streaming_analysis_steps_list():
+    images = [molecule('H2O') for _ in range(3)]
+    stream = StreamingAnalysis(images)
+    stream.add_bonds('O', 'H')
+    assert stream.run(2) == 2
+    assert stream.run(2) == 1
+    assert stream.run() == 0
+    assert stream.nimages == 3
+    assert stream.get_values('O', 'H', return_counts=True)[2].tolist() == [3, 3]
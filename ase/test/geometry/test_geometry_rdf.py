@@ -8,7 +8,8 @@ from ase.calculators.emt import EMT
 from ase.optimize.fire import FIRE
 from ase.lattice.compounds import L1_2
 
-from ase.geometry.rdf import get_rdf, get_volume_estimate, CellTooSmall, VolumeNotDefined
+from ase.geometry.rdf import (get_rdf, get_partial_rdfs, get_volume_estimate,
+                              CellTooSmall, VolumeNotDefined, RDFAccumulator)
 
 
 @pytest.fixture
@@ -70,3 +71,75 @@ def test_rdf_compute():
     rdf = get_rdf(bulk, 4.2, 5)[0]
     reference_rdf2 = [0., 0., 1.43905094, 0.36948605, 1.34468694]
     assert all(abs(rdf - reference_rdf2) < eps)
+
+
+@pytest.fixture
+def rocksalt():
+    atoms = bulk('NaCl', 'rocksalt', a=5.64) * (3, 3, 3)
+    atoms.rattle(stdev=0.2, seed=2)
+    return atoms
+
+
+@pytest.mark.parametrize('elements', [None, (11, 17), (17, 11), (17, 17),
+                                      (11, 13)])
+def test_rdf_neighborlist_matches_distance_matrix(rocksalt, elements):
+    dm = rocksalt.get_all_distances(mic=True)
+    ref = get_rdf(rocksalt, 4.5, 50, elements=elements, distance_matrix=dm,
+                  no_dists=True)
+    rdf = get_rdf(rocksalt, 4.5, 50, elements=elements, no_dists=True)
+    assert rdf == pytest.approx(ref, abs=1e-12)
+
+
+def test_partial_rdfs(rocksalt):
+    rdfs, dists = get_partial_rdfs(rocksalt, 4.5, 50)
+    assert set(rdfs) == {(11, 11), (11, 17), (17, 11), (17, 17)}
+    total = np.zeros(50)
+    for elements, rdf in rdfs.items():
+        ref = get_rdf(rocksalt, 4.5, 50, elements=elements, no_dists=True)
+        assert rdf == pytest.approx(ref, abs=1e-12)
+        total += rdf * 0.5
+    assert total == pytest.approx(get_rdf(rocksalt, 4.5, 50, no_dists=True))
+
+
+def test_rdf_accumulator(rocksalt):
+    images = [rocksalt]
+    atoms = rocksalt.copy()
+    atoms.rattle(stdev=0.1, seed=3)
+    atoms.symbols[:4] = 'K'
+    images.append(atoms)
+
+    acc = RDFAccumulator(4.5, 50)
+    for atoms in images:
+        acc.add(atoms)
+    assert acc.nimages == 2
+
+    rdf, dists = acc.get_rdf()
+    ref = [get_rdf(atoms, 4.5, 50) for atoms in images]
+    assert rdf == pytest.approx((ref[0][0] + ref[1][0]) / 2)
+    assert dists == pytest.approx(ref[0][1])
+
+    # Potassium is missing in the first image:
+    KCl = acc.get_rdf(elements=(19, 17), no_dists=True)
+    assert KCl == pytest.approx(
+        get_rdf(images[1], 4.5, 50, elements=(19, 17), no_dists=True) / 2)
+    assert not acc.get_rdf(elements=(19, 13), no_dists=True).any()
+
+
+def test_rdf_accumulator_skin(rocksalt):
+    images = []
+    for seed in range(3):
+        atoms = rocksalt.copy()
+        atoms.rattle(stdev=0.05, seed=seed)
+        images.append(atoms)
+
+    acc = RDFAccumulator(4.5, 50, skin=0.3)
+    ref = RDFAccumulator(4.5, 50)
+    for atoms in images:
+        acc.add(atoms)
+        ref.add(atoms)
+    assert acc.nl.nupdates == 1
+    assert acc.get_rdf(no_dists=True) == pytest.approx(
+        ref.get_rdf(no_dists=True), abs=1e-12)
+    for elements in ref.partial_rdfs:
+        assert acc.get_rdf(elements, no_dists=True) == pytest.approx(
+            ref.get_rdf(elements, no_dists=True), abs=1e-12)
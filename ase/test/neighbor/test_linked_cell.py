@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+from ase import Atoms
+from ase.build import bulk, molecule
+from ase.neighborlist import (LinkedCellNeighborList, NeighborList,
+                              NewPrimitiveNeighborList)
+
+
+def pairs(nl):
+    return sorted(zip(nl.pair_first, nl.pair_second,
+                      map(tuple, nl.offset_vec)))
+
+
+def systems():
+    rng = np.random.RandomState(17)
+    atoms = Atoms(numbers=range(1, 11),
+                  cell=[(0.2, 1.2, 1.4),
+                        (1.4, 0.1, 1.6),
+                        (1.3, 2.0, -0.1)])
+    atoms.set_scaled_positions(3 * rng.random_sample((10, 3)) - 1)
+    for pbc in [(1, 1, 1), (1, 0, 1), (0, 0, 1), (0, 0, 0)]:
+        a = atoms.copy()
+        a.pbc = pbc
+        yield a
+
+    atoms = bulk('Cu', cubic=True) * (4, 4, 4)
+    atoms.rattle(stdev=0.1, seed=3)
+    yield atoms
+
+    yield molecule('C60')
+
+
+@pytest.mark.parametrize('atoms', systems())
+@pytest.mark.parametrize('bothways', [False, True])
+@pytest.mark.parametrize('self_interaction', [False, True])
+def test_same_as_new_primitive(atoms, bothways, self_interaction):
+    cutoffs = 0.1 * atoms.numbers / atoms.numbers.max() + 1.2
+    lists = []
+    for cls in [NewPrimitiveNeighborList, LinkedCellNeighborList]:
+        nl = cls(cutoffs, skin=0.0, bothways=bothways,
+                 self_interaction=self_interaction)
+        nl.update(atoms.pbc, atoms.get_cell(complete=True), atoms.positions)
+        lists.append(nl)
+
+    new, linked = lists
+    assert pairs(linked) == pairs(new)
+    assert linked.nneighbors == len(linked.pair_first)
+    assert (np.diff(linked.first_neigh) ==
+            np.bincount(linked.pair_first, minlength=len(atoms))).all()
+    for a in range(len(atoms)):
+        indices, offsets = linked.get_neighbors(a)
+        assert (linked.pair_second[linked.first_neigh[a]:
+                                   linked.first_neigh[a + 1]] ==
+                indices).all()
+        assert len(offsets) == len(indices)
+
+
+def test_sorted():
+    atoms = bulk('Al', cubic=True) * (3, 3, 3)
+    atoms.rattle(seed=2)
+    nl = NeighborList([1.5] * len(atoms), sorted=True,
+                      primitive=LinkedCellNeighborList)
+    nl.update(atoms)
+    for a in range(len(atoms)):
+        indices, offsets = nl.get_neighbors(a)
+        assert (np.diff(indices) >= 0).all()
+
+
+def test_skin_updates():
+    atoms = bulk('Cu', cubic=True) * (3, 3, 3)
+    nl = NeighborList([1.3] * len(atoms), skin=0.3,
+                      primitive=LinkedCellNeighborList)
+    assert nl.update(atoms)
+
+    # Small moves do not require a new list:
+    atoms.positions[0] += 0.1
+    assert not nl.update(atoms)
+    assert nl.nupdates == 1
+
+    # Moving further than the skin does, but the atoms stay in their cells:
+    atoms.positions[0] += 0.3
+    nbinnings = nl.nl.nbinnings
+    assert nl.update(atoms)
+    assert nl.nupdates == 2
+    assert nl.nl.nbinnings == nbinnings
+
+    ref = NewPrimitiveNeighborList([1.3] * len(atoms), skin=0.3)
+    ref.update(atoms.pbc, atoms.get_cell(complete=True), atoms.positions)
+    assert pairs(nl.nl) == pairs(ref)
+
+    # A new cell always gives a new list:
+    atoms.set_cell(atoms.cell * 1.01, scale_atoms=True)
+    assert nl.update(atoms)
+
+
+def test_empty():
+    nl = LinkedCellNeighborList([])
+    nl.update([True] * 3, np.eye(3), np.zeros((0, 3)))
+    assert nl.nneighbors == 0
+    assert len(nl.first_neigh) == 1
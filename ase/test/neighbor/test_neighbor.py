@@ -3,7 +3,8 @@ import numpy as np
 import pytest
 from ase import Atoms
 from ase.neighborlist import (NeighborList, PrimitiveNeighborList,
-                              NewPrimitiveNeighborList)
+                              NewPrimitiveNeighborList,
+                              LinkedCellNeighborList)
 from ase.build import bulk
 
 
@@ -211,3 +212,35 @@ def test_small_cell_and_large_cutoff():
 
     assert np.all(n0 == n1)
     assert np.all(d0 == d1)
+
+
+@pytest.mark.parametrize('primitive', [PrimitiveNeighborList,
+                                       NewPrimitiveNeighborList,
+                                       LinkedCellNeighborList])
+@pytest.mark.parametrize('bothways', [False, True])
+def test_get_all_neighbors(primitive, bothways):
+    atoms = bulk('Cu', cubic=True) * (2, 2, 1)
+    atoms.pbc = (True, False, True)
+    atoms.rattle(stdev=0.1, seed=7)
+    nl = NeighborList([1.3] * len(atoms), skin=0.2, bothways=bothways,
+                      primitive=primitive)
+    with pytest.raises(RuntimeError):
+        nl.get_all_neighbors()
+    nl.update(atoms)
+
+    first, indices, offsets, D = nl.get_all_neighbors(atoms)
+    assert len(first) == len(atoms) + 1
+    assert first[-1] == len(indices) == len(offsets) == len(D)
+    for a in range(len(atoms)):
+        i, o = nl.get_neighbors(a)
+        assert (indices[first[a]:first[a + 1]] == i).all()
+        assert (offsets[first[a]:first[a + 1]] == o).all()
+        d = atoms.positions[i] + o @ atoms.cell - atoms.positions[a]
+        assert D[first[a]:first[a + 1]] == pytest.approx(d, abs=1e-12)
+
+    sparse = nl.get_connectivity_matrix().toarray()
+    dense = nl.get_connectivity_matrix(sparse=False)
+    assert (sparse == dense).all()
+    assert dense.sum() == len(set(zip(np.repeat(range(len(atoms)),
+                                                np.diff(first)),
+                                      indices)))
@@ -0,0 +1,126 @@
+import numpy as np
+import pytest
+
+from ase.build import bulk, molecule
+from ase.neighborlist import (LinkedCellNeighborList, NeighborList,
+                              NewPrimitiveNeighborList, neighbor_list,
+                              neighbor_list_chunks, primitive_neighbor_list,
+                              primitive_neighbor_list_chunks)
+
+
+def systems():
+    atoms = bulk('Cu', cubic=True) * (6, 6, 6)
+    atoms.rattle(stdev=0.2, seed=1)
+    yield atoms, 4.0
+
+    slab = bulk('Si', cubic=True) * (3, 3, 2)
+    slab.pbc = (True, True, False)
+    slab.rattle(stdev=0.1, seed=2)
+    yield slab, {('Si', 'Si'): 3.0}
+
+    mol = molecule('C60', vacuum=3.0)
+    yield mol, [0.8] * len(mol)
+
+
+@pytest.mark.parametrize('atoms, cutoff', systems())
+@pytest.mark.parametrize('max_memory', [1, 1e5])
+def test_chunked_search_is_identical(atoms, cutoff, max_memory):
+    ref = neighbor_list('ijdDS', atoms, cutoff)
+
+    stats = {}
+    chunked = neighbor_list('ijdDS', atoms, cutoff, max_memory=max_memory,
+                            stats=stats)
+    assert stats['nchunks'] > 1
+    for a, b in zip(ref, chunked):
+        assert (a == b).all()
+
+    # Every atom has all its neighbors in exactly one chunk:
+    first = []
+    for i, j, d in neighbor_list_chunks('ijd', atoms, cutoff,
+                                        max_memory=max_memory):
+        assert (np.diff(i) >= 0).all()
+        first.append(np.unique(i))
+        for a in np.unique(i):
+            assert (j[i == a] == ref[1][ref[0] == a]).all()
+            assert (d[i == a] == ref[2][ref[0] == a]).all()
+    first = np.concatenate(first)
+    assert len(first) == len(np.unique(first))
+    assert set(first) == set(ref[0])
+
+
+def test_peak_memory():
+    atoms = bulk('Al', cubic=True) * (8, 8, 8)
+    cutoff = 6.0
+    stats = {}
+    i, j, D = neighbor_list('ijD', atoms, cutoff, stats=stats)
+    assert stats['nchunks'] == 1
+    assert stats['peak_memory'] > i.nbytes + j.nbytes + D.nbytes
+    peak = stats['peak_memory']
+
+    neighbor_list('ijD', atoms, cutoff, max_memory=1e6, stats=stats)
+    assert stats['nchunks'] > 1
+    assert stats['peak_memory'] < peak
+
+    # Streaming never holds the complete list:
+    for _ in neighbor_list_chunks('i', atoms, cutoff, max_memory=1e6,
+                                  stats=stats):
+        pass
+    assert stats['peak_memory'] < i.nbytes + j.nbytes + D.nbytes
+
+
+def test_chunks_empty():
+    assert list(primitive_neighbor_list_chunks(
+        'ij', [True] * 3, np.eye(3), np.zeros((0, 3)), 1.0)) == []
+    i, S = primitive_neighbor_list('iS', [True] * 3, np.eye(3),
+                                   np.zeros((0, 3)), 1.0, max_memory=1)
+    assert i.shape == (0,) and S.shape == (0, 3)
+    with pytest.raises(ValueError):
+        next(primitive_neighbor_list_chunks('x', [True] * 3, np.eye(3),
+                                            np.zeros((0, 3)), 1.0))
+
+
+@pytest.mark.parametrize('atoms, cutoff', systems())
+@pytest.mark.parametrize('workers', [2, 3, -1])
+def test_parallel_search_is_identical(atoms, cutoff, workers):
+    ref = neighbor_list('ijdDS', atoms, cutoff)
+    for max_memory in [None, 1e5]:
+        parallel = neighbor_list('ijdDS', atoms, cutoff, workers=workers,
+                                 max_memory=max_memory)
+        for a, b in zip(ref, parallel):
+            assert (a == b).all()
+
+    # The chunks may differ, but not the neighbors of each atom:
+    chunks = list(neighbor_list_chunks('ij', atoms, cutoff, max_memory=1e5,
+                                       workers=workers))
+    i, j = [np.concatenate(x) for x in zip(*chunks)]
+    order = np.argsort(i, kind='stable')
+    assert (i[order] == ref[0]).all()
+    assert (j[order] == ref[1]).all()
+
+
+@pytest.mark.parametrize('primitive', [NewPrimitiveNeighborList,
+                                       LinkedCellNeighborList])
+def test_parallel_neighborlist(primitive):
+    atoms = bulk('Cu', cubic=True) * (4, 4, 4)
+    atoms.rattle(stdev=0.1, seed=4)
+    lists = []
+    for workers in [1, 4]:
+        nl = NeighborList([1.3] * len(atoms), bothways=True,
+                          primitive=primitive, workers=workers)
+        nl.update(atoms)
+        lists.append(nl.get_all_neighbors())
+    for a, b in zip(*lists):
+        assert (a == b).all()
+
+
+def test_invalid_workers():
+    with pytest.raises(ValueError):
+        neighbor_list('ij', bulk('Cu'), 3.0, workers=0)
+
+
+def test_workers_default_primitive():
+    atoms = bulk('Cu', cubic=True)
+    nl = NeighborList([1.3] * len(atoms), workers=1)
+    nl.update(atoms)
+    with pytest.raises(ValueError, match='NewPrimitiveNeighborList'):
+        NeighborList([1.3] * len(atoms), workers=2)
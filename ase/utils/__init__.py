@@ -23,7 +23,8 @@ __all__ = ['exec_', 'basestring', 'import_module', 'seterr', 'plural',
            'opencew', 'OpenLock', 'rotate', 'irotate', 'pbc2pbc', 'givens',
            'hsv2rgb', 'hsv', 'pickleload', 'FileNotFoundError',
            'formula_hill', 'formula_metal', 'PurePath', 'xwopen',
-           'tokenize_version', 'get_python_package_path_description']
+           'tokenize_version', 'get_python_package_path_description',
+           'get_workers']
 
 
 def tokenize_version(version_string: str):
@@ -395,6 +396,19 @@ def pbc2pbc(pbc):
     return newpbc
 
 
+def get_workers(workers):
+    """Return the number of threads or processes for *workers*.
+
+    -1 means one per CPU.  Used for the *workers* arguments of the
+    neighbor lists and of the extended XYZ reader."""
+    if workers == -1:
+        return os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError('workers must be a positive integer or -1, '
+                         'not {}'.format(workers))
+    return int(workers)
+
+
 def hsv2rgb(h, s, v):
     """http://en.wikipedia.org/wiki/HSL_and_HSV
 